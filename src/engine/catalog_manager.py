@@ -10,10 +10,12 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Callable
+from types import MethodType
 # from loguru import logger
 import json
 import os
+import weakref
 from .transaction.transaction import Transaction  # 新增导入
 
 # CATALOG_FILE = 'catalog.json'
@@ -189,10 +191,15 @@ class CatalogManager:
         self.tables: Dict[str, TableInfo] = {}
         self.views: Dict[str, ViewInfo] = {}  # 视图元数据存储
         self.triggers: Dict[str, TriggerInfo] = {}  # 触发器元数据存储
+        self._view_names_cache: Optional[frozenset] = None  # 视图名集合缓存，视图增删时失效
+        # 视图变更监听器：视图创建/删除/更新后以视图名回调，用于失效依赖视图的缓存。
+        # 保存的是返回监听器的引用：绑定方法只弱引用其对象，组件被回收后自动注销
+        self._view_change_listeners: List[Callable[[], Optional[Callable[[str], None]]]] = []
         self._load_catalog()
 
     def _load_catalog(self) -> None:
         """从JSON文件加载目录到内存缓存。如果文件不存在则创建一个空的。"""
+        self._view_names_cache = None
         if os.path.exists(self.catalog_path):
             try:
                 if os.path.getsize(self.catalog_path) == 0:
@@ -449,7 +456,9 @@ class CatalogManager:
             is_updatable=is_updatable
         )
         self.views[view_name] = view_info
+        self._view_names_cache = None
         self._save_catalog()
+        self._notify_view_changed(view_name)
         print(f"[CatalogManager]: 视图 '{view_name}' 已创建，定义: {definition}")
     
     def get_view(self, view_name: str) -> ViewInfo:
@@ -458,6 +467,10 @@ class CatalogManager:
             raise Exception(f"View {view_name} not found")
         return self.views[view_name]
     
+    def try_get_view(self, view_name: str) -> Optional[ViewInfo]:
+        """获取视图信息，视图不存在时返回None（不抛异常）"""
+        return self.views.get(view_name)
+    
     def view_exists(self, view_name: str) -> bool:
         """检查视图是否存在"""
         return view_name in self.views
@@ -467,7 +480,9 @@ class CatalogManager:
         if view_name not in self.views:
             raise Exception(f"View {view_name} not found")
         del self.views[view_name]
+        self._view_names_cache = None
         self._save_catalog()
+        self._notify_view_changed(view_name)
         print(f"[CatalogManager]: 视图 '{view_name}' 已删除")
         # 日志化已移除，留在real_storage_engine.py
     
@@ -482,12 +497,51 @@ class CatalogManager:
             view_info.is_updatable = is_updatable
         
         self._save_catalog()
+        self._notify_view_changed(view_name)
         print(f"[CatalogManager]: 视图 '{view_name}' 已更新，新定义: {definition}")
     
     def list_views(self) -> List[str]:
         """列出所有视图名"""
         return list(self.views.keys())
     
+    def list_view_infos(self) -> List[ViewInfo]:
+        """一次性列出所有视图的元数据"""
+        return list(self.views.values())
+    
+    def add_view_change_listener(self, listener: Callable[[str], None]) -> None:
+        """注册视图变更监听器，回调参数为发生变更的视图名"""
+        # 顺带清理已回收组件的监听器，避免频繁构造的短命组件（如每条语句的查询重写器）堆积
+        self._view_change_listeners = [ref for ref in self._view_change_listeners if ref() is not None]
+        if isinstance(listener, MethodType):
+            self._view_change_listeners.append(weakref.WeakMethod(listener))
+        else:
+            self._view_change_listeners.append(lambda: listener)
+    
+    def remove_view_change_listener(self, listener: Callable[[str], None]) -> bool:
+        """注销视图变更监听器，返回是否找到并注销"""
+        remaining = [ref for ref in self._view_change_listeners if ref() != listener]
+        removed = len(remaining) != len(self._view_change_listeners)
+        self._view_change_listeners = remaining
+        return removed
+    
+    def _notify_view_changed(self, view_name: str) -> None:
+        """通知所有监听器视图已变更，顺带清理所属对象已被回收的监听器"""
+        has_dead = False
+        for ref in tuple(self._view_change_listeners):
+            listener = ref()
+            if listener is None:
+                has_dead = True
+            else:
+                listener(view_name)
+        if has_dead:
+            self._view_change_listeners = [ref for ref in self._view_change_listeners if ref() is not None]
+    
+    def known_view_names(self) -> frozenset:
+        """返回所有视图名的只读集合（缓存，视图增删时失效）"""
+        if self._view_names_cache is None:
+            self._view_names_cache = frozenset(self.views)
+        return self._view_names_cache
+    
     def is_view_updatable(self, view_name: str) -> bool:
         """检查视图是否可更新"""
         if view_name not in self.views:
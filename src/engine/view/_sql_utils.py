@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+视图SQL辅助函数 - 视图相关管理器共享的视图定义解析工具
+"""
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+import re
+from src.sql_compiler.lexicalAnalysis import tokenize
+from src.sql_compiler.new_syntax_analyzer import (
+    NewSyntaxAnalyzer, Program, Select, TableReference, MultiTableReference,
+    SubqueryReference, InSubqueryCondition, ExistsCondition, AndCondition, OrCondition
+)
+
+_FROM_JOIN_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def extract_base_tables(definition: str) -> Tuple[str, ...]:
+    """
+    从视图定义中提取FROM/JOIN子句引用的表名
+    
+    优先复用 compile_definition 缓存的AST遍历得到表名；语法分析器
+    无法解析的定义（如含聚合函数）退回到正则匹配。视图定义在同一
+    版本内不可变，因此按定义字符串缓存结果；返回元组以保证缓存值
+    不会被调用方修改。
+    
+    Args:
+        definition: 视图的SELECT语句定义
+        
+    Returns:
+        Tuple[str, ...]: 表名元组，保留原始大小写
+    """
+    ast, _ = compile_definition(definition)
+    if ast is not None:
+        return collect_from_tables(ast)
+    return tuple(_FROM_JOIN_RE.findall(definition))
+
+
+def collect_from_tables(ast: Any) -> Tuple[str, ...]:
+    """
+    遍历SELECT语句的AST，收集FROM、JOIN及子查询中引用的表名
+    
+    Args:
+        ast: compile_definition 返回的AST（Program 或 Select）
+        
+    Returns:
+        Tuple[str, ...]: 表名元组，按遍历顺序
+    """
+    tables = []
+    _collect_query_tables(ast, tables)
+    return tuple(tables)
+
+
+def _collect_query_tables(query: Any, tables: list) -> None:
+    """收集一个查询（含子查询）引用的表名"""
+    if isinstance(query, Program):
+        query = query.query
+    if not isinstance(query, Select):
+        return
+    _collect_table_reference(query.table_name, tables)
+    for join in query.joins:
+        _collect_table_reference(join.right_table, tables)
+    _collect_condition_tables(query.where_clause, tables)
+
+
+def _collect_table_reference(ref: Any, tables: list) -> None:
+    """收集FROM/JOIN位置上的表引用"""
+    if isinstance(ref, str):
+        tables.append(ref)
+    elif isinstance(ref, TableReference):
+        tables.append(ref.table_name)
+    elif isinstance(ref, MultiTableReference):
+        for table in ref.tables:
+            _collect_table_reference(table, tables)
+    elif isinstance(ref, SubqueryReference):
+        _collect_query_tables(ref.subquery, tables)
+
+
+def _collect_condition_tables(condition: Any, tables: list) -> None:
+    """收集WHERE条件中子查询引用的表名"""
+    if isinstance(condition, (InSubqueryCondition, ExistsCondition)):
+        _collect_query_tables(condition.subquery, tables)
+    elif isinstance(condition, (AndCondition, OrCondition)):
+        _collect_condition_tables(condition.left, tables)
+        _collect_condition_tables(condition.right, tables)
+
+
+@lru_cache(maxsize=512)
+def compile_definition(definition: str) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    词法+语法分析视图定义，按定义字符串缓存结果
+    
+    批量创建/重放视图时同一定义只解析一次；语法分析器有状态，
+    因此每次未命中时使用新的分析器实例。
+    
+    Args:
+        definition: 视图的SELECT语句定义
+        
+    Returns:
+        Tuple[Optional[Any], Optional[str]]: (AST, 错误信息)。
+            定义有效时AST非None；为空或不以SELECT开头时两者均为None；
+            分析出错时AST为None并给出错误信息
+    """
+    try:
+        tokens = tokenize(definition)
+        if not tokens:
+            return None, None
+        
+        # 检查是否以SELECT开头
+        if tokens[0][1].upper() != 'SELECT':
+            return None, None
+        
+        return NewSyntaxAnalyzer().build_ast_from_tokens(tokens), None
+    except Exception as e:
+        return None, str(e)
@@ -3,24 +3,66 @@
 查询重写引擎 - 处理视图查询重写
 当用户查询视图时，将视图查询重写为对底层表的查询
 """
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from src.engine.catalog_manager import CatalogManager
 from src.engine.view.view_manager import ViewManager
+from src.engine.view._sql_utils import extract_base_tables
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.sql_compiler.lexicalAnalysis import tokenize
 from src.sql_compiler.new_syntax_analyzer import NewSyntaxAnalyzer
+import logging
 import re
 
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 视图命名约定前缀，用于识别引用了不存在视图的查询
+_VIEW_NAME_PREFIXES = ('v_',)
+
+# 视图替换时定位视图引用的前缀模式（后接转义后的视图名）
+_REWRITE_PREFIXES = {
+    'SELECT_STAR': r'SELECT\s+\*\s+FROM\s+',
+    'FROM': r'FROM\s+',
+}
+
 
 class QueryRewriter:
     """查询重写引擎"""
     
-    def __init__(self, catalog_manager: CatalogManager):
+    def __init__(self, catalog_manager: CatalogManager, view_manager: Optional[ViewManager] = None):
         self.catalog_manager = catalog_manager
-        self.view_manager = ViewManager(catalog_manager)
+        # 可注入共享的视图管理器，避免重复构造
+        self.view_manager = view_manager or ViewManager(catalog_manager)
         self.syntax_analyzer = NewSyntaxAnalyzer()
+        
+        # 视图替换正则缓存：(视图名, 前缀类型) -> 预编译正则，视图修改/删除时失效
+        self._rewrite_re_cache: Dict[Tuple[str, str], 're.Pattern'] = {}
+        self.catalog_manager.add_view_change_listener(self._invalidate_rewrite_re)
+    
+    def _get_rewrite_re(self, view_name: str, prefix: str) -> 're.Pattern':
+        """
+        获取（并缓存）定位视图引用的预编译正则
+        
+        Args:
+            view_name: 视图名
+            prefix: 前缀类型，见 _REWRITE_PREFIXES
+            
+        Returns:
+            re.Pattern: 预编译正则
+        """
+        key = (view_name, prefix)
+        pattern = self._rewrite_re_cache.get(key)
+        if pattern is None:
+            pattern = re.compile(_REWRITE_PREFIXES[prefix] + re.escape(view_name) + r'\b', re.IGNORECASE)
+            self._rewrite_re_cache[key] = pattern
+        return pattern
+    
+    def _invalidate_rewrite_re(self, view_name: str) -> None:
+        """失效指定视图的替换正则缓存"""
+        for key in [key for key in self._rewrite_re_cache if key[0] == view_name]:
+            del self._rewrite_re_cache[key]
     
     def rewrite_query(self, sql_text: str) -> str:
         """
@@ -51,11 +93,11 @@ class QueryRewriter:
             # 4. 重写查询
             rewritten_query = self._rewrite_query_with_views(sql_text, view_names)
             
-            print(f"🔄 查询重写: {sql_text} -> {rewritten_query}")
+            logger.debug("查询重写: %s -> %s", sql_text, rewritten_query)
             return rewritten_query
             
         except Exception as e:
-            print(f"❌ 查询重写失败: {str(e)}")
+            logger.error("查询重写失败: %s", e)
             raise e  # 重新抛出异常，让上层处理
     
     def _find_views_in_query(self, tokens: List[Tuple]) -> Tuple[List[str], List[str]]:
@@ -71,6 +113,7 @@ class QueryRewriter:
         view_names = []
         missing_views = []
         in_from_clause = False
+        known_views = self.catalog_manager.known_view_names()
         
         for i, (token_type, token_value, line, col) in enumerate(tokens):
             if token_type == 'KEYWORD' and token_value.upper() == 'FROM':
@@ -85,7 +128,7 @@ class QueryRewriter:
             
             if in_from_clause and token_type == 'ID':
                 # 检查这个标识符是否是视图（存在或不存在）
-                if self.catalog_manager.view_exists(token_value):
+                if token_value in known_views:
                     view_names.append(token_value)
                 elif self._is_potential_view_name(token_value):
                     # 检查是否可能是视图名（不是表名）
@@ -96,10 +139,11 @@ class QueryRewriter:
     
     def _is_potential_view_name(self, name: str) -> bool:
         """
-        判断一个名称是否可能是视图名
-        这里使用简单的启发式规则：以v_开头的名称可能是视图
+        判断一个名称是否可能是不存在的视图名
+        已存在的视图由目录中的视图名集合直接判定，这里只对
+        符合视图命名前缀（见 _VIEW_NAME_PREFIXES）的名称报告"视图不存在"
         """
-        return name.startswith('v_')
+        return name.startswith(_VIEW_NAME_PREFIXES)
     
     def _rewrite_query_with_views(self, sql_text: str, view_names: List[str]) -> str:
         """
@@ -140,8 +184,6 @@ class QueryRewriter:
             str: 替换后的SQL查询
         """
         try:
-            import re
-            
             # 清理视图定义，移除可能的AST对象表示
             clean_definition = self._clean_view_definition(view_definition)
             
@@ -153,15 +195,13 @@ class QueryRewriter:
                 return self._replace_complex_view(sql_text, view_name, clean_definition)
             
         except Exception as e:
-            print(f"⚠️ 视图重写失败: {e}")
+            logger.warning("视图重写失败: %s", e)
             return sql_text
     
     def _clean_view_definition(self, view_definition: str) -> str:
         """
         清理视图定义，将AST对象转换为标准SQL
         """
-        import re
-        
         # 处理Identifier AST对象
         # 例如: Identifier(token=('ID', 's.name', 0, 0), value='s.name')
         identifier_pattern = r"Identifier\(token=\([^)]+\),\s*value='([^']+)'\)"
@@ -274,7 +314,6 @@ class QueryRewriter:
         """
         检查是否是简单的单表视图
         """
-        import re
         # 检查是否包含JOIN、子查询等复杂结构
         complex_patterns = [
             r'\bJOIN\b',
@@ -294,8 +333,6 @@ class QueryRewriter:
         """
         替换简单视图
         """
-        import re
-        
         # 提取列名
         select_match = re.search(r'SELECT\s+(.+?)\s+FROM', view_definition, re.IGNORECASE)
         if not select_match:
@@ -318,23 +355,23 @@ class QueryRewriter:
         if '*' in sql_text:
             if where_clause:
                 # 有WHERE条件，需要添加WHERE子句
-                rewritten = re.sub(r'SELECT\s+\*\s+FROM\s+' + re.escape(view_name), 
+                rewritten = self._get_rewrite_re(view_name, 'SELECT_STAR').sub(
                                  f'SELECT {view_columns} FROM {view_table} WHERE {where_clause}', 
-                                 sql_text, flags=re.IGNORECASE)
+                                 sql_text)
             else:
-                rewritten = re.sub(r'SELECT\s+\*\s+FROM\s+' + re.escape(view_name), 
+                rewritten = self._get_rewrite_re(view_name, 'SELECT_STAR').sub(
                                  f'SELECT {view_columns} FROM {view_table}', 
-                                 sql_text, flags=re.IGNORECASE)
+                                 sql_text)
         else:
             if where_clause:
                 # 有WHERE条件，需要添加WHERE子句
-                rewritten = re.sub(r'FROM\s+' + re.escape(view_name), 
+                rewritten = self._get_rewrite_re(view_name, 'FROM').sub(
                                  f'FROM {view_table} WHERE {where_clause}', 
-                                 sql_text, flags=re.IGNORECASE)
+                                 sql_text)
             else:
-                rewritten = re.sub(r'FROM\s+' + re.escape(view_name), 
+                rewritten = self._get_rewrite_re(view_name, 'FROM').sub(
                                  f'FROM {view_table}', 
-                                 sql_text, flags=re.IGNORECASE)
+                                 sql_text)
         
         return rewritten
     
@@ -342,8 +379,6 @@ class QueryRewriter:
         """
         替换复杂视图，使用子查询方式
         """
-        import re
-        
         # 检查视图定义是否包含GROUP BY
         is_aggregate_view = re.search(r'\bGROUP BY\b', view_definition, re.IGNORECASE)
         
@@ -384,15 +419,15 @@ class QueryRewriter:
                     from_part = view_definition[select_match.end() - 4:].strip()  # 包含FROM关键字
                     
                     # 替换查询
-                    rewritten = re.sub(r'SELECT\s+\*\s+FROM\s+' + re.escape(view_name), 
+                    rewritten = self._get_rewrite_re(view_name, 'SELECT_STAR').sub(
                                      f'SELECT {view_columns} {from_part}', 
-                                     sql_text, flags=re.IGNORECASE)
+                                     sql_text)
                 return rewritten
         
         # 如果查询中指定了具体列名，只替换FROM部分
-        rewritten = re.sub(r'FROM\s+' + re.escape(view_name), 
+        rewritten = self._get_rewrite_re(view_name, 'FROM').sub(
                          f'FROM ({view_definition})', 
-                         sql_text, flags=re.IGNORECASE)
+                         sql_text)
         
         return rewritten
     
@@ -442,49 +477,18 @@ class QueryRewriter:
             return dependencies
             
         except Exception as e:
-            print(f"获取视图依赖失败: {str(e)}")
+            logger.error("获取视图依赖失败: %s", e)
             return []
     
     def _extract_table_names_from_definition(self, definition: str) -> List[str]:
         """从视图定义中提取表名"""
-        table_names = []
-        
-        try:
-            # 使用正则表达式提取FROM子句中的表名
-            from_pattern = r'FROM\s+(\w+)'
-            matches = re.findall(from_pattern, definition.upper())
-            table_names.extend(matches)
-            
-            # 处理JOIN子句中的表名
-            join_pattern = r'JOIN\s+(\w+)'
-            join_matches = re.findall(join_pattern, definition.upper())
-            table_names.extend(join_matches)
-            
-        except Exception as e:
-            print(f"提取表名失败: {str(e)}")
-        
-        return table_names
+        return list(extract_base_tables(definition))
     
     def _extract_view_names_from_definition(self, definition: str) -> List[str]:
         """从视图定义中提取视图名"""
-        view_names = []
-        
-        try:
-            # 提取FROM和JOIN子句中的标识符
-            from_pattern = r'FROM\s+(\w+)'
-            join_pattern = r'JOIN\s+(\w+)'
-            
-            all_matches = re.findall(from_pattern, definition.upper()) + re.findall(join_pattern, definition.upper())
-            
-            # 检查每个标识符是否是视图
-            for name in all_matches:
-                if self.catalog_manager.view_exists(name):
-                    view_names.append(name)
-            
-        except Exception as e:
-            print(f"提取视图名失败: {str(e)}")
-        
-        return view_names
+        # 检查FROM和JOIN子句中的每个标识符是否是视图
+        known_views = self.catalog_manager.known_view_names()
+        return [name for name in extract_base_tables(definition) if name in known_views]
     
     def validate_view_definition(self, definition: str) -> Tuple[bool, str]:
         """
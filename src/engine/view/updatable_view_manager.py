@@ -3,19 +3,126 @@
 可更新视图管理器 - 处理可更新视图的INSERT、UPDATE、DELETE操作
 """
 from typing import Dict, List, Optional, Tuple, Any
-from src.engine.catalog_manager import CatalogManager
+from src.engine.catalog_manager import CatalogManager, ViewInfo
 from src.engine.view.view_manager import ViewManager
 from src.engine.view.query_rewriter import QueryRewriter
+from src.engine.view._sql_utils import extract_base_tables
+from collections import OrderedDict
+import logging
 import re
 
+# 设置日志
+logger = logging.getLogger(__name__)
+
+
+# 视图定义单遍扫描：一次 finditer 同时收集所有影响可更新性/复杂度的结构
+# （FROM 与原实现一样不要求词边界，按出现次数计数）
+_VIEW_SCAN = re.compile(
+    r'(?P<JOIN>\bJOIN\b)'
+    r'|(?P<GROUPBY>\bGROUP\s+BY\b)'
+    r'|(?P<HAVING>\bHAVING\b)'
+    r'|(?P<DISTINCT>\bDISTINCT\b)'
+    r'|(?P<AGG>\b(?P<AGG_FUNC>COUNT|SUM|AVG|MIN|MAX|GROUP_CONCAT)\s*\()'
+    r'|(?P<FROM>FROM\s+\w+)'
+    r'|(?P<ANDOR>\b(?:OR|AND)\b)',
+    re.IGNORECASE
+)
+
+# 子查询判断是跨越括号的整体匹配，无法并入上面的逐词扫描，单独检查
+_SUBQ_RE = re.compile(r'\(.*SELECT.*\)', re.IGNORECASE)
+
+# 视图DML重写时定位“关键字 + 对象名”的预编译正则
+_INTO_RE = re.compile(r'\bINTO\s+(\w+)', re.IGNORECASE)
+_UPDATE_RE = re.compile(r'\bUPDATE\s+(\w+)', re.IGNORECASE)
+_FROM_RE = re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE)
+
+# 可更新性验证缓存的最大条目数（LRU淘汰）
+_UPDATABILITY_CACHE_SIZE = 1024
+
+# 聚合函数的报告优先级（同时出现多个时按此顺序报告第一个）
+_AGGREGATE_FUNCTIONS = ('COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'GROUP_CONCAT')
+
+# 按固定优先级检查的不可更新结构（聚合函数在 JOIN 与 GROUP BY 之间，单独处理）
+_DISQUALIFY_REASONS = (
+    ('GROUPBY', "视图包含GROUP BY，不可更新"),
+    ('HAVING', "视图包含HAVING，不可更新"),
+    ('DISTINCT', "视图包含DISTINCT，不可更新"),
+)
+
+
+def _scan_definition(definition: str) -> Tuple[int, set, set]:
+    """
+    单遍扫描视图定义
+    
+    Args:
+        definition: 视图定义
+        
+    Returns:
+        Tuple[int, set, set]: (FROM 出现次数, 命中的结构类型集合, 出现的聚合函数集合)
+    """
+    from_count = 0
+    features = set()
+    agg_funcs = set()
+    for match in _VIEW_SCAN.finditer(definition):
+        kind = match.lastgroup
+        features.add(kind)
+        if kind == 'FROM':
+            from_count += 1
+        elif kind == 'AGG':
+            agg_funcs.add(match.group('AGG_FUNC').upper())
+    return from_count, features, agg_funcs
+
+
+def _updatability_reason(definition: str, from_count: int, features: set, agg_funcs: set) -> Optional[str]:
+    """
+    按固定优先级判断视图是否不可更新：多表、JOIN、聚合函数、GROUP BY、HAVING、DISTINCT、子查询
+    
+    Returns:
+        Optional[str]: 不可更新的原因，可更新时返回None
+    """
+    if from_count > 1:
+        return "视图涉及多个表，不可更新"
+    if 'JOIN' in features:
+        return "视图包含JOIN，不可更新"
+    for func in _AGGREGATE_FUNCTIONS:
+        if func in agg_funcs:
+            return f"视图包含聚合函数 {func}，不可更新"
+    for kind, reason in _DISQUALIFY_REASONS:
+        if kind in features:
+            return reason
+    if _SUBQ_RE.search(definition):
+        return "视图包含子查询，不可更新"
+    return None
+
 
 class UpdatableViewManager:
     """可更新视图管理器"""
     
-    def __init__(self, catalog_manager: CatalogManager):
+    def __init__(self, catalog_manager: CatalogManager, view_manager: Optional[ViewManager] = None):
         self.catalog_manager = catalog_manager
-        self.view_manager = ViewManager(catalog_manager)
-        self.query_rewriter = QueryRewriter(catalog_manager)
+        # 可注入共享的视图管理器，避免各管理器重复构造
+        self.view_manager = view_manager or ViewManager(catalog_manager)
+        self.query_rewriter = QueryRewriter(catalog_manager, self.view_manager)
+        
+        # 可更新性验证缓存：(视图名, 视图定义) -> (是否可更新, 原因)；以定义原文为键，不会因哈希碰撞误命中
+        self._updatability_cache: 'OrderedDict[Tuple[str, str], Tuple[bool, str]]' = OrderedDict()
+        self.catalog_manager.add_view_change_listener(self.invalidate)
+    
+    def invalidate(self, view_name: str) -> None:
+        """
+        失效指定视图的可更新性验证缓存
+        
+        Args:
+            view_name: 视图名
+        """
+        for key in [key for key in self._updatability_cache if key[0] == view_name]:
+            del self._updatability_cache[key]
+    
+    def _cache_updatability(self, key: Tuple[str, str], result: Tuple[bool, str]) -> None:
+        """写入可更新性验证缓存，超出容量时淘汰最久未用的条目"""
+        self._updatability_cache[key] = result
+        if len(self._updatability_cache) > _UPDATABILITY_CACHE_SIZE:
+            self._updatability_cache.popitem(last=False)
     
     def is_view_updatable(self, view_name: str) -> bool:
         """
@@ -28,16 +135,21 @@ class UpdatableViewManager:
             bool: 是否可更新
         """
         try:
-            if not self.catalog_manager.view_exists(view_name):
-                return False
-            
-            view_info = self.catalog_manager.get_view(view_name)
-            return view_info.is_updatable
+            view_info = self._load_view_or_none(view_name)
+            return view_info is not None and view_info.is_updatable
             
         except Exception as e:
-            print(f"❌ 检查视图可更新性失败: {str(e)}")
+            logger.error("检查视图可更新性失败: %s", e)
             return False
     
+    def _load_view_or_none(self, view_name: str) -> Optional[ViewInfo]:
+        """一次目录查询获取视图元数据，视图不存在时返回None"""
+        return self.catalog_manager.try_get_view(view_name)
+    
+    def _is_updatable_from_info(self, view_info: ViewInfo) -> bool:
+        """根据已加载的视图元数据判断是否可更新，不再访问目录"""
+        return view_info.is_updatable
+    
     def validate_view_updatability(self, view_name: str) -> Tuple[bool, str]:
         """
         验证视图是否可更新
@@ -49,18 +161,26 @@ class UpdatableViewManager:
             Tuple[bool, str]: (是否可更新, 原因)
         """
         try:
-            if not self.catalog_manager.view_exists(view_name):
+            view_info = self._load_view_or_none(view_name)
+            if view_info is None:
                 return False, "视图不存在"
             
-            view_info = self.catalog_manager.get_view(view_name)
-            definition = view_info.definition
-            
-            # 检查视图定义是否满足可更新条件
-            return self._check_updatability_conditions(definition)
+            return self._validate_definition(view_name, view_info.definition)
             
         except Exception as e:
             return False, f"验证失败: {str(e)}"
     
+    def _validate_definition(self, view_name: str, definition: str) -> Tuple[bool, str]:
+        """检查视图定义是否满足可更新条件（按视图名与定义缓存）"""
+        key = (view_name, definition)
+        result = self._updatability_cache.get(key)
+        if result is None:
+            result = self._check_updatability_conditions(definition)
+            self._cache_updatability(key, result)
+        else:
+            self._updatability_cache.move_to_end(key)
+        return result
+    
     def _check_updatability_conditions(self, definition: str) -> Tuple[bool, str]:
         """
         检查视图定义是否满足可更新条件
@@ -72,56 +192,46 @@ class UpdatableViewManager:
             Tuple[bool, str]: (是否可更新, 原因)
         """
         try:
-            # 1. 检查是否只涉及一个表
-            table_names = self._extract_table_names_from_definition(definition)
-            if len(table_names) > 1:
-                return False, "视图涉及多个表，不可更新"
-            
-            # 2. 检查是否包含JOIN
-            if re.search(r'\bJOIN\b', definition, re.IGNORECASE):
-                return False, "视图包含JOIN，不可更新"
-            
-            # 3. 检查是否包含聚合函数
-            aggregate_functions = ['COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'GROUP_CONCAT']
-            for func in aggregate_functions:
-                if re.search(rf'\b{func}\s*\(', definition, re.IGNORECASE):
-                    return False, f"视图包含聚合函数 {func}，不可更新"
-            
-            # 4. 检查是否包含GROUP BY
-            if re.search(r'\bGROUP\s+BY\b', definition, re.IGNORECASE):
-                return False, "视图包含GROUP BY，不可更新"
-            
-            # 5. 检查是否包含HAVING
-            if re.search(r'\bHAVING\b', definition, re.IGNORECASE):
-                return False, "视图包含HAVING，不可更新"
-            
-            # 6. 检查是否包含DISTINCT
-            if re.search(r'\bDISTINCT\b', definition, re.IGNORECASE):
-                return False, "视图包含DISTINCT，不可更新"
-            
-            # 7. 检查是否包含子查询
-            if re.search(r'\(.*SELECT.*\)', definition, re.IGNORECASE):
-                return False, "视图包含子查询，不可更新"
+            # 单遍扫描收集结构，再按固定优先级给出第一个不满足的条件
+            reason = _updatability_reason(definition, *_scan_definition(definition))
+            if reason:
+                return False, reason
             
             return True, "视图满足可更新条件"
             
         except Exception as e:
             return False, f"检查条件失败: {str(e)}"
     
-    def _extract_table_names_from_definition(self, definition: str) -> List[str]:
-        """从视图定义中提取表名"""
-        table_names = []
+    def _analyze_definition(self, definition: str) -> Tuple[List[str], bool, str, int]:
+        """
+        单遍扫描视图定义得到可更新性和复杂度，并提取底层表
         
-        try:
-            # 使用正则表达式提取FROM子句中的表名
-            from_pattern = r'FROM\s+(\w+)'
-            matches = re.findall(from_pattern, definition.upper())
-            table_names.extend(matches)
+        Args:
+            definition: 视图定义
             
-        except Exception as e:
-            print(f"提取表名失败: {str(e)}")
+        Returns:
+            Tuple[List[str], bool, str, int]: (底层表列表, 是否可更新, 原因, 复杂度分数)
+        """
+        from_count, features, agg_funcs = _scan_definition(definition)
+        reason = _updatability_reason(definition, from_count, features, agg_funcs)
         
-        return table_names
+        # 基础分数1；JOIN/子查询各计2分，AND-OR 计1分，聚合函数按种类计分
+        score = 1 + len(agg_funcs)
+        if 'JOIN' in features:
+            score += 2
+        if _SUBQ_RE.search(definition):
+            score += 2
+        if 'ANDOR' in features:
+            score += 1
+        
+        tables = self._extract_table_names_from_definition(definition)
+        if reason is None:
+            return tables, True, "视图满足可更新条件", score
+        return tables, False, reason, score
+    
+    def _extract_table_names_from_definition(self, definition: str) -> List[str]:
+        """从视图定义中提取表名"""
+        return list(extract_base_tables(definition))
     
     def set_view_updatable(self, view_name: str, is_updatable: bool) -> bool:
         """
@@ -135,26 +245,26 @@ class UpdatableViewManager:
             bool: 是否成功
         """
         try:
-            if not self.catalog_manager.view_exists(view_name):
-                print(f"❌ 视图 '{view_name}' 不存在")
+            view_info = self._load_view_or_none(view_name)
+            if view_info is None:
+                logger.warning("视图 '%s' 不存在", view_name)
                 return False
             
             if is_updatable:
                 # 验证视图是否满足可更新条件
-                valid, reason = self.validate_view_updatability(view_name)
+                valid, reason = self._validate_definition(view_name, view_info.definition)
                 if not valid:
-                    print(f"❌ 视图 '{view_name}' 不可更新: {reason}")
+                    logger.warning("视图 '%s' 不可更新: %s", view_name, reason)
                     return False
             
             # 更新视图的可更新状态
-            view_info = self.catalog_manager.get_view(view_name)
             self.catalog_manager.update_view(view_name, view_info.definition, is_updatable)
             
-            print(f"✅ 视图 '{view_name}' 已设置为{'可更新' if is_updatable else '不可更新'}")
+            logger.debug("视图 '%s' 已设置为%s", view_name, '可更新' if is_updatable else '不可更新')
             return True
             
         except Exception as e:
-            print(f"❌ 设置视图可更新性失败: {str(e)}")
+            logger.error("设置视图可更新性失败: %s", e)
             return False
     
     def rewrite_view_insert(self, view_name: str, insert_sql: str) -> Optional[str]:
@@ -168,37 +278,7 @@ class UpdatableViewManager:
         Returns:
             str: 重写后的INSERT语句
         """
-        try:
-            if not self.is_view_updatable(view_name):
-                print(f"❌ 视图 '{view_name}' 不可更新")
-                return None
-            
-            # 获取视图定义
-            view_info = self.catalog_manager.get_view(view_name)
-            definition = view_info.definition
-            
-            # 提取底层表名
-            table_names = self._extract_table_names_from_definition(definition)
-            if len(table_names) != 1:
-                print(f"❌ 视图 '{view_name}' 涉及多个表，无法重写INSERT")
-                return None
-            
-            base_table = table_names[0]
-            
-            # 重写INSERT语句
-            rewritten_sql = re.sub(
-                rf'\bINTO\s+{re.escape(view_name)}\b',
-                f'INTO {base_table}',
-                insert_sql,
-                flags=re.IGNORECASE
-            )
-            
-            print(f"🔄 视图INSERT重写: {insert_sql} -> {rewritten_sql}")
-            return rewritten_sql
-            
-        except Exception as e:
-            print(f"❌ 重写视图INSERT失败: {str(e)}")
-            return None
+        return self._rewrite_view_dml(view_name, insert_sql, _INTO_RE, 'INSERT')
     
     def rewrite_view_update(self, view_name: str, update_sql: str) -> Optional[str]:
         """
@@ -211,37 +291,7 @@ class UpdatableViewManager:
         Returns:
             str: 重写后的UPDATE语句
         """
-        try:
-            if not self.is_view_updatable(view_name):
-                print(f"❌ 视图 '{view_name}' 不可更新")
-                return None
-            
-            # 获取视图定义
-            view_info = self.catalog_manager.get_view(view_name)
-            definition = view_info.definition
-            
-            # 提取底层表名
-            table_names = self._extract_table_names_from_definition(definition)
-            if len(table_names) != 1:
-                print(f"❌ 视图 '{view_name}' 涉及多个表，无法重写UPDATE")
-                return None
-            
-            base_table = table_names[0]
-            
-            # 重写UPDATE语句
-            rewritten_sql = re.sub(
-                rf'\bUPDATE\s+{re.escape(view_name)}\b',
-                f'UPDATE {base_table}',
-                update_sql,
-                flags=re.IGNORECASE
-            )
-            
-            print(f"🔄 视图UPDATE重写: {update_sql} -> {rewritten_sql}")
-            return rewritten_sql
-            
-        except Exception as e:
-            print(f"❌ 重写视图UPDATE失败: {str(e)}")
-            return None
+        return self._rewrite_view_dml(view_name, update_sql, _UPDATE_RE, 'UPDATE')
     
     def rewrite_view_delete(self, view_name: str, delete_sql: str) -> Optional[str]:
         """
@@ -254,38 +304,73 @@ class UpdatableViewManager:
         Returns:
             str: 重写后的DELETE语句
         """
+        return self._rewrite_view_dml(view_name, delete_sql, _FROM_RE, 'DELETE')
+    
+    def _rewrite_view_dml(self, view_name: str, sql: str, keyword_re: 're.Pattern',
+                          operation: str) -> Optional[str]:
+        """
+        将视图DML语句中的视图名重写为底层表名
+        
+        Args:
+            view_name: 视图名
+            sql: 原始DML语句
+            keyword_re: 定位“关键字 + 对象名”的预编译正则（INTO/UPDATE/FROM）
+            operation: 操作类型，用于输出信息
+            
+        Returns:
+            str: 重写后的语句，失败返回None
+        """
         try:
-            if not self.is_view_updatable(view_name):
-                print(f"❌ 视图 '{view_name}' 不可更新")
+            # 获取视图定义（一次目录查询）
+            view_info = self._load_view_or_none(view_name)
+            if view_info is None or not view_info.is_updatable:
+                logger.warning("视图 '%s' 不可更新", view_name)
                 return None
-            
-            # 获取视图定义
-            view_info = self.catalog_manager.get_view(view_name)
             definition = view_info.definition
             
             # 提取底层表名
             table_names = self._extract_table_names_from_definition(definition)
             if len(table_names) != 1:
-                print(f"❌ 视图 '{view_name}' 涉及多个表，无法重写DELETE")
+                logger.warning("视图 '%s' 涉及多个表，无法重写%s", view_name, operation)
                 return None
             
             base_table = table_names[0]
             
-            # 重写DELETE语句
-            rewritten_sql = re.sub(
-                rf'\bFROM\s+{re.escape(view_name)}\b',
-                f'FROM {base_table}',
-                delete_sql,
-                flags=re.IGNORECASE
-            )
+            rewritten_sql = self._rewrite_keyword(sql, keyword_re, view_name, base_table)
             
-            print(f"🔄 视图DELETE重写: {delete_sql} -> {rewritten_sql}")
+            logger.debug("视图%s重写: %s -> %s", operation, sql, rewritten_sql)
             return rewritten_sql
             
         except Exception as e:
-            print(f"❌ 重写视图DELETE失败: {str(e)}")
+            logger.error("重写视图%s失败: %s", operation, e)
             return None
     
+    def _rewrite_keyword(self, sql: str, keyword_re: 're.Pattern', view_name: str, base_table: str) -> str:
+        """
+        把关键字后紧跟的视图名替换为底层表名（按切片拼接，不做正则替换）
+        
+        Args:
+            sql: 原始SQL
+            keyword_re: 预编译正则，第1组为关键字后的对象名
+            view_name: 视图名（大小写不敏感匹配）
+            base_table: 底层表名
+            
+        Returns:
+            str: 替换后的SQL
+        """
+        target = view_name.lower()
+        parts = []
+        last = 0
+        for match in keyword_re.finditer(sql):
+            if match.group(1).lower() == target:
+                parts.append(sql[last:match.start(1)])
+                parts.append(base_table)
+                last = match.end(1)
+        if not parts:
+            return sql
+        parts.append(sql[last:])
+        return ''.join(parts)
+    
     def get_updatable_views(self) -> List[str]:
         """
         获取所有可更新的视图
@@ -294,13 +379,11 @@ class UpdatableViewManager:
             List[str]: 可更新视图列表
         """
         try:
-            updatable_views = []
-            for view_name in self.catalog_manager.list_views():
-                if self.is_view_updatable(view_name):
-                    updatable_views.append(view_name)
-            return updatable_views
+            # 一次取出全部视图元数据，逐个在内存中判断，避免每个视图再查目录
+            return [view_info.view_name for view_info in self.catalog_manager.list_view_infos()
+                    if self._is_updatable_from_info(view_info)]
         except Exception as e:
-            print(f"❌ 获取可更新视图失败: {str(e)}")
+            logger.error("获取可更新视图失败: %s", e)
             return []
     
     def analyze_view_dependencies(self, view_name: str) -> Dict[str, Any]:
@@ -314,27 +397,28 @@ class UpdatableViewManager:
             Dict[str, Any]: 依赖关系信息
         """
         try:
-            if not self.catalog_manager.view_exists(view_name):
+            view_info = self._load_view_or_none(view_name)
+            if view_info is None:
                 return {"error": "视图不存在"}
             
-            view_info = self.catalog_manager.get_view(view_name)
             definition = view_info.definition
             
-            # 分析依赖
+            # 单遍扫描得到底层表、可更新性与复杂度
+            base_tables, valid, reason, complexity = self._analyze_definition(definition)
+            
+            # 扫描结论与 _validate_definition 一致，写入验证缓存供后续验证直接命中
+            if (view_name, definition) not in self._updatability_cache:
+                self._cache_updatability((view_name, definition), (valid, reason))
+            
+            # 分析依赖：目录中的 is_updatable 标志是已确认的结论，仅在其为真时附上验证结果
             dependencies = {
                 "view_name": view_name,
-                "base_tables": self._extract_table_names_from_definition(definition),
-                "is_updatable": self.is_view_updatable(view_name),
-                "updatability_reason": "",
-                "complexity_score": self._calculate_complexity_score(definition)
+                "base_tables": base_tables,
+                "is_updatable": view_info.is_updatable and valid,
+                "updatability_reason": reason if view_info.is_updatable else "",
+                "complexity_score": complexity
             }
             
-            # 验证可更新性
-            if dependencies["is_updatable"]:
-                valid, reason = self.validate_view_updatability(view_name)
-                dependencies["updatability_reason"] = reason
-                dependencies["is_updatable"] = valid
-            
             return dependencies
             
         except Exception as e:
@@ -350,28 +434,5 @@ class UpdatableViewManager:
         Returns:
             int: 复杂度分数
         """
-        score = 0
-        
-        # 基础分数
-        score += 1
-        
-        # JOIN增加复杂度
-        if re.search(r'\bJOIN\b', definition, re.IGNORECASE):
-            score += 2
-        
-        # 聚合函数增加复杂度
-        aggregate_functions = ['COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'GROUP_CONCAT']
-        for func in aggregate_functions:
-            if re.search(rf'\b{func}\s*\(', definition, re.IGNORECASE):
-                score += 1
-        
-        # 子查询增加复杂度
-        if re.search(r'\(.*SELECT.*\)', definition, re.IGNORECASE):
-            score += 2
-        
-        # 复杂条件增加复杂度
-        if re.search(r'\b(OR|AND)\b', definition, re.IGNORECASE):
-            score += 1
-        
-        return score
+        return self._analyze_definition(definition)[3]
 
@@ -2,14 +2,12 @@
 """
 视图管理器 - 处理视图的创建、删除、修改和查询重写
 """
-from typing import Optional, List
+from typing import Optional, List, Callable
 from src.engine.catalog_manager import CatalogManager, ViewInfo
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.sql_compiler.lexicalAnalysis import tokenize
-from src.sql_compiler.new_syntax_analyzer import NewSyntaxAnalyzer
-import re
+from src.engine.view._sql_utils import extract_base_tables, compile_definition
 
 
 class ViewManager:
@@ -17,7 +15,27 @@ class ViewManager:
     
     def __init__(self, catalog_manager: CatalogManager):
         self.catalog_manager = catalog_manager
-        self.syntax_analyzer = NewSyntaxAnalyzer()
+    
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        注册视图变更监听器（委托给目录管理器，经任意路径的视图DDL都会触发）
+        
+        Args:
+            listener: 回调函数，参数为发生变更的视图名
+        """
+        self.catalog_manager.add_view_change_listener(listener)
+    
+    def remove_change_listener(self, listener: Callable[[str], None]) -> bool:
+        """
+        注销视图变更监听器
+        
+        Args:
+            listener: 之前注册的回调函数
+            
+        Returns:
+            bool: 是否找到并注销
+        """
+        return self.catalog_manager.remove_view_change_listener(listener)
     
     def create_view(self, view_name: str, definition: str, creator: str = 'system', 
                    schema_name: str = 'public', is_updatable: bool = False) -> bool:
@@ -136,11 +154,8 @@ class ViewManager:
         Returns:
             str: 视图定义，如果不存在返回None
         """
-        try:
-            view_info = self.catalog_manager.get_view(view_name)
-            return view_info.definition
-        except:
-            return None
+        view_info = self.catalog_manager.try_get_view(view_name)
+        return view_info.definition if view_info else None
     
     def is_view_updatable(self, view_name: str) -> bool:
         """
@@ -173,23 +188,11 @@ class ViewManager:
         Returns:
             bool: 语法是否正确
         """
-        try:
-            # 使用词法分析器检查语法
-            tokens = tokenize(definition)
-            if not tokens:
-                return False
-            
-            # 检查是否以SELECT开头
-            if tokens[0][1].upper() != 'SELECT':
-                return False
-            
-            # 使用语法分析器验证
-            ast = self.syntax_analyzer.build_ast_from_tokens(tokens)
-            return ast is not None
-            
-        except Exception as e:
-            print(f"语法验证失败: {str(e)}")
-            return False
+        # 词法+语法分析结果按定义缓存，重复定义不再重新解析
+        ast, error = compile_definition(definition)
+        if error:
+            print(f"语法验证失败: {error}")
+        return ast is not None
     
     def _check_view_permissions(self, definition: str) -> bool:
         """
@@ -227,24 +230,7 @@ class ViewManager:
         Returns:
             List[str]: 表名列表
         """
-        table_names = []
-        
-        try:
-            # 使用正则表达式提取FROM子句中的表名
-            # 简化版：只处理基本的FROM table_name格式
-            from_pattern = r'FROM\s+(\w+)'
-            matches = re.findall(from_pattern, definition.upper())
-            table_names.extend(matches)
-            
-            # 处理JOIN子句中的表名
-            join_pattern = r'JOIN\s+(\w+)'
-            join_matches = re.findall(join_pattern, definition.upper())
-            table_names.extend(join_matches)
-            
-        except Exception as e:
-            print(f"提取表名失败: {str(e)}")
-        
-        return table_names
+        return list(extract_base_tables(definition))
     
     def get_view_info(self, view_name: str) -> Optional[ViewInfo]:
         """
@@ -256,7 +242,4 @@ class ViewManager:
         Returns:
             ViewInfo: 视图信息，如果不存在返回None
         """
-        try:
-            return self.catalog_manager.get_view(view_name)
-        except:
-            return None
+        return self.catalog_manager.try_get_view(view_name)
@@ -2,27 +2,73 @@
 """
 视图权限管理器 - 处理视图的权限和安全性控制
 """
-from typing import Dict, List, Set, Optional, Tuple, Any
+from typing import Dict, FrozenSet, List, Set, Optional, Tuple, Any
 from src.engine.catalog_manager import CatalogManager, ViewInfo
 from .view_manager import ViewManager
+from ._sql_utils import extract_base_tables
+from collections import OrderedDict
+import logging
 import re
+import sys
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+
+# 视图权限类型，驻留后授权/检查时按对象身份比较即可命中
+VIEW_PERMISSIONS = tuple(sys.intern(p) for p in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'))
+
+# 视图权限类型 -> 位掩码
+PERM_BITS = {permission: 1 << i for i, permission in enumerate(VIEW_PERMISSIONS)}
+
+
+# 视图安全检查：敏感字段与敏感表名（子串匹配，不区分大小写）
+_SENSITIVE_RE = re.compile(r'password|pwd|pass', re.IGNORECASE)
+_SENSITIVE_TABLE_RE = re.compile(r'user|admin|system|config', re.IGNORECASE)
+
+# 权限检查结果缓存的最大条目数（LRU淘汰）
+_PERM_CACHE_SIZE = 10000
+
+def _decode_permission_bits(bits: int) -> Set[str]:
+    """将权限位掩码还原为权限名集合"""
+    return {permission for permission, bit in PERM_BITS.items() if bits & bit}
 
 
 class ViewPermissionManager:
     """视图权限管理器"""
     
-    def __init__(self, catalog_manager: CatalogManager):
+    def __init__(self, catalog_manager: CatalogManager, view_manager: Optional[ViewManager] = None):
         self.catalog_manager = catalog_manager
-        self.view_manager = ViewManager(catalog_manager)
+        # 可注入共享的视图管理器，避免各管理器重复构造
+        self.view_manager = view_manager or ViewManager(catalog_manager)
         
-        # 权限映射：用户 -> 权限集合
-        self.user_permissions: Dict[str, Set[str]] = {}
+        # 权限映射：用户 -> {视图名 -> 权限集合}（授权少、检查多，集合不可变，授权时重建）
+        self.user_permissions: Dict[str, Dict[str, FrozenSet[str]]] = {}
         
-        # 视图权限映射：视图名 -> 用户权限
-        self.view_permissions: Dict[str, Dict[str, Set[str]]] = {}
+        # 视图权限映射：视图名 -> {用户 -> 权限位掩码}（见 PERM_BITS）
+        self.view_permissions: Dict[str, Dict[str, int]] = {}
         
         # 表权限映射：表名 -> 用户权限
         self.table_permissions: Dict[str, Dict[str, Set[str]]] = {}
+        
+        # 直接授权检查结果缓存：(用户, 视图名, 权限) -> 是否直接授权。
+        # 视图存在性与底层表权限可能随时变化，均不缓存
+        self._perm_cache: 'OrderedDict[Tuple[str, str, str], bool]' = OrderedDict()
+        self.catalog_manager.add_view_change_listener(self._invalidate_permission_cache)
+    
+    def _invalidate_permission_cache(self, view_name: str) -> None:
+        """
+        失效指定视图的权限检查缓存（授权/撤销/视图修改或删除时调用）
+        
+        Args:
+            view_name: 视图名
+        """
+        for key in [key for key in self._perm_cache if key[1] == view_name]:
+            del self._perm_cache[key]
+    
+    def _load_view_or_none(self, view_name: str) -> Optional[ViewInfo]:
+        """一次目录查询获取视图元数据，视图不存在时返回None"""
+        return self.catalog_manager.try_get_view(view_name)
     
     def grant_view_permission(self, user: str, view_name: str, permission: str) -> bool:
         """
@@ -31,40 +77,43 @@ class ViewPermissionManager:
         Args:
             user: 用户名
             view_name: 视图名
-            permission: 权限类型 (SELECT, INSERT, UPDATE, DELETE)
+            permission: 权限类型 (SELECT, INSERT, UPDATE, DELETE，不区分大小写)
             
         Returns:
             bool: 是否成功
         """
+        permission = sys.intern(permission.upper())
+        if permission not in PERM_BITS:
+            logger.warning("不支持的视图权限类型 '%s'", permission)
+            return False
+        
         try:
             # 检查视图是否存在
             if not self.catalog_manager.view_exists(view_name):
-                print(f"❌ 视图 '{view_name}' 不存在")
+                logger.warning("视图 '%s' 不存在", view_name)
                 return False
             
             # 检查用户是否有底层表的权限
             if not self._check_underlying_table_permissions(user, view_name, permission):
-                print(f"❌ 用户 '{user}' 没有视图 '{view_name}' 底层表的权限")
+                logger.warning("用户 '%s' 没有视图 '%s' 底层表的权限", user, view_name)
                 return False
             
-            # 授予权限
-            if view_name not in self.view_permissions:
-                self.view_permissions[view_name] = {}
-            if user not in self.view_permissions[view_name]:
-                self.view_permissions[view_name][user] = set()
+            bit = PERM_BITS[permission]
             
-            self.view_permissions[view_name][user].add(permission)
+            # 授予权限
+            view_users = self.view_permissions.setdefault(view_name, {})
+            view_users[user] = view_users.get(user, 0) | bit
             
             # 更新用户权限
-            if user not in self.user_permissions:
-                self.user_permissions[user] = set()
-            self.user_permissions[user].add(f"{view_name}:{permission}")
+            user_views = self.user_permissions.setdefault(user, {})
+            user_views[view_name] = user_views.get(view_name, frozenset()) | {permission}
             
-            print(f"✅ 已授予用户 '{user}' 对视图 '{view_name}' 的 '{permission}' 权限")
+            self._invalidate_permission_cache(view_name)
+            logger.debug("已授予用户 '%s' 对视图 '%s' 的 '%s' 权限", user, view_name, permission)
             return True
             
         except Exception as e:
-            print(f"❌ 授予权限失败: {str(e)}")
+            logger.error("授予权限失败: %s", e)
             return False
     
     def revoke_view_permission(self, user: str, view_name: str, permission: str) -> bool:
@@ -79,25 +128,32 @@ class ViewPermissionManager:
         Returns:
             bool: 是否成功
         """
+        permission = permission.upper()
         try:
-            if (view_name in self.view_permissions and 
-                user in self.view_permissions[view_name] and 
-                permission in self.view_permissions[view_name][user]):
+            bit = PERM_BITS.get(permission, 0)
+            view_users = self.view_permissions.get(view_name, {})
+            if view_users.get(user, 0) & bit:
                 
-                self.view_permissions[view_name][user].remove(permission)
+                view_users[user] &= ~bit
                 
                 # 更新用户权限
-                if user in self.user_permissions:
-                    self.user_permissions[user].discard(f"{view_name}:{permission}")
+                user_views = self.user_permissions.get(user)
+                if user_views and view_name in user_views:
+                    remaining = user_views[view_name] - {permission}
+                    if remaining:
+                        user_views[view_name] = remaining
+                    else:
+                        del user_views[view_name]
                 
-                print(f"✅ 已撤销用户 '{user}' 对视图 '{view_name}' 的 '{permission}' 权限")
+                self._invalidate_permission_cache(view_name)
+                logger.debug("已撤销用户 '%s' 对视图 '%s' 的 '%s' 权限", user, view_name, permission)
                 return True
             else:
-                print(f"❌ 用户 '{user}' 没有视图 '{view_name}' 的 '{permission}' 权限")
+                logger.warning("用户 '%s' 没有视图 '%s' 的 '%s' 权限", user, view_name, permission)
                 return False
                 
         except Exception as e:
-            print(f"❌ 撤销权限失败: {str(e)}")
+            logger.error("撤销权限失败: %s", e)
             return False
     
     def check_view_permission(self, user: str, view_name: str, permission: str) -> bool:
@@ -112,23 +168,32 @@ class ViewPermissionManager:
         Returns:
             bool: 是否有权限
         """
+        permission = permission.upper()
         try:
-            # 检查视图是否存在
-            if not self.catalog_manager.view_exists(view_name):
+            # 检查视图是否存在（每次都查目录的视图名集合，视图存在性不进缓存）
+            if view_name not in self.catalog_manager.known_view_names():
                 return False
             
-            # 检查直接权限
-            if (view_name in self.view_permissions and 
-                user in self.view_permissions[view_name] and 
-                permission in self.view_permissions[view_name][user]):
-                return True
-            
-            # 检查底层表权限
-            return self._check_underlying_table_permissions(user, view_name, permission)
+            key = (user, view_name, permission)
+            direct = self._perm_cache.get(key)
+            if direct is None:
+                # 检查直接权限（位测试）
+                direct = bool(self.view_permissions.get(view_name, {}).get(user, 0) & PERM_BITS.get(permission, 0))
+                self._perm_cache[key] = direct
+                if len(self._perm_cache) > _PERM_CACHE_SIZE:
+                    self._perm_cache.popitem(last=False)
+            else:
+                self._perm_cache.move_to_end(key)
             
         except Exception as e:
-            print(f"❌ 权限检查失败: {str(e)}")
+            logger.error("权限检查失败: %s", e)
             return False
+        
+        if direct:
+            return True
+        
+        # 底层表权限随表授权变化，不缓存，每次重新检查
+        return self._check_underlying_table_permissions(user, view_name, permission)
     
     def _check_underlying_table_permissions(self, user: str, view_name: str, permission: str) -> bool:
         """
@@ -159,7 +224,7 @@ class ViewPermissionManager:
             return True
             
         except Exception as e:
-            print(f"❌ 底层表权限检查失败: {str(e)}")
+            logger.error("底层表权限检查失败: %s", e)
             return False
     
     def _check_table_permission(self, user: str, table_name: str, permission: str) -> bool:
@@ -180,25 +245,9 @@ class ViewPermissionManager:
     
     def _extract_table_names_from_definition(self, definition: str) -> List[str]:
         """从视图定义中提取表名"""
-        table_names = []
-        
-        try:
-            # 使用正则表达式提取FROM子句中的表名
-            from_pattern = r'FROM\s+(\w+)'
-            matches = re.findall(from_pattern, definition.upper())
-            table_names.extend(matches)
-            
-            # 处理JOIN子句中的表名
-            join_pattern = r'JOIN\s+(\w+)'
-            join_matches = re.findall(join_pattern, definition.upper())
-            table_names.extend(join_matches)
-            
-        except Exception as e:
-            print(f"提取表名失败: {str(e)}")
-        
-        return table_names
+        return list(extract_base_tables(definition))
     
-    def get_user_permissions(self, user: str) -> Dict[str, Set[str]]:
+    def get_user_permissions(self, user: str) -> Dict[str, FrozenSet[str]]:
         """
         获取用户的所有权限
         
@@ -206,9 +255,9 @@ class ViewPermissionManager:
             user: 用户名
             
         Returns:
-            Dict[str, Set[str]]: 权限映射
+            Dict[str, FrozenSet[str]]: 视图名 -> 权限集合
         """
-        return self.view_permissions.get(user, {})
+        return self.user_permissions.get(user, {})
     
     def get_view_permissions(self, view_name: str) -> Dict[str, Set[str]]:
         """
@@ -220,16 +269,17 @@ class ViewPermissionManager:
         Returns:
             Dict[str, Set[str]]: 用户权限映射
         """
-        return self.view_permissions.get(view_name, {})
+        return {user: _decode_permission_bits(bits)
+                for user, bits in self.view_permissions.get(view_name, {}).items()}
     
     def list_view_permissions(self) -> Dict[str, Dict[str, Set[str]]]:
         """
-        列出所有视图权限
+        列出所有视图权限（由权限位掩码按需解码，修改返回值不影响内部状态）
         
         Returns:
             Dict[str, Dict[str, Set[str]]]: 所有视图权限
         """
-        return self.view_permissions.copy()
+        return {view_name: self.get_view_permissions(view_name) for view_name in self.view_permissions}
     
     def validate_view_creation_permissions(self, user: str, view_definition: str) -> Tuple[bool, str]:
         """
@@ -267,23 +317,20 @@ class ViewPermissionManager:
             Dict[str, Any]: 安全性信息
         """
         try:
-            if not self.catalog_manager.view_exists(view_name):
+            view_info = self._load_view_or_none(view_name)
+            if view_info is None:
                 return {"secure": False, "error": "视图不存在"}
             
-            view_info = self.catalog_manager.get_view(view_name)
-            
             # 检查视图定义是否包含敏感信息
             security_issues = []
             
             # 检查是否包含密码字段
-            if re.search(r'password|pwd|pass', view_info.definition, re.IGNORECASE):
+            if _SENSITIVE_RE.search(view_info.definition):
                 security_issues.append("视图定义包含密码字段")
             
             # 检查是否包含敏感表
-            sensitive_tables = ['user', 'admin', 'system', 'config']
-            table_names = self._extract_table_names_from_definition(view_info.definition)
-            for table_name in table_names:
-                if any(sensitive in table_name.lower() for sensitive in sensitive_tables):
+            for table_name in extract_base_tables(view_info.definition):
+                if _SENSITIVE_TABLE_RE.search(table_name):
                     security_issues.append(f"视图引用了敏感表: {table_name}")
             
             return {
@@ -312,15 +359,15 @@ class ViewPermissionManager:
         try:
             # 检查权限
             if not self.check_view_permission(user, view_name, operation):
-                print(f"❌ 审计失败: 用户 '{user}' 没有视图 '{view_name}' 的 '{operation}' 权限")
+                logger.warning("审计失败: 用户 '%s' 没有视图 '%s' 的 '%s' 权限", user, view_name, operation)
                 return False
             
             # 记录访问日志（简化实现）
-            print(f"📝 审计日志: 用户 '{user}' 对视图 '{view_name}' 执行 '{operation}' 操作")
+            logger.info("审计日志: 用户 '%s' 对视图 '%s' 执行 '%s' 操作", user, view_name, operation)
             
             return True
             
         except Exception as e:
-            print(f"❌ 审计失败: {str(e)}")
+            logger.error("审计失败: %s", e)
             return False
 
@@ -5,57 +5,72 @@
 每个类代表了 SQL 语言中的一个语法构造。
 """
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from dataclasses import MISSING, dataclass, field, fields, is_dataclass
+from functools import partial
+from typing import TYPE_CHECKING, List, Optional
+import sys
 
 from .sql_token import Token
 
+if TYPE_CHECKING:
+    from typing import Union
+
+
+# AST 节点数量与 SQL 规模成正比，使用 __slots__ 去掉每个实例的 __dict__（Python 3.10+）
+_node_dataclass = partial(dataclass, slots=True) if sys.version_info >= (3, 10) else dataclass
+
 
 # --- 基础节点 ---
 
 class ASTNode:
     """所有 AST 节点的基类，用于类型检查和未来的扩展。"""
-    pass
+    __slots__ = ()
 
 
 # --- 表达式节点 (Expressions) ---
 # 表达式是会产生一个值的代码片段，例如字面量、列名、二元运算等。
 
-@dataclass
+@_node_dataclass
 class Literal(ASTNode):
     """字面量节点，如数字 '123' 或字符串 'hello'。"""
     token: Token  # The token representing the literal (e.g., NUMBER, STRING)
     value: Union[int, float, str]
 
-@dataclass
+@_node_dataclass
 class Identifier(ASTNode):
     """标识符节点，如表名或列名。"""
     token: Token  # The IDENTIFIER token
     value: str
 
-@dataclass
+@_node_dataclass
 class BinaryExpr(ASTNode):
     """二元表达式节点，如 'age > 20'。"""
     left: 'Expression'        # 左操作数
     operator: Token           # 操作符 (e.g., =, >, <)
     right: 'Expression'       # 右操作数
+    _str: Optional[str] = field(default=None, init=False, repr=False, compare=False)  # __str__ 结果缓存
     
     def __str__(self):
         """返回简洁的表达式字符串，如 'quantity * unit_price'"""
-        left_str = str(self.left.value) if hasattr(self.left, 'value') else str(self.left)
-        right_str = str(self.right.value) if hasattr(self.right, 'value') else str(self.right)
-        op_str = self.operator[1] if isinstance(self.operator, tuple) else str(self.operator)
-        return f"{left_str} {op_str} {right_str}"
-
-@dataclass
+        if self._str is None:
+            left_str = str(self.left.value) if hasattr(self.left, 'value') else str(self.left)
+            right_str = str(self.right.value) if hasattr(self.right, 'value') else str(self.right)
+            op_str = self.operator[1] if isinstance(self.operator, tuple) else str(self.operator)
+            self._str = f"{left_str} {op_str} {right_str}"
+        return self._str
+
+@_node_dataclass
 class SubqueryExpression(ASTNode):
     """子查询表达式节点，如 '(SELECT id FROM table)'。"""
     subquery: 'SelectStatement'  # 子查询语句
+    _str: Optional[str] = field(default=None, init=False, repr=False, compare=False)  # __str__ 结果缓存
     
     def __str__(self):
-        return f"({self.subquery})"
+        if self._str is None:
+            self._str = f"({self.subquery})"
+        return self._str
 
-@dataclass
+@_node_dataclass
 class AggregateFunction(ASTNode):
     """聚合函数节点，如 COUNT(*), SUM(column), AVG(column) 等。"""
     function_name: str        # 函数名 (COUNT, SUM, AVG, MIN, MAX)
@@ -66,33 +81,57 @@ class AggregateFunction(ASTNode):
 # --- 语句节点 (Statements) ---
 # 语句是执行一个动作的完整指令。
 
-@dataclass
+# 常见列级约束的位标志；DEFAULT/CHECK 等带参数的约束放在 extra_constraints 中
+CONSTRAINT_PRIMARY_KEY = 1 << 0
+CONSTRAINT_NOT_NULL = 1 << 1
+CONSTRAINT_UNIQUE = 1 << 2
+CONSTRAINT_AUTO_INCREMENT = 1 << 3
+
+# 约束名 -> 位标志（按位序排列，用于解码显示）
+CONSTRAINT_FLAGS = {
+    'PRIMARY KEY': CONSTRAINT_PRIMARY_KEY,
+    'NOT NULL': CONSTRAINT_NOT_NULL,
+    'UNIQUE': CONSTRAINT_UNIQUE,
+    'AUTO_INCREMENT': CONSTRAINT_AUTO_INCREMENT,
+}
+
+
+def constraint_names(flags: int, extra_constraints: Optional[List[str]] = None) -> List[str]:
+    """将约束位标志（及附加约束）还原为约束名列表，用于显示。"""
+    names = [name for name, bit in CONSTRAINT_FLAGS.items() if flags & bit]
+    if extra_constraints:
+        names.extend(extra_constraints)
+    return names
+
+
+@_node_dataclass
 class ColumnDefinition(ASTNode):
     """列定义节点，用于 CREATE TABLE 语句。"""
     column_name: Identifier
     data_type: Token  # The data type token (e.g., INT, VARCHAR)
-    constraints: List[str] = field(default_factory=list)  # 列级约束
+    constraints: int = 0  # 列级约束位标志 (CONSTRAINT_*)
+    extra_constraints: Optional[List[str]] = None  # 其他列级约束（DEFAULT/CHECK 等），仅在需要时分配
 
-@dataclass
+@_node_dataclass
 class ForeignKeyConstraint(ASTNode):
     """外键约束节点"""
     column_name: Identifier
     ref_table_name: Identifier
     ref_column_name: Identifier
 
-@dataclass
+@_node_dataclass
 class PrimaryKeyConstraint(ASTNode):
     """主键约束节点"""
     column_names: List[Identifier]
 
-@dataclass
+@_node_dataclass
 class UniqueConstraint(ASTNode):
     """唯一约束节点"""
     column_names: List[Identifier]
 
 # --- 触发器相关节点 ---
 
-@dataclass
+@_node_dataclass
 class CreateTriggerStatement(ASTNode):
     """CREATE TRIGGER 语句节点"""
     trigger_name: Identifier
@@ -103,23 +142,23 @@ class CreateTriggerStatement(ASTNode):
     when_condition: Optional['Expression'] = None  # WHEN 条件
     trigger_body: List['Statement'] = field(default_factory=list)  # BEGIN...END 块中的语句
 
-@dataclass
+@_node_dataclass
 class DropTriggerStatement(ASTNode):
     """DROP TRIGGER 语句节点"""
     trigger_name: Identifier
 
-@dataclass
+@_node_dataclass
 class ShowTriggersStatement(ASTNode):
     """SHOW TRIGGERS 语句节点"""
     pass
 
-@dataclass
+@_node_dataclass
 class OldNewReference(ASTNode):
     """OLD/NEW 引用节点"""
     reference_type: str  # 'OLD' 或 'NEW'
     column_name: Identifier
 
-@dataclass
+@_node_dataclass
 class WhenCondition(ASTNode):
     """WHEN 条件节点"""
     condition: 'Expression'
@@ -128,33 +167,33 @@ class WhenCondition(ASTNode):
         """提供encode方法以兼容序列化需求"""
         return str(self).encode(encoding)
 
-@dataclass
+@_node_dataclass
 class IfStatement(ASTNode):
     """IF 语句节点"""
     condition: 'Expression'
     then_statements: List['Statement']
     else_statements: List['Statement'] = field(default_factory=list)
 
-@dataclass
+@_node_dataclass
 class SignalStatement(ASTNode):
     """SIGNAL 语句节点"""
     sqlstate: str
     message: str
 
-@dataclass
+@_node_dataclass
 class CreateTableStatement(ASTNode):
     """CREATE TABLE 语句节点。"""
     table_name: Identifier
     columns: List[ColumnDefinition]
     constraints: List[Union[ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint]] = field(default_factory=list)
 
-@dataclass
+@_node_dataclass
 class InsertStatement(ASTNode):
     """INSERT INTO 语句节点。"""
     table_name: Identifier
     values: List[Literal]  # 简化版：只支持字面量列表
 
-@dataclass
+@_node_dataclass
 class SelectStatement(ASTNode):
     """SELECT 语句节点。"""
     select_list: List[Union[Identifier, Token, AggregateFunction]]  # 列名列表、'*' 或聚合函数
@@ -162,21 +201,21 @@ class SelectStatement(ASTNode):
     joins: List['Join'] = field(default_factory=list)  # JOIN子句列表
     where_clause: Optional[BinaryExpr] = None
 
-@dataclass
+@_node_dataclass
 class UpdateStatement(ASTNode):
     """UPDATE 语句节点。"""
     table_name: Identifier
     set_clause: List[tuple]  # [(column, value), ...]
     where_clause: Optional[BinaryExpr] = None
 
-@dataclass
+@_node_dataclass
 class DeleteStatement(ASTNode):
     """DELETE 语句节点。"""
     table_name: Identifier
     where_clause: Optional[BinaryExpr] = None
 
 
-@dataclass
+@_node_dataclass
 class Join(ASTNode):
     """JOIN子句节点。"""
     join_type: str  # 'INNER', 'LEFT', 'RIGHT', 'FULL'
@@ -184,7 +223,7 @@ class Join(ASTNode):
     condition: 'JoinCondition'
 
 
-@dataclass
+@_node_dataclass
 class JoinCondition(ASTNode):
     """JOIN条件节点。"""
     left_table: str
@@ -194,7 +233,7 @@ class JoinCondition(ASTNode):
     right_column: str
 
 
-@dataclass
+@_node_dataclass
 class TableReference(ASTNode):
     """表引用节点。"""
     table_name: str
@@ -202,7 +241,7 @@ class TableReference(ASTNode):
 
 # --- 触发器相关节点 ---
 
-@dataclass
+@_node_dataclass
 class CreateTriggerStatement(ASTNode):
     """CREATE TRIGGER 语句节点。"""
     trigger_name: Identifier
@@ -213,66 +252,115 @@ class CreateTriggerStatement(ASTNode):
     when_condition: Optional['Expression'] = None
     trigger_body: List['Statement'] = field(default_factory=list)
 
-@dataclass
+@_node_dataclass
 class DropTriggerStatement(ASTNode):
     """DROP TRIGGER 语句节点。"""
     trigger_name: Identifier
 
-@dataclass
+@_node_dataclass
 class TriggerBody(ASTNode):
     """触发器主体节点。"""
     statements: List['Statement']
 
-@dataclass
+@_node_dataclass
 class OldNewReference(ASTNode):
     """OLD/NEW 引用节点，用于触发器中的OLD.column和NEW.column。"""
     reference_type: str  # OLD 或 NEW
     column_name: Identifier
 
-@dataclass
+@_node_dataclass
 class WhenCondition(ASTNode):
     """WHEN 条件节点。"""
     condition: 'Expression'
 
-@dataclass
+@_node_dataclass
 class IfStatement(ASTNode):
     """IF 语句节点。"""
     condition: 'Expression'
     then_statements: List['Statement']
     else_statements: Optional[List['Statement']] = None
 
-@dataclass
+@_node_dataclass
 class ShowTriggers(ASTNode):
     """SHOW TRIGGERS 语句节点。"""
     pass
 
 # 类型定义 - 放在所有类定义之后
-# Expression 类型可以是任何表达式节点的联合
-Expression = Union[Literal, Identifier, BinaryExpr, AggregateFunction, OldNewReference]
+# Expression 类型可以是任何表达式节点的联合（仅供类型检查；运行时为 object，不构造 typing.Union）
+if TYPE_CHECKING:
+    Expression = Union[Literal, Identifier, BinaryExpr, AggregateFunction, OldNewReference]
+else:
+    Expression = object
 
-@dataclass
+@_node_dataclass
 class DeclareCursorStatement(ASTNode):
     """DECLARE CURSOR 语句节点"""
     cursor_name: Identifier
     query: 'SelectStatement'  # 游标的核心是它所关联的SELECT查询
 
-@dataclass
+@_node_dataclass
 class OpenCursorStatement(ASTNode):
     """OPEN CURSOR 语句节点"""
     cursor_name: Identifier
 
-@dataclass
+@_node_dataclass
 class FetchCursorStatement(ASTNode):
     """FETCH CURSOR 语句节点"""
     cursor_name: Identifier
 
-@dataclass
+@_node_dataclass
 class CloseCursorStatement(ASTNode):
     """CLOSE CURSOR 语句节点"""
     cursor_name: Identifier
 
-# Statement 类型可以是任何语句节点的联合
-Statement = Union[CreateTableStatement, InsertStatement, SelectStatement, CreateTriggerStatement, 
-                 DropTriggerStatement, ShowTriggersStatement, IfStatement, UpdateStatement, DeleteStatement, 
-                 ShowTriggers, SignalStatement, DeclareCursorStatement, OpenCursorStatement, 
-                 FetchCursorStatement, CloseCursorStatement]
+# Statement 类型可以是任何语句节点的联合（同上，仅供类型检查）
+if TYPE_CHECKING:
+    Statement = Union[CreateTableStatement, InsertStatement, SelectStatement, CreateTriggerStatement, 
+                     DropTriggerStatement, ShowTriggersStatement, IfStatement, UpdateStatement, DeleteStatement, 
+                     ShowTriggers, SignalStatement, DeclareCursorStatement, OpenCursorStatement, 
+                     FetchCursorStatement, CloseCursorStatement]
+else:
+    Statement = object
+
+
+# --- 快速构造函数 ---
+# 语法分析器构造节点的快速路径：按每个节点类的字段生成专用构造函数 cls._fast_make，
+# 只做 object.__new__ 加逐个槽位赋值，跳过 type.__call__ -> __init__ 的调用分派。
+# 参数顺序与默认值与 dataclass 生成的 __init__ 一致。
+
+def _gen_fast_make(cls):
+    """为 AST 节点类生成并挂载 _fast_make 构造函数。"""
+    namespace = {'_new': object.__new__, '_cls': cls, '_MISSING': MISSING}
+    params, body = [], []
+    for f in fields(cls):
+        if f.default_factory is not MISSING:
+            namespace[f'_f_{f.name}'] = f.default_factory
+        elif f.default is not MISSING:
+            namespace[f'_d_{f.name}'] = f.default
+        
+        if not f.init:
+            # 不在构造参数中的字段（如 _str 缓存），直接写默认值
+            value = f'_f_{f.name}()' if f.default_factory is not MISSING else f'_d_{f.name}'
+            body.append(f'    o.{f.name} = {value}')
+            continue
+        
+        if f.default_factory is not MISSING:
+            params.append(f'{f.name}=_MISSING')
+            body.append(f'    o.{f.name} = _f_{f.name}() if {f.name} is _MISSING else {f.name}')
+        else:
+            params.append(f'{f.name}=_d_{f.name}' if f.default is not MISSING else f.name)
+            body.append(f'    o.{f.name} = {f.name}')
+    
+    src = f"def _fast_make({', '.join(params)}):\n    o = _new(_cls)\n" + ''.join(line + '\n' for line in body) + "    return o\n"
+    exec(compile(src, f'<fast_make {cls.__name__}>', 'exec'), namespace)
+    cls._fast_make = staticmethod(namespace['_fast_make'])
+
+
+for _node_cls in list(globals().values()):
+    if isinstance(_node_cls, type) and issubclass(_node_cls, ASTNode) and is_dataclass(_node_cls):
+        _gen_fast_make(_node_cls)
+del _node_cls
+
+# 最常见的两类节点，语法分析器直接调用
+new_literal = Literal._fast_make
+new_identifier = Identifier._fast_make
@@ -2,14 +2,11 @@
 """
 增强的错误处理系统
 """
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Dict, Any
+from io import StringIO
+from functools import lru_cache
+from dataclasses import dataclass, field
 from enum import Enum
-import sys
-import os
-
-# 添加路径以便导入
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
 class ErrorSeverity(Enum):
@@ -30,9 +27,15 @@ class ErrorCategory(Enum):
     SYSTEM = "system"
 
 
-@dataclass
-class ErrorLocation:
-    """错误位置信息"""
+# 热路径上使用的枚举成员与严重程度显示文本，模块加载时解析一次
+_SEV_STR = {severity: severity.value.upper() for severity in ErrorSeverity}
+_SEV_WARNING = ErrorSeverity.WARNING
+_SEV_FATAL = ErrorSeverity.FATAL
+_CAT_SYSTEM = ErrorCategory.SYSTEM
+
+
+class ErrorLocation(NamedTuple):
+    """错误位置信息（不可变，按元组存储）"""
     line: int
     column: int
     length: int = 1
@@ -51,35 +54,156 @@ class CompilerError:
     sql: str = ""
     suggestion: str = ""
     error_code: str = ""
+    # 按行切分后的 sql，由 ErrorCollector 在同一 sql 的多个错误间共享
+    _sql_lines: Optional[List[str]] = field(default=None, repr=False, compare=False)
     
     def __str__(self):
-        result = f"{self.severity.value.upper()}: {self.message}"
-        
-        if self.location:
-            result += f" at {self.location}"
-        
-        if self.suggestion:
-            result += f"\nSuggestion: {self.suggestion}"
-        
-        if self.error_code:
-            result += f"\nError Code: {self.error_code}"
-        
-        if self.sql and self.location:
-            result += f"\n{self._highlight_error()}"
-        
-        return result
+        return _format_issue(self.severity, self.message, self.location, self.suggestion,
+                             self.error_code, self.sql, self._sql_lines)
+    
+    def write_to(self, buf: StringIO):
+        """将格式化结果逐段写入缓冲区"""
+        _write_issue(buf, self.severity, self.message, self.location, self.suggestion,
+                     self.error_code, self.sql, self._sql_lines)
     
     def _highlight_error(self) -> str:
         """高亮显示错误位置"""
-        if not self.sql or not self.location:
-            return ""
-        
-        lines = self.sql.split('\n')
-        if self.location.line <= len(lines):
-            error_line = lines[self.location.line - 1]
-            pointer = " " * (self.location.column - 1) + "^" * self.location.length
-            return f"{error_line}\n{pointer}"
+        return _highlight(self.sql, self._sql_lines, self.location)
+
+
+def _format_issue(severity: ErrorSeverity, message: str, location: Optional[ErrorLocation],
+                  suggestion: str, error_code: str, sql: str, sql_lines: Optional[List[str]]) -> str:
+    """按字段格式化一条错误/警告（CompilerError 与 ErrorCollector 列存储共用）"""
+    buf = StringIO()
+    _write_issue(buf, severity, message, location, suggestion, error_code, sql, sql_lines)
+    return buf.getvalue()
+
+
+def _write_issue(buf: StringIO, severity: ErrorSeverity, message: str, location: Optional[ErrorLocation],
+                 suggestion: str, error_code: str, sql: str, sql_lines: Optional[List[str]]):
+    """将一条错误/警告逐段写入缓冲区，不生成中间字符串"""
+    buf.write(_SEV_STR[severity])
+    buf.write(": ")
+    buf.write(message)
+    
+    if location:
+        buf.write(" at ")
+        buf.write(str(location))
+    
+    if suggestion:
+        buf.write("\nSuggestion: ")
+        buf.write(suggestion)
+    
+    if error_code:
+        buf.write("\nError Code: ")
+        buf.write(error_code)
+    
+    if sql and location:
+        buf.write("\n")
+        buf.write(_highlight(sql, sql_lines, location))
+
+
+def _highlight(sql: str, sql_lines: Optional[List[str]], location: Optional[ErrorLocation]) -> str:
+    """高亮显示错误位置"""
+    if not sql or not location:
         return ""
+    
+    lines = sql_lines if sql_lines is not None else sql.splitlines()
+    if location.line <= len(lines):
+        error_line = lines[location.line - 1]
+        return f"{error_line}\n{_pointer(location.column, location.length)}"
+    return ""
+
+
+@lru_cache(maxsize=1024)
+def _pointer(column: int, length: int) -> str:
+    """错误位置指示串（列前空格 + ^），按 (列, 长度) 缓存"""
+    return " " * (column - 1) + "^" * length
+
+
+class _IssueColumns:
+    """
+    错误/警告的列式存储（SoA）：每个字段一列，按下标对齐。
+    计数、按列扫描和格式化报告只触及需要的列；按需物化为 CompilerError。
+    消息只保存模板与参数，首次渲染时才格式化（只计数不输出的错误不做格式化）。
+    给定 limit 时只保留最早的 limit 条（通常是根因），之后的条目只计数（见 overflow）。
+    """
+    __slots__ = ('messages', 'message_args', 'categories', 'severities', 'locations',
+                 'sqls', 'sql_lines', 'suggestions', 'codes', 'limit', 'overflow')
+    
+    def __init__(self, limit: Optional[int] = None):
+        self.messages: List[str] = []  # 消息模板；对应参数为None时即为最终消息
+        self.message_args: List[Optional[Dict[str, Any]]] = []
+        self.categories: List[ErrorCategory] = []
+        self.severities: List[ErrorSeverity] = []
+        self.locations: List[Optional[ErrorLocation]] = []
+        self.sqls: List[str] = []
+        self.sql_lines: List[Optional[List[str]]] = []
+        self.suggestions: List[str] = []
+        self.codes: List[str] = []
+        self.limit = limit
+        self.overflow = 0  # 超出 limit 未保存的条目数
+    
+    def append(self, message: str, message_args: Optional[Dict[str, Any]],
+               category: ErrorCategory, severity: ErrorSeverity,
+               location: Optional[ErrorLocation], sql: str, sql_lines: Optional[List[str]],
+               suggestion: str, error_code: str):
+        """追加一行（已达 limit 时不保存，只计入 overflow）"""
+        if self.limit is not None and len(self.messages) >= self.limit:
+            self.overflow += 1
+            return
+        self.messages.append(message)
+        self.message_args.append(message_args)
+        self.categories.append(category)
+        self.severities.append(severity)
+        self.locations.append(location)
+        self.sqls.append(sql)
+        self.sql_lines.append(sql_lines)
+        self.suggestions.append(suggestion)
+        self.codes.append(error_code)
+    
+    def __len__(self) -> int:
+        return len(self.messages)
+    
+    def message(self, index: int) -> str:
+        """获取第 index 行的消息，首次访问时格式化并缓存"""
+        args = self.message_args[index]
+        if args is not None:
+            self.messages[index] = self.messages[index].format_map(args)
+            self.message_args[index] = None
+        return self.messages[index]
+    
+    def __getitem__(self, index: int) -> CompilerError:
+        """物化第 index 行为 CompilerError"""
+        return CompilerError(self.message(index), self.categories[index], self.severities[index],
+                             self.locations[index], self.sqls[index], self.suggestions[index],
+                             self.codes[index], self.sql_lines[index])
+    
+    def __iter__(self):
+        # 顺序遍历各列，不逐行按下标取值
+        for message, args, category, severity, location, sql, suggestion, code, sql_lines in zip(
+                self.messages, self.message_args, self.categories, self.severities, self.locations,
+                self.sqls, self.suggestions, self.codes, self.sql_lines):
+            if args is not None:
+                message = message.format_map(args)
+            yield CompilerError(message, category, severity, location, sql, suggestion, code, sql_lines)
+    
+    def write_rows(self, buf: StringIO):
+        """顺序遍历各列，将编号后的各行写入缓冲区（每行以换行开头）"""
+        for number, (message, args, severity, location, suggestion, code, sql, sql_lines) in enumerate(zip(
+                self.messages, self.message_args, self.severities, self.locations,
+                self.suggestions, self.codes, self.sqls, self.sql_lines), 1):
+            if args is not None:
+                message = message.format_map(args)
+            buf.write(f"\n  {number}. ")
+            _write_issue(buf, severity, message, location, suggestion, code, sql, sql_lines)
+    
+    def clear(self):
+        """清空所有列"""
+        for column in (self.messages, self.message_args, self.categories, self.severities, self.locations,
+                       self.sqls, self.sql_lines, self.suggestions, self.codes):
+            column.clear()
+        self.overflow = 0
 
 
 class ErrorRegistry:
@@ -175,63 +299,120 @@ class ErrorRegistry:
                 "suggestion": "Add column to GROUP BY or use aggregate function"
             }
         }
+        
+        # 预编译错误模板：错误码 -> 下标，下标 -> (类别, 严重程度, 建议, 消息模板)
+        # 模板按下标平铺在元组中，已知下标的调用方（见 code_index）可跳过错误码查找
+        self._code_to_idx = {code: i for i, code in enumerate(self.errors)}
+        self._infos = tuple(
+            (info["category"], info["severity"], info.get("suggestion", ""), info["message"])
+            for info in self.errors.values()
+        )
     
-    def create_error(self, error_code: str, **kwargs) -> CompilerError:
-        """创建错误对象"""
-        if error_code not in self.errors:
-            return CompilerError(
-                message=f"Unknown error: {error_code}",
-                category=ErrorCategory.SYSTEM,
-                severity=ErrorSeverity.FATAL,
-                error_code=error_code
-            )
+    def code_index(self, error_code: str) -> Optional[int]:
+        """
+        获取错误码对应的模板下标
         
-        error_info = self.errors[error_code]
-        message = error_info["message"].format(**kwargs)
+        Args:
+            error_code: 错误码
+            
+        Returns:
+            Optional[int]: 模板下标，未知错误码返回None
+        """
+        return self._code_to_idx.get(error_code)
+    
+    def resolve(self, error_code: str, kwargs: Dict[str, Any], index: Optional[int] = None) -> tuple:
+        """
+        解析错误码为 (消息, 类别, 严重程度, 建议)，未知错误码返回系统致命错误
         
-        # 只传递CompilerError支持的参数
-        error_kwargs = {}
-        if 'location' in kwargs:
-            error_kwargs['location'] = kwargs['location']
-        if 'sql' in kwargs:
-            error_kwargs['sql'] = kwargs['sql']
-        if 'suggestion' in kwargs:
-            error_kwargs['suggestion'] = kwargs['suggestion']
+        Args:
+            error_code: 错误码
+            kwargs: 消息模板参数
+            index: 预先通过 code_index 得到的模板下标（可选）
+            
+        Returns:
+            tuple: (message, category, severity, suggestion)
+        """
+        template, args, category, severity, suggestion = self.resolve_template(error_code, kwargs, index)
+        message = template.format_map(args) if args is not None else template
+        return message, category, severity, suggestion
+    
+    def resolve_template(self, error_code: str, kwargs: Dict[str, Any],
+                         index: Optional[int] = None) -> tuple:
+        """
+        与 resolve 相同，但不格式化消息，由调用方在渲染时再格式化
         
-        return CompilerError(
-            message=message,
-            category=error_info["category"],
-            severity=error_info["severity"],
-            suggestion=error_info.get("suggestion", ""),
-            error_code=error_code,
-            **error_kwargs
-        )
+        Returns:
+            tuple: (模板, 模板参数, 类别, 严重程度, 建议)；模板参数为None表示模板即最终消息
+        """
+        if index is None:
+            index = self._code_to_idx.get(error_code)
+            if index is None:
+                return f"Unknown error: {error_code}", None, _CAT_SYSTEM, _SEV_FATAL, ""
+        category, severity, suggestion, template = self._infos[index]
+        return template, kwargs, category, severity, suggestion
+    
+    def create_error(self, error_code: str, severity_override: Optional[ErrorSeverity] = None,
+                     **kwargs) -> CompilerError:
+        """创建错误对象（severity_override 指定时覆盖注册表中的严重程度）"""
+        # 先取出 CompilerError 自身的字段，剩余参数只用于消息模板
+        location = kwargs.pop('location', None)
+        sql = kwargs.pop('sql', "")
+        suggestion_override = kwargs.pop('suggestion', None)
+        
+        message, category, severity, suggestion = self.resolve(error_code, kwargs)
+        if suggestion_override is not None:
+            suggestion = suggestion_override
+        if severity_override is not None:
+            severity = severity_override
+        
+        return CompilerError(message, category, severity, location, sql, suggestion, error_code)
 
 
 class ErrorCollector:
     """错误收集器"""
     
-    def __init__(self):
-        self.errors: List[CompilerError] = []
-        self.warnings: List[CompilerError] = []
+    def __init__(self, max_issues: Optional[int] = None):
+        # 错误与警告按列存储，见 _IssueColumns；max_issues 限制各自保留的条目数（None 不限），
+        # 超出的条目只计数，报告末尾注明省略的数量
+        self.errors = _IssueColumns(max_issues)
+        self.warnings = _IssueColumns(max_issues)
         self.registry = ErrorRegistry()
+        # sql -> 按行切分结果，同一 sql 的多个错误只切分一次
+        self._sql_lines_cache: Dict[str, List[str]] = {}
+    
+    def _get_sql_lines(self, sql: str) -> Optional[List[str]]:
+        """获取（并缓存）sql 的按行切分结果"""
+        if not sql:
+            return None
+        lines = self._sql_lines_cache.get(sql)
+        if lines is None:
+            lines = self._sql_lines_cache[sql] = sql.splitlines()
+        return lines
     
     def add_error(self, error_code: str, location: Optional[ErrorLocation] = None, 
-                  sql: str = "", **kwargs):
-        """添加错误"""
-        error = self.registry.create_error(error_code, **kwargs)
-        error.location = location
-        error.sql = sql
-        self.errors.append(error)
+                  sql: str = "", severity: Optional[ErrorSeverity] = None, **kwargs):
+        """
+        添加错误（severity 为 WARNING 时记入警告）
+        
+        Args:
+            error_code: 错误码
+            location: 错误位置
+            sql: 出错的SQL
+            severity: 覆盖注册表中的严重程度（可选）
+            **kwargs: 消息模板参数
+        """
+        template, args, category, default_severity, suggestion = \
+            self.registry.resolve_template(error_code, kwargs)
+        if severity is None:
+            severity = default_severity
+        issues = self.warnings if severity is _SEV_WARNING else self.errors
+        issues.append(template, args, category, severity, location, sql,
+                      self._get_sql_lines(sql), suggestion, error_code)
     
     def add_warning(self, error_code: str, location: Optional[ErrorLocation] = None, 
                     sql: str = "", **kwargs):
         """添加警告"""
-        warning = self.registry.create_error(error_code, **kwargs)
-        warning.severity = ErrorSeverity.WARNING
-        warning.location = location
-        warning.sql = sql
-        self.warnings.append(warning)
+        self.add_error(error_code, location, sql, _SEV_WARNING, **kwargs)
     
     def has_errors(self) -> bool:
         """检查是否有错误"""
@@ -243,47 +424,46 @@ class ErrorCollector:
     
     def get_errors(self) -> List[CompilerError]:
         """获取所有错误"""
-        return self.errors.copy()
+        return list(self.errors)
     
     def get_warnings(self) -> List[CompilerError]:
         """获取所有警告"""
-        return self.warnings.copy()
+        return list(self.warnings)
     
     def get_all_issues(self) -> List[CompilerError]:
         """获取所有问题和警告"""
-        return self.errors + self.warnings
+        return list(self.errors) + list(self.warnings)
     
     def clear(self):
         """清空所有错误和警告"""
         self.errors.clear()
         self.warnings.clear()
+        self._sql_lines_cache.clear()
     
     def format_report(self) -> str:
         """格式化错误报告"""
         if not self.has_errors() and not self.has_warnings():
             return "No errors or warnings found."
         
-        report = []
-        
-        if self.has_errors():
-            report.append("Errors:")
-            for i, error in enumerate(self.errors, 1):
-                report.append(f"  {i}. {error}")
-        
-        if self.has_warnings():
-            report.append("Warnings:")
-            for i, warning in enumerate(self.warnings, 1):
-                report.append(f"  {i}. {warning}")
-        
-        return "\n".join(report)
+        # 所有分区与条目写入同一个缓冲区
+        buf = StringIO()
+        for title, noun, issues in (("Errors:", "errors", self.errors), ("Warnings:", "warnings", self.warnings)):
+            if issues:
+                if buf.tell():
+                    buf.write("\n")
+                buf.write(title)
+                issues.write_rows(buf)
+                if issues.overflow:
+                    buf.write(f"\n  ... {issues.overflow} more {noun}")
+        return buf.getvalue()
 
 
 class ErrorHandler:
     """错误处理器"""
     
     def __init__(self):
-        self.collector = ErrorCollector()
         self.max_errors = 100  # 最大错误数量
+        self.collector = ErrorCollector(self.max_errors)
     
     def handle_lexical_error(self, token: str, line: int, column: int, sql: str = ""):
         """处理词法错误"""
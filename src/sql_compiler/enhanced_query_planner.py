@@ -2,7 +2,7 @@
 """
 增强的查询规划器 - 支持JOIN、子查询、聚合函数
 """
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Callable, Tuple
 from .logical_operators import (
     LogicalOperator, ScanOperator, FilterOperator, ProjectOperator,
     InsertOperator, UpdateOperator, DeleteOperator, LogicalPlan,
@@ -14,9 +14,24 @@ from .logical_operators import (
     GroupByOperator, HavingOperator, DeclareCursorOperator, OpenCursorOperator,
     FetchCursorOperator, CloseCursorOperator,
     BeginTransactionOperator, CommitTransactionOperator, RollbackTransactionOperator,
-    ColumnReference, Expression, LiteralExpression, ColumnExpression, BinaryExpression
+    ColumnReference, Expression, LiteralExpression, ColumnExpression, BinaryExpression,
+    JoinType, JoinMethod, AggregateExpression, SubqueryExpression, InExpression, InSubqueryExpression
 )
 from .symbol_table import SymbolTable, DataType
+from .ast_nodes import (
+    Literal, Identifier, BinaryExpr, AggregateFunction,
+    CreateTriggerStatement, DropTriggerStatement, ShowTriggersStatement, ShowTriggers,
+    DeclareCursorStatement, OpenCursorStatement, FetchCursorStatement, CloseCursorStatement
+)
+from .new_syntax_analyzer import (
+    Select, CreateIndex, DropIndex, CreateView, AlterView, DropView,
+    ShowTables, ShowViews, ShowColumns, ShowIndex, Explain,
+    BeginTransactionStatement, CommitTransactionStatement, RollbackTransactionStatement,
+    Condition, AndCondition, OrCondition, Value
+)
+from collections import OrderedDict
+from operator import attrgetter
+import re
 import sys
 import os
 
@@ -24,11 +39,108 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
+# 字符串形式的列中出现的聚合函数调用
+_AGG_RE = re.compile(r'(?:AggregateFunction|COUNT|SUM|AVG|MAX|MIN)\(')
+
+# 从 'TableReference(customers)' 这类字符串表示中提取表名
+_TABLEREF_RE = re.compile(r'\((\w+)\)')
+
+_MISSING = object()
+
+# ORDER BY 项的 (列, 方向) 读取器
+_ORDER_ITEM_FIELDS = attrgetter('column', 'direction')
+
+# 按 .type 属性识别的事务语句类型名
+_TRANSACTION_STATEMENTS = frozenset({
+    'BeginTransactionStatement', 'CommitTransactionStatement', 'RollbackTransactionStatement'
+})
+
+# 列引用享元池的最大条目数（LRU淘汰）
+_COLREF_POOL_SIZE = 4096
+
+
+def _first_attr(obj, *names):
+    """
+    返回对象上第一个存在的属性值（属性存在但为假值时同样返回）
+    
+    Args:
+        obj: 目标对象
+        *names: 按优先级排列的属性名
+        
+    Returns:
+        第一个存在的属性值，均不存在时返回None
+    """
+    for name in names:
+        value = getattr(obj, name, _MISSING)
+        if value is not _MISSING:
+            return value
+    return None
+
+
+# 二元表达式节点类 -> 操作符所在属性名
+_BINARY_OPERATOR_ATTRS = {
+    BinaryExpr: 'operator',
+    Condition: 'operator',
+    AndCondition: 'op',
+    OrCondition: 'op',
+}
+
+
 class EnhancedQueryPlanner:
     """增强的查询规划器"""
     
     def __init__(self, symbol_table: SymbolTable):
         self.symbol_table = symbol_table
+        
+        # 语句类 -> 计划构建方法，按具体类型一次字典查找完成分派
+        # 转换器按调用动态生成的兼容类及其他未登记节点回退到属性探测
+        self._dispatch: Dict[type, Callable[[Any], LogicalPlan]] = {
+            Select: self._create_select_plan,
+            Explain: self._create_explain_plan,
+            CreateIndex: self._create_create_index_plan,
+            DropIndex: self._create_drop_index_plan,
+            CreateView: self._create_create_view_plan,
+            AlterView: self._create_alter_view_plan,
+            DropView: self._create_drop_view_plan,
+            ShowTables: self._create_show_tables_plan,
+            ShowViews: self._create_show_plan,
+            ShowColumns: self._create_show_plan,
+            ShowIndex: self._create_show_plan,
+            BeginTransactionStatement: self._create_simple_plan,
+            CommitTransactionStatement: self._create_simple_plan,
+            RollbackTransactionStatement: self._create_simple_plan,
+            CreateTriggerStatement: self._create_create_trigger_plan,
+            DropTriggerStatement: self._create_drop_trigger_plan,
+            ShowTriggersStatement: self._create_show_triggers_plan,
+            ShowTriggers: self._create_show_triggers_plan,
+            DeclareCursorStatement: self._create_declare_cursor_plan,
+            OpenCursorStatement: self._create_simple_plan,
+            FetchCursorStatement: self._create_simple_plan,
+            CloseCursorStatement: self._create_simple_plan,
+        }
+        
+        # 叶子表达式节点类 -> 转换方法，未登记的类型回退到属性探测
+        self._expr_handlers: Dict[type, Callable[[Any, str], Expression]] = {
+            str: self._convert_string_expression,
+            Literal: self._convert_value_expression,
+            Identifier: self._convert_value_expression,
+            Value: self._convert_value_expression,
+        }
+        
+        # 投影列节点类 -> 列名提取函数，未登记的类型回退到属性探测
+        self._col_name_getters: Dict[type, Callable[[Any], str]] = {
+            str: str,
+            Identifier: attrgetter('value'),
+            Literal: attrgetter('value'),
+            AggregateFunction: str,
+        }
+        
+        # 单次create_plan内的子查询转换结果：id(子查询AST) -> SubqueryExpression
+        # 仅在最外层create_plan期间存在，共享的子查询子树只规划一次
+        self._subplan_memo: Optional[Dict[int, SubqueryExpression]] = None
+        
+        # 列引用享元池：(表名, 列名) -> ColumnReference，同一列的多次引用共享一个实例
+        self._colref_pool: 'OrderedDict[tuple, ColumnReference]' = OrderedDict()
     
     def create_plan(self, ast_node) -> LogicalPlan:
         """从AST创建逻辑执行计划"""
@@ -37,23 +149,49 @@ class EnhancedQueryPlanner:
         else:
             query_node = ast_node
         
+        top_level = self._subplan_memo is None
+        if top_level:
+            self._subplan_memo = {}
+        try:
+            handler = self._dispatch.get(type(query_node))
+            if handler is not None:
+                return handler(query_node)
+            return self._create_plan_by_attributes(query_node)
+        finally:
+            if top_level:
+                self._subplan_memo = None
+    
+    def _create_plan_by_attributes(self, query_node) -> LogicalPlan:
+        """按属性探测选择计划构建方法（用于未在分派表中登记的节点类型）"""
+        # 类名只取一次，下面的类名判断都基于它
+        tname = type(query_node).__name__
+        
+        # 触发器/SHOW/游标语句按类名精确匹配（同名类可能来自不同模块，无法按类对象登记）
+        handler = self._NAME_DISPATCH.get(tname)
+        if handler is not None:
+            return handler(self, query_node)
+        
         # 检查不同类型的查询 - 按优先级排序
         # 0. 事务语句 - 检查类型
-        if hasattr(query_node, 'type'):
-            if query_node.type == 'BeginTransactionStatement':
-                return self._create_begin_transaction_plan(query_node)
-            elif query_node.type == 'CommitTransactionStatement':
-                return self._create_commit_transaction_plan(query_node)
-            elif query_node.type == 'RollbackTransactionStatement':
-                return self._create_rollback_transaction_plan(query_node)
+        statement_type = getattr(query_node, 'type', None)
+        if statement_type in _TRANSACTION_STATEMENTS:
+            return self._create_simple_plan(query_node, statement_type)
         
-        # 1. CREATE TABLE - 有table和columns，但没有values和where
-        if (hasattr(query_node, 'table') and hasattr(query_node, 'columns') and 
-            not hasattr(query_node, 'values') and not hasattr(query_node, 'where')):
-            return self._create_create_table_plan(query_node)
+        # 查询以SELECT为主，先按转换器生成的SELECT形状（joins/where/columns/table，无values/set_list）判断；
+        # 转换器生成的其他语句都不同时具备这组属性
+        if (hasattr(query_node, 'joins') and hasattr(query_node, 'where') and
+                hasattr(query_node, 'columns') and hasattr(query_node, 'table') and
+                not hasattr(query_node, 'values') and not hasattr(query_node, 'set_list')):
+            return self._create_select_plan(query_node)
+        
+        # 其次是DML；CREATE TABLE要求没有values，所以INSERT提前判断不改变结果
         # 2. INSERT - 有values
-        elif hasattr(query_node, 'values'):
+        if hasattr(query_node, 'values'):
             return self._create_insert_plan(query_node)
+        # 1. CREATE TABLE - 有table和columns，但没有values和where
+        elif (hasattr(query_node, 'table') and hasattr(query_node, 'columns') and 
+              not hasattr(query_node, 'where')):
+            return self._create_create_table_plan(query_node)
         # 3. UPDATE - 有set_list
         elif hasattr(query_node, 'set_list'):
             return self._create_update_plan(query_node)
@@ -63,7 +201,7 @@ class EnhancedQueryPlanner:
             return self._create_delete_plan(query_node)
         # 5. DROP INDEX - 有index_name属性且类名包含DropIndex
         elif (hasattr(query_node, 'index_name') and 
-              'DropIndex' in str(type(query_node))):
+              'DropIndex' in tname):
             return self._create_drop_index_plan(query_node)
         # 6. DROP TABLE - 有table但没有columns、values、where
         elif (hasattr(query_node, 'table') and not hasattr(query_node, 'columns') and 
@@ -71,7 +209,7 @@ class EnhancedQueryPlanner:
             return self._create_drop_table_plan(query_node)
 
         # 6. ALTER VIEW - 有view_name和select_statement（通过类型判断）- 更具体的检查优先
-        elif hasattr(query_node, 'view_name') and hasattr(query_node, 'select_statement') and hasattr(query_node, '__class__') and 'Alter' in query_node.__class__.__name__:
+        elif hasattr(query_node, 'view_name') and hasattr(query_node, 'select_statement') and 'Alter' in tname:
             return self._create_alter_view_plan(query_node)
         # 7. CREATE VIEW - 有view_name和select_statement
         elif hasattr(query_node, 'view_name') and hasattr(query_node, 'select_statement'):
@@ -81,30 +219,30 @@ class EnhancedQueryPlanner:
             return self._create_drop_view_plan(query_node)
         # 6. CREATE TRIGGER - 有trigger_name属性且类名包含CreateTrigger
         elif (hasattr(query_node, 'trigger_name') and 
-              'CreateTrigger' in str(type(query_node))):
+              'CreateTrigger' in tname):
             return self._create_create_trigger_plan(query_node)
         # 7. DROP TRIGGER - 有trigger_name属性且类名包含DropTrigger
         elif (hasattr(query_node, 'trigger_name') and 
-              'DropTrigger' in str(type(query_node))):
+              'DropTrigger' in tname):
             return self._create_drop_trigger_plan(query_node)
         # 8. SHOW TRIGGERS - 类名包含ShowTriggers
-        elif 'ShowTriggers' in str(type(query_node)):
+        elif 'ShowTriggers' in tname:
             return self._create_show_triggers_plan(query_node)
         # 9. SHOW VIEWS - 类名包含ShowViews
-        elif 'ShowViews' in str(type(query_node)):
+        elif 'ShowViews' in tname:
             return self._create_show_plan(query_node)
         # 10. DECLARE CURSOR - 类名包含DeclareCursor
-        elif 'DeclareCursor' in str(type(query_node)):
+        elif 'DeclareCursor' in tname:
             return self._create_declare_cursor_plan(query_node)
         # 10. OPEN CURSOR - 类名包含OpenCursor
-        elif 'OpenCursor' in str(type(query_node)):
-            return self._create_open_cursor_plan(query_node)
+        elif 'OpenCursor' in tname:
+            return self._create_simple_plan(query_node, 'OpenCursorStatement')
         # 11. FETCH CURSOR - 类名包含FetchCursor
-        elif 'FetchCursor' in str(type(query_node)):
-            return self._create_fetch_cursor_plan(query_node)
+        elif 'FetchCursor' in tname:
+            return self._create_simple_plan(query_node, 'FetchCursorStatement')
         # 12. CLOSE CURSOR - 类名包含CloseCursor
-        elif 'CloseCursor' in str(type(query_node)):
-            return self._create_close_cursor_plan(query_node)
+        elif 'CloseCursor' in tname:
+            return self._create_simple_plan(query_node, 'CloseCursorStatement')
         # 9. EXPLAIN - 有query属性
         elif hasattr(query_node, 'query'):
             return self._create_explain_plan(query_node)
@@ -159,7 +297,6 @@ class EnhancedQueryPlanner:
                 right_scan = ScanOperator(table_name)
                 
                 # 创建笛卡尔积（无条件连接）
-                from .logical_operators import JoinType, JoinMethod
                 join_op = JoinOperator(JoinType.CARTESIAN, None, JoinMethod.NESTED_LOOP)
                 join_op.left_child = current_op
                 join_op.right_child = right_scan
@@ -168,7 +305,7 @@ class EnhancedQueryPlanner:
                 join_op._children_set = True
                 current_op = join_op
 
-        elif hasattr(source_table_node, 'subquery') or "Subquery" in str(type(source_table_node)):
+        elif hasattr(source_table_node, 'subquery') or "Subquery" in type(source_table_node).__name__:
             # --- 情况二：FROM 子句是子查询 ---
             subquery_ast = getattr(source_table_node, 'subquery', source_table_node)
             subquery_plan = self._create_select_plan(subquery_ast)
@@ -183,11 +320,13 @@ class EnhancedQueryPlanner:
                 table_name = source_table_node.name
             elif hasattr(source_table_node, 'table_name'):
                 table_name = source_table_node.table_name
+            elif isinstance(source_table_node, str) and '(' not in source_table_node:
+                # 普通表名字符串，无需正则提取
+                table_name = source_table_node
             else:
                 # 从 'TableReference(customers)' 这种字符串中提取 'customers'
                 raw_str = str(source_table_node)
-                import re
-                match = re.search(r'\((\w+)\)', raw_str)
+                match = _TABLEREF_RE.search(raw_str)
                 if match:
                     table_name = match.group(1)
                 else:
@@ -197,8 +336,9 @@ class EnhancedQueryPlanner:
             current_op = scan_op
         
         # 2. 处理JOIN操作
-        if hasattr(select_node, 'joins') and select_node.joins:
-            for join in select_node.joins:
+        joins = getattr(select_node, 'joins', None)
+        if joins:
+            for join in joins:
                 # 获取右表名
                 right_table_name = join.right_table.table_name if hasattr(join.right_table, 'table_name') else str(join.right_table)
                 join_scan = ScanOperator(right_table_name)
@@ -208,7 +348,7 @@ class EnhancedQueryPlanner:
                 current_op = join_op
         
         # 3. 创建过滤操作符（WHERE子句）
-        where_clause = getattr(select_node, 'where', getattr(select_node, 'where_clause', None))
+        where_clause = _first_attr(select_node, 'where', 'where_clause')
 
         # 【修复点 2】: 增加对 where_clause 类型的防御性检查
         if where_clause and isinstance(where_clause, str):
@@ -228,7 +368,7 @@ class EnhancedQueryPlanner:
         for col in columns:
             if isinstance(col, str):
                 # 检查字符串形式的聚合函数
-                if 'AggregateFunction(' in col or 'COUNT(' in col or 'SUM(' in col or 'AVG(' in col or 'MAX(' in col or 'MIN(' in col:
+                if _AGG_RE.search(col):
                     has_aggregate = True
                     break
             elif hasattr(col, 'func_name') or hasattr(col, 'function_name'):
@@ -262,7 +402,6 @@ class EnhancedQueryPlanner:
     
     def _create_join_operator(self, left_op, right_op, condition):
         """创建JOIN操作符"""
-        from .logical_operators import JoinType, JoinMethod
         join_op = JoinOperator(JoinType.INNER, condition, JoinMethod.NESTED_LOOP)
         join_op.add_child(left_op)
         join_op.add_child(right_op)
@@ -284,58 +423,47 @@ class EnhancedQueryPlanner:
     
     def _create_order_by_operator(self, order_by_items, table_name):
         """创建ORDER BY操作符"""
-        from .logical_operators import SortOperator
-        
-        # 转换order_by_items为正确的格式
-        items = []
+        # 一次遍历直接拆分为列名和排序方向
+        order_by = []
+        ascending = []
         
         # 检查是否是OrderByList（多列排序）
         if hasattr(order_by_items, 'order_columns'):
             # 这是OrderByList，处理多个排序列
             for order_col in order_by_items.order_columns:
                 if hasattr(order_col, 'column') and hasattr(order_col, 'direction'):
-                    # 提取列名
-                    if hasattr(order_col.column, 'name'):
-                        column_name = order_col.column.name
-                    elif hasattr(order_col.column, 'value'):
-                        column_name = order_col.column.value
-                    else:
-                        column_name = str(order_col.column)
-                    items.append({"column": column_name, "direction": order_col.direction})
+                    order_by.append(self._order_column_name(order_col.column))
+                    ascending.append(order_col.direction == "ASC")
         # 检查是否是单个ORDER BY项目（不是列表）
         elif hasattr(order_by_items, 'column') and hasattr(order_by_items, 'direction'):
-            # 提取列名
-            if hasattr(order_by_items.column, 'name'):
-                column_name = order_by_items.column.name
-            elif hasattr(order_by_items.column, 'value'):
-                column_name = order_by_items.column.value
-            else:
-                column_name = str(order_by_items.column)
-            items.append({"column": column_name, "direction": order_by_items.direction})
+            order_by.append(self._order_column_name(order_by_items.column))
+            ascending.append(order_by_items.direction == "ASC")
         elif hasattr(order_by_items, '__iter__'):
             for item in order_by_items:
                 if hasattr(item, 'column') and hasattr(item, 'direction'):
-                    items.append({"column": item.column, "direction": item.direction})
+                    order_by.append(item.column)
+                    ascending.append(item.direction == "ASC")
                 elif isinstance(item, dict):
-                    items.append(item)
+                    order_by.append(item["column"])
+                    ascending.append(item["direction"] == "ASC")
                 else:
                     # 如果item是字符串，假设是列名，默认为ASC
-                    items.append({"column": str(item), "direction": "ASC"})
-        
-        # 拆分为列名和排序方向
-        order_by = []
-        ascending = []
-        for item in items:
-            if isinstance(item, dict):
-                order_by.append(item["column"])
-                ascending.append(item["direction"] == "ASC")
-            else:
-                # 如果是字符串，默认为ASC
-                order_by.append(str(item))
-                ascending.append(True)
+                    order_by.append(str(item))
+                    ascending.append(True)
         
         return SortOperator(order_by, ascending)
     
+    def _order_column_name(self, column) -> str:
+        """提取排序列名"""
+        if type(column) is Identifier:
+            return column.value
+        if hasattr(column, 'name'):
+            return column.name
+        elif hasattr(column, 'value'):
+            return column.value
+        else:
+            return str(column)
+    
     def _create_limit_operator(self, limit):
         """创建LIMIT操作符"""
         return LimitOperator(limit.limit, limit.offset)
@@ -350,7 +478,8 @@ class EnhancedQueryPlanner:
             # 为了简化，我们只返回一个通配符，由后续步骤处理。
             return [f"{table_name}.*"]
 
-        final_columns = []
+        col_names = []
+        getters = self._col_name_getters
         
         # 确保我们处理的是一个列表
         items_to_process = columns_node
@@ -358,54 +487,70 @@ class EnhancedQueryPlanner:
             items_to_process = [items_to_process]
 
         for item in items_to_process:
-            col_name = None
-            
+            getter = getters.get(type(item))
+            if getter is not None:
+                col_names.append(getter(item))
             # 【最终修复】: 智能地从AST节点提取列名
             # 优先级 1: 节点有 'value' 属性 (通常是 Identifier 对象)
-            if hasattr(item, 'value'):
-                col_name = item.value
+            elif hasattr(item, 'value'):
+                col_names.append(item.value)
             # 优先级 2: 节点有 'name' 属性
             elif hasattr(item, 'name'):
-                col_name = item.name
+                col_names.append(item.name)
             # 优先级 3: 节点本身就是字符串
             elif isinstance(item, str):
-                col_name = item
+                col_names.append(item)
             # 最后的回退策略: 将对象转换为字符串
             else:
-                col_name = str(item)
-
-            # 应用上一轮修复的逻辑：如果列名已包含'.'，则不加前缀
-            if '.' in col_name:
-                final_columns.append(col_name)
-            else:
-                # 为无别名的列（如外层查询的 'name'）添加来源前缀（'subquery_result'）
-                final_columns.append(f"{table_name}.{col_name}")
+                col_names.append(str(item))
 
-        return final_columns
+        # 应用上一轮修复的逻辑：如果列名已包含'.'，则不加前缀；
+        # 为无别名的列（如外层查询的 'name'）添加来源前缀（'subquery_result'）
+        prefix = f"{table_name}."
+        return [col_name if '.' in col_name else prefix + col_name for col_name in col_names]
+    
+    def _make_colref(self, table_name, column_name) -> ColumnReference:
+        """
+        获取列引用（享元）
+        
+        Args:
+            table_name: 表名
+            column_name: 列名
+            
+        Returns:
+            ColumnReference: 池中共享的列引用
+        """
+        key = (table_name, column_name)
+        pool = self._colref_pool
+        column_ref = pool.get(key)
+        if column_ref is None:
+            column_ref = ColumnReference(table_name, column_name)
+            pool[key] = column_ref
+            if len(pool) > _COLREF_POOL_SIZE:
+                pool.popitem(last=False)
+        else:
+            pool.move_to_end(key)
+        return column_ref
     
     def _convert_aggregate_function(self, agg_func, table_name):
         """转换聚合函数"""
-        from .logical_operators import AggregateExpression
-        
         if hasattr(agg_func, 'arg') and hasattr(agg_func.arg, 'column'):
-            column_ref = ColumnReference(table_name, agg_func.arg.column) if agg_func.arg.column != '*' else None
+            column_ref = self._make_colref(table_name, agg_func.arg.column) if agg_func.arg.column != '*' else None
             return AggregateExpression(agg_func.func_name, column_ref, agg_func.arg.distinct)
         else:
             return AggregateExpression(agg_func.func_name, None, False)
     
     def _convert_new_aggregate_function(self, agg_func, table_name):
         """转换新的聚合函数格式"""
-        from .logical_operators import AggregateExpression
-        
         if agg_func.argument:
             # 处理不同类型的参数
             if hasattr(agg_func.argument, 'value'):
                 # Identifier 或 Literal
-                column_ref = ColumnReference(table_name, agg_func.argument.value)
+                column_ref = self._make_colref(table_name, agg_func.argument.value)
             else:
                 # BinaryExpr 或其他复杂表达式
                 # 对于复杂表达式，我们暂时使用字符串表示
-                column_ref = ColumnReference(table_name, str(agg_func.argument))
+                column_ref = self._make_colref(table_name, str(agg_func.argument))
         else:
             column_ref = None
         
@@ -428,33 +573,72 @@ class EnhancedQueryPlanner:
     
     def _convert_subquery(self, subquery, table_name):
         """转换子查询"""
-        from .logical_operators import SubqueryExpression
+        memo = self._subplan_memo
+        if memo is not None:
+            # 按对象身份查找：AST节点未必可哈希，且同一子树共享时身份即可判定
+            cached = memo.get(id(subquery))
+            if cached is not None:
+                return cached
         
         # 递归创建子查询的执行计划
         subquery_plan = self._create_select_plan(subquery)
-        return SubqueryExpression(subquery_plan)
+        result = SubqueryExpression(subquery_plan)
+        if memo is not None:
+            memo[id(subquery)] = result
+        return result
     
     def _convert_expression(self, expr_node, table_name: str) -> Expression:
-        """将AST表达式转换为逻辑表达式"""
+        """将AST表达式转换为逻辑表达式（显式栈后序遍历，深层AND/OR链不受递归深度限制）"""
+        results: List[Expression] = []
+        stack = [(expr_node, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                # 左右操作数均已转换，合成二元表达式
+                right_expr = results.pop()
+                results[-1] = BinaryExpression(results[-1], self._binary_operator(node), right_expr)
+            elif self._is_binary_expression(node):
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                results.append(self._convert_leaf_expression(node, table_name))
+        return results[0]
+    
+    def _is_binary_expression(self, expr_node) -> bool:
+        """判断节点是否为二元表达式（有left和right）"""
+        node_type = type(expr_node)
+        if node_type in _BINARY_OPERATOR_ATTRS:
+            return True
+        if node_type in self._expr_handlers:
+            return False
+        return hasattr(expr_node, 'left') and hasattr(expr_node, 'right')
+    
+    def _binary_operator(self, expr_node):
+        """获取二元表达式的操作符"""
+        attr = _BINARY_OPERATOR_ATTRS.get(type(expr_node))
+        if attr is not None:
+            return getattr(expr_node, attr)
+        if hasattr(expr_node, 'op'):
+            return expr_node.op
+        elif hasattr(expr_node, 'operator'):
+            return expr_node.operator
+        else:
+            return '='
+    
+    def _convert_leaf_expression(self, expr_node, table_name: str) -> Expression:
+        """转换非二元表达式节点"""
+        handler = self._expr_handlers.get(type(expr_node))
+        if handler is not None:
+            return handler(expr_node, table_name)
+        
         # 【防御性检查】: 如果表达式是字符串，返回一个占位符表达式
         if isinstance(expr_node, str):
             return LiteralExpression(expr_node)
         
-        if hasattr(expr_node, 'left') and hasattr(expr_node, 'right'):
-            # 二元表达式
-            left_expr = self._convert_expression(expr_node.left, table_name)
-            right_expr = self._convert_expression(expr_node.right, table_name)
-            # 获取操作符
-            if hasattr(expr_node, 'op'):
-                op = expr_node.op
-            elif hasattr(expr_node, 'operator'):
-                op = expr_node.operator
-            else:
-                op = '='
-            return BinaryExpression(left_expr, op, right_expr)
-        elif hasattr(expr_node, 'name'):
+        if hasattr(expr_node, 'name'):
             # 标识符
-            return ColumnExpression(ColumnReference(table_name, expr_node.name))
+            return ColumnExpression(self._make_colref(table_name, expr_node.name))
         elif hasattr(expr_node, 'value'):
             # 字面量
             return self._convert_literal(expr_node)
@@ -476,12 +660,20 @@ class EnhancedQueryPlanner:
         elif hasattr(expr_node, 'type') and hasattr(expr_node, 'value'):
             # Token对象
             if expr_node.type == 'IDENTIFIER':
-                return ColumnExpression(ColumnReference(table_name, expr_node.value))
+                return ColumnExpression(self._make_colref(table_name, expr_node.value))
             else:
                 return LiteralExpression(expr_node.value)
         else:
             raise ValueError(f"Unknown expression type: {type(expr_node)}")
     
+    def _convert_string_expression(self, expr_node: str, table_name: str) -> Expression:
+        """转换字符串表达式（占位符字面量）"""
+        return LiteralExpression(expr_node)
+    
+    def _convert_value_expression(self, expr_node, table_name: str) -> Expression:
+        """转换带value属性的节点（Literal/Identifier/Value）"""
+        return self._convert_literal(expr_node)
+    
     def _convert_between_expression(self, expr_node, table_name: str) -> Expression:
         """转换BETWEEN表达式"""
         # BETWEEN条件转换为两个比较条件的AND组合
@@ -491,16 +683,23 @@ class EnhancedQueryPlanner:
         start_expr = self._convert_expression(expr_node.start, table_name)
         end_expr = self._convert_expression(expr_node.end, table_name)
         
+        # 左操作数是列/字面量叶子时两个比较共享同一对象；复合表达式则各用一份，
+        # 避免下游优化器对共享子树重复访问或原地改写时互相影响
+        if isinstance(left_expr, (ColumnExpression, LiteralExpression)):
+            right_left_expr = left_expr
+        else:
+            right_left_expr = self._convert_expression(expr_node.left, table_name)
+        
         # 创建两个比较表达式
         if hasattr(expr_node, 'negated') and expr_node.negated:
             # NOT BETWEEN => column < start OR column > end
             left_cond = BinaryExpression(left_expr, '<', start_expr)
-            right_cond = BinaryExpression(left_expr, '>', end_expr)
+            right_cond = BinaryExpression(right_left_expr, '>', end_expr)
             return BinaryExpression(left_cond, 'OR', right_cond)
         else:
             # BETWEEN => column >= start AND column <= end
             left_cond = BinaryExpression(left_expr, '>=', start_expr)
-            right_cond = BinaryExpression(left_expr, '<=', end_expr)
+            right_cond = BinaryExpression(right_left_expr, '<=', end_expr)
             return BinaryExpression(left_cond, 'AND', right_cond)
     
     def _convert_literal(self, literal_node) -> LiteralExpression:
@@ -509,8 +708,6 @@ class EnhancedQueryPlanner:
     
     def _convert_in_subquery_expression(self, expr_node, table_name: str) -> Expression:
         """转换IN子查询表达式"""
-        from .logical_operators import InSubqueryExpression
-        
         # 转换左操作数
         left_expr = self._convert_expression(expr_node.left, table_name)
         
@@ -522,8 +719,6 @@ class EnhancedQueryPlanner:
     
     def _convert_in_expression(self, expr_node, table_name: str) -> Expression:
         """转换IN值列表表达式"""
-        from .logical_operators import InExpression
-        
         # 转换左操作数
         left_expr = self._convert_expression(expr_node.left, table_name)
         
@@ -541,14 +736,17 @@ class EnhancedQueryPlanner:
     def _create_insert_plan(self, insert_node) -> LogicalPlan:
         """创建INSERT语句的执行计划"""
         table_name = insert_node.table.name
+        rows = insert_node.values
+        # 批量INSERT逐单元格构造字面量，直接用局部名构造，省去每格一次方法调用
+        literal = LiteralExpression
         
         # 处理多行INSERT
-        if isinstance(insert_node.values, list) and len(insert_node.values) > 0 and isinstance(insert_node.values[0], list):
+        if isinstance(rows, list) and len(rows) > 0 and isinstance(rows[0], list):
             # 多行VALUES格式：[[row1], [row2], ...]
-            values = [[self._convert_literal(value) for value in row] for row in insert_node.values]
+            values = [[literal(value.value) for value in row] for row in rows]
         else:
             # 单行VALUES格式：[val1, val2, ...]
-            values = [self._convert_literal(value) for value in insert_node.values]
+            values = [literal(value.value) for value in rows]
         
         insert_op = InsertOperator(table_name, values)
         return LogicalPlan(insert_op)
@@ -651,25 +849,6 @@ class EnhancedQueryPlanner:
         )
         return LogicalPlan(create_index_op)
     
-    def _create_join_operator(self, left_child, right_child, condition):
-        """创建JOIN操作符"""
-        # 解析连接条件，获取连接键的列索引
-        left_key_indices = self._get_join_key_indices(condition.left_table, condition.left_column)
-        right_key_indices = self._get_join_key_indices(condition.right_table, condition.right_column)
-        
-        # 创建JOIN操作符
-        from .logical_operators import JoinType, JoinMethod
-        join_op = JoinOperator(JoinType.INNER, condition, JoinMethod.NESTED_LOOP)
-        join_op.add_child(left_child)
-        join_op.add_child(right_child)
-        return join_op
-    
-    def _get_join_key_indices(self, table_name, column_name):
-        """获取连接键的列索引"""
-        # 简化实现：假设连接键是第一列
-        # 在实际实现中，应该根据表结构查找列索引
-        return [0]
-    
     def _create_create_view_plan(self, create_view_node):
         """创建CREATE VIEW计划"""
         # 将SELECT语句转换为字符串
@@ -715,67 +894,81 @@ class EnhancedQueryPlanner:
             # 处理列，包括聚合函数
             column_strings = []
             for col in columns:
-                if hasattr(col, 'function_name'):  # 聚合函数
-                    func_name = col.function_name
-                    argument = col.argument.value if hasattr(col.argument, 'value') else str(col.argument)
+                func_name = getattr(col, 'function_name', _MISSING)
+                if func_name is not _MISSING:  # 聚合函数
+                    argument = col.argument
+                    argument_value = getattr(argument, 'value', _MISSING)
+                    argument = argument_value if argument_value is not _MISSING else str(argument)
                     distinct_str = 'DISTINCT ' if col.distinct else ''
-                    alias_str = f" AS {col.alias}" if col.alias else ''
+                    alias = col.alias
+                    alias_str = f" AS {alias}" if alias else ''
                     column_strings.append(f"{func_name}({distinct_str}{argument}){alias_str}")
                 else:
                     column_strings.append(str(col))
             columns_str = ', '.join(column_strings)
         
-        sql = f"SELECT {columns_str} FROM {table}"
+        # 逐段收集SQL片段，最后一次性拼接
+        parts = ["SELECT ", columns_str, " FROM ", str(table)]
         
         # 添加JOIN子句
         if hasattr(select_node, 'joins') and select_node.joins:
             for join in select_node.joins:
-                if hasattr(join, 'join_type') and hasattr(join, 'right_table') and hasattr(join, 'condition'):
-                    join_type = join.join_type
-                    right_table = join.right_table
-                    condition = join.condition
-                    
+                join_type = getattr(join, 'join_type', _MISSING)
+                right_table = getattr(join, 'right_table', _MISSING)
+                condition = getattr(join, 'condition', _MISSING)
+                if join_type is not _MISSING and right_table is not _MISSING and condition is not _MISSING:
                     # 构建RIGHT TABLE字符串
-                    if hasattr(right_table, 'table_name') and hasattr(right_table, 'alias'):
-                        if right_table.alias:
-                            right_table_str = f"{right_table.table_name} {right_table.alias}"
+                    right_name = getattr(right_table, 'table_name', _MISSING)
+                    right_alias = getattr(right_table, 'alias', _MISSING)
+                    if right_name is not _MISSING and right_alias is not _MISSING:
+                        if right_alias:
+                            right_table_str = f"{right_name} {right_alias}"
                         else:
-                            right_table_str = right_table.table_name
+                            right_table_str = right_name
                     else:
                         right_table_str = str(right_table)
                     
                     # 构建JOIN条件字符串
-                    if hasattr(condition, 'left_table') and hasattr(condition, 'left_column') and \
-                       hasattr(condition, 'operator') and hasattr(condition, 'right_table') and \
-                       hasattr(condition, 'right_column'):
-                        condition_str = f"{condition.left_table}.{condition.left_column} {condition.operator} {condition.right_table}.{condition.right_column}"
+                    left_table = getattr(condition, 'left_table', _MISSING)
+                    left_column = getattr(condition, 'left_column', _MISSING)
+                    join_operator = getattr(condition, 'operator', _MISSING)
+                    right_table_name = getattr(condition, 'right_table', _MISSING)
+                    right_column = getattr(condition, 'right_column', _MISSING)
+                    if left_table is not _MISSING and left_column is not _MISSING and \
+                       join_operator is not _MISSING and right_table_name is not _MISSING and \
+                       right_column is not _MISSING:
+                        condition_str = f"{left_table}.{left_column} {join_operator} {right_table_name}.{right_column}"
                     else:
                         condition_str = str(condition)
                     
-                    sql += f" {join_type} JOIN {right_table_str} ON {condition_str}"
+                    parts.extend((" ", str(join_type), " JOIN ", str(right_table_str), " ON ", condition_str))
         
         # 添加WHERE子句
-        if hasattr(select_node, 'where_clause') and select_node.where_clause:
-            sql += f" WHERE {select_node.where_clause}"
+        where_clause = getattr(select_node, 'where_clause', None)
+        if where_clause:
+            parts.extend((" WHERE ", str(where_clause)))
         
         # 添加GROUP BY子句
-        if hasattr(select_node, 'group_by') and select_node.group_by:
-            if hasattr(select_node.group_by, 'columns'):
-                group_columns = ', '.join(select_node.group_by.columns)
-                sql += f" GROUP BY {group_columns}"
+        group_by = getattr(select_node, 'group_by', None)
+        if group_by:
+            group_by_columns = getattr(group_by, 'columns', _MISSING)
+            if group_by_columns is not _MISSING:
+                group_columns = ', '.join(group_by_columns)
+                parts.extend((" GROUP BY ", group_columns))
         
         # 添加ORDER BY子句
-        if hasattr(select_node, 'order_by') and select_node.order_by:
-            if hasattr(select_node.order_by, 'column'):
-                sql += f" ORDER BY {select_node.order_by.column} {select_node.order_by.direction}"
+        order_by = getattr(select_node, 'order_by', None)
+        if order_by:
+            order_column = getattr(order_by, 'column', _MISSING)
+            if order_column is not _MISSING:
+                parts.extend((" ORDER BY ", str(order_column), " ", str(order_by.direction)))
             else:
                 # 处理OrderByList
-                order_items = []
-                for order_item in select_node.order_by.order_columns:
-                    order_items.append(f"{order_item.column} {order_item.direction}")
-                sql += f" ORDER BY {', '.join(order_items)}"
+                order_items = [f"{column} {direction}" for column, direction in
+                               map(_ORDER_ITEM_FIELDS, order_by.order_columns)]
+                parts.extend((" ORDER BY ", ', '.join(order_items)))
         
-        return sql
+        return ''.join(parts)
 
     def _create_create_trigger_plan(self, create_trigger_node) -> LogicalPlan:
         """创建CREATE TRIGGER语句的执行计划"""
@@ -819,44 +1012,42 @@ class EnhancedQueryPlanner:
         )
         return LogicalPlan(declare_cursor_op)
     
-    def _create_open_cursor_plan(self, open_cursor_node) -> LogicalPlan:
-        """创建OPEN CURSOR语句的执行计划"""
-        cursor_name = open_cursor_node.cursor_name.value
-        
-        open_cursor_op = OpenCursorOperator(cursor_name=cursor_name)
-        return LogicalPlan(open_cursor_op)
-    
-    def _create_fetch_cursor_plan(self, fetch_cursor_node) -> LogicalPlan:
-        """创建FETCH CURSOR语句的执行计划"""
-        cursor_name = fetch_cursor_node.cursor_name.value
-        
-        fetch_cursor_op = FetchCursorOperator(cursor_name=cursor_name)
-        return LogicalPlan(fetch_cursor_op)
-    
-    def _create_close_cursor_plan(self, close_cursor_node) -> LogicalPlan:
-        """创建CLOSE CURSOR语句的执行计划"""
-        cursor_name = close_cursor_node.cursor_name.value
+    def _create_simple_plan(self, statement_node, statement_type: Optional[str] = None) -> LogicalPlan:
+        """
+        创建事务语句及OPEN/FETCH/CLOSE CURSOR语句的执行计划（见 _SIMPLE_OPS）
         
-        close_cursor_op = CloseCursorOperator(cursor_name=cursor_name)
-        return LogicalPlan(close_cursor_op)
-    
-    def _create_begin_transaction_plan(self, begin_node) -> LogicalPlan:
-        """创建BEGIN TRANSACTION语句的执行计划"""
-        # 创建一个特殊的操作符来表示开始事务
-        begin_op = BeginTransactionOperator()
-        return LogicalPlan(begin_op)
+        Args:
+            statement_node: 语句节点
+            statement_type: 语句类型名，缺省时取节点的类名
+            
+        Returns:
+            LogicalPlan: 仅含单个操作符的执行计划
+        """
+        operator_class, fields = self._SIMPLE_OPS[statement_type or type(statement_node).__name__]
+        return LogicalPlan(operator_class(**{name: getattr(statement_node, name).value for name in fields}))
     
-    def _create_commit_transaction_plan(self, commit_node) -> LogicalPlan:
-        """创建COMMIT TRANSACTION语句的执行计划"""
-        # 创建一个特殊的操作符来表示提交事务
-        commit_op = CommitTransactionOperator()
-        return LogicalPlan(commit_op)
+    # 语句类型名 -> (操作符类, 需要取 .value 传给操作符的字段)
+    _SIMPLE_OPS: Dict[str, Tuple[type, Tuple[str, ...]]] = {
+        'BeginTransactionStatement': (BeginTransactionOperator, ()),
+        'CommitTransactionStatement': (CommitTransactionOperator, ()),
+        'RollbackTransactionStatement': (RollbackTransactionOperator, ()),
+        'OpenCursorStatement': (OpenCursorOperator, ('cursor_name',)),
+        'FetchCursorStatement': (FetchCursorOperator, ('cursor_name',)),
+        'CloseCursorStatement': (CloseCursorOperator, ('cursor_name',)),
+    }
     
-    def _create_rollback_transaction_plan(self, rollback_node) -> LogicalPlan:
-        """创建ROLLBACK TRANSACTION语句的执行计划"""
-        # 创建一个特殊的操作符来表示回滚事务
-        rollback_op = RollbackTransactionOperator()
-        return LogicalPlan(rollback_op)
+    # 类名 -> 计划构建方法（见 _create_plan_by_attributes）
+    _NAME_DISPATCH: Dict[str, Callable[..., LogicalPlan]] = {
+        'CreateTriggerStatement': _create_create_trigger_plan,
+        'DropTriggerStatement': _create_drop_trigger_plan,
+        'ShowTriggersStatement': _create_show_triggers_plan,
+        'ShowTriggers': _create_show_triggers_plan,
+        'ShowViews': _create_show_plan,
+        'DeclareCursorStatement': _create_declare_cursor_plan,
+        'OpenCursorStatement': _create_simple_plan,
+        'FetchCursorStatement': _create_simple_plan,
+        'CloseCursorStatement': _create_simple_plan,
+    }
 
 
 class EnhancedExecutionPlanGenerator:
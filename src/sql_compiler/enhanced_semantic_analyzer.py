@@ -2,13 +2,43 @@
 """
 增强的语义分析器 - 修复CREATE TABLE问题并增强功能
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from .symbol_table import SymbolTable, DataType, ColumnInfo, TableInfo
-import sys
-import os
+from .ast_nodes import CONSTRAINT_PRIMARY_KEY, CONSTRAINT_NOT_NULL, PrimaryKeyConstraint
+from types import MappingProxyType
 
-# 添加路径以便导入
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# 类型名（不含参数，大写） -> 标准数据类型
+_TYPE_MAPPING = MappingProxyType({
+    'INT': DataType.INT,
+    'INTEGER': DataType.INT,
+    'SMALLINT': DataType.INT,
+    'BIGINT': DataType.INT,
+    'TINYINT': DataType.INT,
+    'FLOAT': DataType.FLOAT,
+    'REAL': DataType.FLOAT,
+    'DOUBLE': DataType.FLOAT,
+    'DECIMAL': DataType.DECIMAL,
+    'NUMERIC': DataType.DECIMAL,
+    'VARCHAR': DataType.VARCHAR,
+    'CHAR': DataType.VARCHAR,
+    'TEXT': DataType.VARCHAR,
+    'DATE': DataType.DATE,
+    'TIME': DataType.TIME,
+    'TIMESTAMP': DataType.TIMESTAMP,
+    'BOOLEAN': DataType.BOOLEAN,
+    'BOOL': DataType.BOOLEAN
+})
+
+# 单次分析最多收集的错误数，达到后停止分析（调用方通常只展示前几条）
+MAX_ERRORS = 50
+
+# 类型检查用的数值/字符串类型集合
+_NUMERIC_TYPES = frozenset({DataType.INT, DataType.FLOAT, DataType.DECIMAL})
+_STRING_TYPES = frozenset({DataType.VARCHAR, DataType.CHAR, DataType.TEXT})
+
+# 支持的聚合函数名（大写）
+_AGGREGATE_FUNCTIONS = frozenset({'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'GROUP_CONCAT'})
 
 
 class SemanticError(Exception):
@@ -16,13 +46,29 @@ class SemanticError(Exception):
     pass
 
 
+class _AnalysisAborted(Exception):
+    """错误数达到上限，终止本次分析（仅在分析器内部使用）"""
+    pass
+
+
 class SemanticAnalyzer:
     """基础语义分析器"""
     
+    # 分析器按语句创建，属性集合固定，使用 __slots__ 去掉实例 __dict__
+    __slots__ = ('symbol_table', 'errors', 'warnings', '_dispatch')
+    
     def __init__(self, symbol_table: Optional[SymbolTable] = None):
         self.symbol_table = symbol_table or SymbolTable()
         self.errors = []
         self.warnings = []
+        # 语句类型名 -> 分析方法（绑定方法，子类重写的分析方法自动生效）
+        self._dispatch: Dict[str, Callable[[Any], None]] = {
+            'CreateTableStatement': self._analyze_create_table,
+            'SelectStatement': self._analyze_select,
+            'InsertStatement': self._analyze_insert,
+            'UpdateStatement': self._analyze_update,
+            'DeleteStatement': self._analyze_delete,
+        }
     
     def analyze(self, ast) -> bool:
         """分析AST"""
@@ -32,23 +78,18 @@ class SemanticAnalyzer:
         try:
             self._analyze_node(ast)
             return len(self.errors) == 0
+        except _AnalysisAborted:
+            return False
         except Exception as e:
-            self._add_error(f"语义分析异常: {str(e)}")
+            # 直接追加，避免错误数已达上限时再次触发终止
+            self.errors.append(SemanticError(f"语义分析异常: {str(e)}"))
             return False
     
     def _analyze_node(self, node):
         """分析AST节点"""
-        if hasattr(node, 'type'):
-            if node.type == 'CreateTableStatement':
-                self._analyze_create_table(node)
-            elif node.type == 'SelectStatement':
-                self._analyze_select(node)
-            elif node.type == 'InsertStatement':
-                self._analyze_insert(node)
-            elif node.type == 'UpdateStatement':
-                self._analyze_update(node)
-            elif node.type == 'DeleteStatement':
-                self._analyze_delete(node)
+        handler = self._dispatch.get(getattr(node, 'type', None))
+        if handler is not None:
+            handler(node)
     
     def _analyze_create_table(self, create_table_node):
         """分析CREATE TABLE语句"""
@@ -76,8 +117,10 @@ class SemanticAnalyzer:
         pass
     
     def _add_error(self, message: str):
-        """添加错误"""
+        """添加错误，错误数达到 MAX_ERRORS 时终止分析"""
         self.errors.append(SemanticError(message))
+        if len(self.errors) >= MAX_ERRORS:
+            raise _AnalysisAborted()
     
     def _add_warning(self, message: str):
         """添加警告"""
@@ -95,9 +138,20 @@ class SemanticAnalyzer:
 class EnhancedSemanticAnalyzer(SemanticAnalyzer):
     """增强的语义分析器"""
     
+    __slots__ = ('_type_checker',)
+    
     def __init__(self, symbol_table: Optional[SymbolTable] = None):
         super().__init__(symbol_table)
-        self.type_checker = TypeChecker()
+        # 类型检查器首次使用时再创建（DDL/事务语句不做类型检查）
+        self._type_checker: Optional['TypeChecker'] = None
+    
+    @property
+    def type_checker(self) -> 'TypeChecker':
+        """类型检查器（延迟创建）"""
+        type_checker = self._type_checker
+        if type_checker is None:
+            type_checker = self._type_checker = TypeChecker()
+        return type_checker
     
     def _analyze_create_table(self, create_table_node):
         """分析CREATE TABLE语句 - 支持主键约束"""
@@ -117,16 +171,11 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
         column_names = set()
         primary_key_columns = []
         
-        # 1. 处理列定义和列级主键约束
-        for col_def in create_table_node.columns:
-            # 获取列名
-            if hasattr(col_def, 'name'):
-                if hasattr(col_def.name, 'name'):
-                    col_name = col_def.name.name
-                else:
-                    col_name = str(col_def.name)
-            else:
-                self._add_error("Column definition must have a name")
+        # 1. 处理列定义和列级主键约束：先逐列解析，再按列顺序检查重名并汇总结果
+        parsed_columns = [self._parse_column_definition(col_def) for col_def in create_table_node.columns]
+        for col_name, column_info, error in parsed_columns:
+            if col_name is None:
+                self._add_error(error)
                 continue
             
             if col_name in column_names:
@@ -135,59 +184,19 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
             
             column_names.add(col_name)
             
-            # 处理数据类型
-            col_type = getattr(col_def, 'data_type', None)
-            if col_type:
-                # 支持不同的数据类型表示方式
-                if hasattr(col_type, 'type_name'):
-                    data_type_str = col_type.type_name
-                elif hasattr(col_type, 'type'):
-                    data_type_str = col_type.type
-                elif hasattr(col_type, 'name'):
-                    data_type_str = col_type.name
-                else:
-                    data_type_str = str(col_type)
-                
-                # 转换为标准数据类型
-                data_type = self._convert_to_data_type(data_type_str)
-                
-                # 检查数据类型是否有效
-                if data_type == DataType.UNKNOWN:
-                    self._add_error(f"Unknown data type: {data_type_str}")
-                    continue
-            else:
-                self._add_error(f"Column '{col_name}' must have a data type")
+            if column_info is None:
+                self._add_error(error)
                 continue
             
-            # 处理列级约束
-            is_primary_key = False
-            is_not_null = False
-            
-            if hasattr(col_def, 'constraints') and col_def.constraints:
-                for constraint in col_def.constraints:
-                    if constraint == 'PRIMARY KEY':
-                        is_primary_key = True
-                        primary_key_columns.append(col_name)
-                    elif constraint == 'NOT NULL':
-                        is_not_null = True
-            
-            # 主键列不能为NULL
-            if is_primary_key:
-                is_not_null = True
-            
-            # 创建列信息
-            column_info = ColumnInfo(
-                name=col_name,
-                data_type=data_type,
-                nullable=not is_not_null,
-                is_primary_key=is_primary_key
-            )
+            if column_info.is_primary_key:
+                primary_key_columns.append(col_name)
             column_infos.append(column_info)
         
         # 2. 处理表级主键约束
         if hasattr(create_table_node, 'constraints') and create_table_node.constraints:
+            col_info_by_name = {col_info.name: col_info for col_info in column_infos}
             for constraint in create_table_node.constraints:
-                if hasattr(constraint, '__class__') and 'PrimaryKeyConstraint' in constraint.__class__.__name__:
+                if isinstance(constraint, PrimaryKeyConstraint):
                     # 处理表级主键约束
                     if hasattr(constraint, 'column_names'):
                         for col_name_obj in constraint.column_names:
@@ -204,11 +213,10 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
                                 primary_key_columns.append(col_name)
                             
                             # 更新列信息
-                            for col_info in column_infos:
-                                if col_info.name == col_name:
-                                    col_info.is_primary_key = True
-                                    col_info.nullable = False  # 主键不能为NULL
-                                    break
+                            col_info = col_info_by_name.get(col_name)
+                            if col_info is not None:
+                                col_info.is_primary_key = True
+                                col_info.nullable = False  # 主键不能为NULL
         
         # 3. 验证主键约束
         if not primary_key_columns:
@@ -226,32 +234,64 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
         table_info = TableInfo(table_name, column_infos)
         self.symbol_table.add_table(table_info)
     
+    def _parse_column_definition(self, col_def) -> Tuple[Optional[str], Optional[ColumnInfo], Optional[str]]:
+        """
+        解析单个列定义（不访问符号表，也不检查列名重复）
+        
+        Args:
+            col_def: 列定义节点
+            
+        Returns:
+            Tuple[Optional[str], Optional[ColumnInfo], Optional[str]]: (列名, 列信息, 错误信息)，
+            出错时列信息为None（缺少列名时列名也为None）
+        """
+        # 获取列名
+        if hasattr(col_def, 'name'):
+            if hasattr(col_def.name, 'name'):
+                col_name = col_def.name.name
+            else:
+                col_name = str(col_def.name)
+        else:
+            return None, None, "Column definition must have a name"
+        
+        # 处理数据类型
+        col_type = getattr(col_def, 'data_type', None)
+        if not col_type:
+            return col_name, None, f"Column '{col_name}' must have a data type"
+        
+        # 支持不同的数据类型表示方式
+        if hasattr(col_type, 'type_name'):
+            data_type_str = col_type.type_name
+        elif hasattr(col_type, 'type'):
+            data_type_str = col_type.type
+        elif hasattr(col_type, 'name'):
+            data_type_str = col_type.name
+        else:
+            data_type_str = str(col_type)
+        
+        # 转换为标准数据类型并检查是否有效
+        data_type = self._convert_to_data_type(data_type_str)
+        if data_type == DataType.UNKNOWN:
+            return col_name, None, f"Unknown data type: {data_type_str}"
+        
+        # 处理列级约束（位标志）；主键列不能为NULL
+        constraints = getattr(col_def, 'constraints', 0)
+        is_primary_key = bool(constraints & CONSTRAINT_PRIMARY_KEY)
+        is_not_null = is_primary_key or bool(constraints & CONSTRAINT_NOT_NULL)
+        
+        column_info = ColumnInfo(
+            name=col_name,
+            data_type=data_type,
+            nullable=not is_not_null,
+            is_primary_key=is_primary_key
+        )
+        return col_name, column_info, None
+    
     def _convert_to_data_type(self, type_str: str) -> DataType:
         """将字符串转换为数据类型"""
-        type_mapping = {
-            'INT': DataType.INT,
-            'INTEGER': DataType.INT,
-            'SMALLINT': DataType.INT,
-            'BIGINT': DataType.INT,
-            'TINYINT': DataType.INT,
-            'FLOAT': DataType.FLOAT,
-            'REAL': DataType.FLOAT,
-            'DOUBLE': DataType.FLOAT,
-            'DECIMAL': DataType.DECIMAL,
-            'NUMERIC': DataType.DECIMAL,
-            'VARCHAR': DataType.VARCHAR,
-            'CHAR': DataType.VARCHAR,
-            'TEXT': DataType.VARCHAR,
-            'DATE': DataType.DATE,
-            'TIME': DataType.TIME,
-            'TIMESTAMP': DataType.TIMESTAMP,
-            'BOOLEAN': DataType.BOOLEAN,
-            'BOOL': DataType.BOOLEAN
-        }
-        
         # 处理带参数的类型，如VARCHAR(50)
-        base_type = type_str.split('(')[0].upper()
-        return type_mapping.get(base_type, DataType.UNKNOWN)
+        base_type = type_str.partition('(')[0].upper()
+        return _TYPE_MAPPING.get(base_type, DataType.UNKNOWN)
     
     def _analyze_select(self, select_node):
         """增强的SELECT语句分析"""
@@ -268,8 +308,6 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
     
     def _check_aggregate_functions(self, columns):
         """检查聚合函数"""
-        aggregate_functions = {'COUNT', 'SUM', 'AVG', 'MIN', 'MAX', 'GROUP_CONCAT'}
-        
         # 处理不同的columns格式
         if hasattr(columns, 'names') and columns.names:
             # Columns对象，获取names列表
@@ -284,7 +322,7 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
         for col in column_list:
             if hasattr(col, 'function') and col.function:
                 func_name = col.function.upper()
-                if func_name not in aggregate_functions:
+                if func_name not in _AGGREGATE_FUNCTIONS:
                     self._add_error(f"Unknown aggregate function: {func_name}")
     
     def _check_group_by(self, select_node):
@@ -298,15 +336,18 @@ class EnhancedSemanticAnalyzer(SemanticAnalyzer):
         if not table_info:
             return
         
-        # 检查GROUP BY中的列是否存在
+        # 检查GROUP BY中的列是否存在（列名集合每次构建一次，逐列哈希查找）
+        column_names = {col.name for col in table_info.columns}
         for col_name in select_node.group_by:
-            if not any(col.name == col_name for col in table_info.columns):
+            if col_name not in column_names:
                 self._add_error(f"Column '{col_name}' in GROUP BY does not exist in table '{table_name}'")
 
 
 class TypeChecker:
     """类型检查器"""
     
+    __slots__ = ('type_rules',)
+    
     def __init__(self):
         self.type_rules = TypeRules()
     
@@ -316,38 +357,49 @@ class TypeChecker:
             return True
         
         # 检查数值类型兼容性
-        if self._is_numeric_type(left_type) and self._is_numeric_type(right_type):
+        if left_type in _NUMERIC_TYPES and right_type in _NUMERIC_TYPES:
             return True
         
         # 检查字符串类型兼容性
-        if self._is_string_type(left_type) and self._is_string_type(right_type):
+        if left_type in _STRING_TYPES and right_type in _STRING_TYPES:
             return True
         
         return False
     
     def _is_numeric_type(self, data_type: DataType) -> bool:
         """检查是否为数值类型"""
-        return data_type in [DataType.INT, DataType.FLOAT, DataType.DECIMAL]
+        return data_type in _NUMERIC_TYPES
     
     def _is_string_type(self, data_type: DataType) -> bool:
         """检查是否为字符串类型"""
-        return data_type in [DataType.VARCHAR, DataType.CHAR, DataType.TEXT]
+        return data_type in _STRING_TYPES
 
 
 class TypeRules:
     """类型规则"""
     
+    __slots__ = ('_conversion_rules',)
+    
     def __init__(self):
-        self.conversion_rules = {
-            (DataType.INT, DataType.FLOAT): self._int_to_float,
-            (DataType.FLOAT, DataType.INT): self._float_to_int,
-            (DataType.VARCHAR, DataType.INT): self._varchar_to_int,
-        }
+        # 类型转换规则首次访问时再构建
+        self._conversion_rules = None
+    
+    @property
+    def conversion_rules(self) -> Dict[tuple, Any]:
+        """类型转换规则：(源类型, 目标类型) -> 转换函数"""
+        conversion_rules = self._conversion_rules
+        if conversion_rules is None:
+            conversion_rules = self._conversion_rules = {
+                (DataType.INT, DataType.FLOAT): self._int_to_float,
+                (DataType.FLOAT, DataType.INT): self._float_to_int,
+                (DataType.VARCHAR, DataType.INT): self._varchar_to_int,
+            }
+        return conversion_rules
     
     def get_result_type(self, operator: str, left_type: DataType, right_type: DataType) -> DataType:
         """获取二元操作的结果类型"""
         if operator in ['+', '-', '*', '/']:
-            if self._is_numeric_type(left_type) and self._is_numeric_type(right_type):
+            if left_type in _NUMERIC_TYPES and right_type in _NUMERIC_TYPES:
                 return DataType.FLOAT if DataType.FLOAT in [left_type, right_type] else DataType.INT
         elif operator in ['=', '!=', '<', '>', '<=', '>=']:
             return DataType.BOOLEAN
@@ -373,4 +425,4 @@ class TypeRules:
     
     def _is_numeric_type(self, data_type: DataType) -> bool:
         """检查是否为数值类型"""
-        return data_type in [DataType.INT, DataType.FLOAT, DataType.DECIMAL]
+        return data_type in _NUMERIC_TYPES
@@ -2,17 +2,83 @@
 """
 执行计划适配器 - 将逻辑执行计划转换为执行器期望的格式
 """
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from copy import deepcopy
+from operator import attrgetter
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from .logical_operators import LogicalOperator, ScanOperator, FilterOperator, ProjectOperator, InsertOperator
 from .logical_operators import IndexScanOperator, CreateIndexOperator
+from .logical_operators import CreateTriggerOperator, DropTriggerOperator, ShowTriggersOperator
 from .symbol_table import SymbolTable
+from .lexicalAnalysis import tokenize
+from .syntax_adapter import SyntaxAdapter
+from .enhanced_semantic_analyzer import EnhancedSemanticAnalyzer as SemanticAnalyzer
+from .enhanced_query_planner import EnhancedExecutionPlanGenerator as ExecutionPlanGenerator
+
+# 执行器格式中过滤条件的类型标记
+_BINARY_EXPRESSION = "binary_expression"
+
+_COLUMN_NAME = attrgetter('column_name')
+_VALUE = attrgetter('value')
+
+# 编译结果缓存的最大条目数（LRU淘汰）
+_PLAN_CACHE_SIZE = 1024
+
+
+def _value_or_str(value) -> Any:
+    """取字面量的值，非字面量时返回其字符串表示"""
+    try:
+        return value.value
+    except AttributeError:
+        return str(value)
+
+
+def _column_name_or_str(col_ref) -> Any:
+    """取列引用的列名，非列引用时返回其字符串表示"""
+    try:
+        return col_ref.column_name
+    except AttributeError:
+        return str(col_ref)
+
+
+def _name_attr(op, attr: str, fallback_attr: str) -> Any:
+    """
+    读取操作符上的名称属性，取不到时回退到 fallback_attr 对象的 name 属性
+    
+    Args:
+        op: 操作符
+        attr: 首选属性名，如 index_name
+        fallback_attr: 回退对象的属性名，如 index
+        
+    Returns:
+        Any: 名称，均取不到时为'unknown'
+    """
+    value = getattr(op, attr, 'unknown')
+    if value == 'unknown':
+        value = getattr(getattr(op, fallback_attr, None), 'name', 'unknown')
+    return value
 
 
 class ExecutionPlanAdapter:
     """执行计划适配器"""
     
+    # 属性集合固定，使用 __slots__ 去掉实例 __dict__
+    __slots__ = ('symbol_table', '_dispatch')
+    
     def __init__(self, symbol_table: SymbolTable):
         self.symbol_table = symbol_table
+        
+        # 操作符类 -> 适配方法，按具体类型一次字典查找完成分派
+        # 未登记的操作符类（子类或其他模块的同名类）回退到按类名/操作符类型探测
+        self._dispatch: Dict[type, Callable[[Any], Dict[str, Any]]] = {
+            InsertOperator: self._adapt_insert_plan,
+            ProjectOperator: self._adapt_select_plan,
+            IndexScanOperator: self._adapt_index_scan_plan,
+            CreateIndexOperator: self._adapt_create_index_plan,
+            CreateTriggerOperator: self._adapt_create_trigger_plan,
+            DropTriggerOperator: self._adapt_drop_trigger_plan,
+            ShowTriggersOperator: self._adapt_show_triggers_plan,
+        }
     
     def adapt_logical_plan_to_executor_format(self, logical_plan) -> Dict[str, Any]:
         """
@@ -20,29 +86,37 @@ class ExecutionPlanAdapter:
         """
         root_op = logical_plan.root
         
-        # 检查操作符类型
-        if hasattr(root_op, 'operator_type'):
-            op_type = root_op.operator_type.value
-        else:
-            op_type = str(type(root_op))
-        
+        handler = self._dispatch.get(type(root_op))
+        if handler is None:
+            # 未登记的操作符类：探测一次后按类缓存，之后同类操作符直接命中分派表
+            handler = self._resolve_handler(root_op)
+            self._dispatch[type(root_op)] = handler
+        return handler(root_op)
+    
+    def _resolve_handler(self, root_op) -> Callable[[Any], Dict[str, Any]]:
+        """按类名/类型/操作符类型探测适配方法（用于未在分派表中登记的操作符类）"""
         # 通过类名检查
         class_name = type(root_op).__name__
         
         if 'Insert' in class_name or isinstance(root_op, InsertOperator):
-            return self._adapt_insert_plan(root_op)
+            return self._adapt_insert_plan
         elif 'Project' in class_name or isinstance(root_op, ProjectOperator):
-            return self._adapt_select_plan(root_op)
+            return self._adapt_select_plan
         elif 'IndexScan' in class_name or isinstance(root_op, IndexScanOperator):
-            return self._adapt_index_scan_plan(root_op)
+            return self._adapt_index_scan_plan
         elif 'CreateIndex' in class_name or isinstance(root_op, CreateIndexOperator):
-            return self._adapt_create_index_plan(root_op)
-        elif 'CreateTrigger' in class_name or op_type == 'CreateTrigger':
-            return self._adapt_create_trigger_plan(root_op)
+            return self._adapt_create_index_plan
+        
+        # 仅触发器分支需要操作符类型，按需读取
+        operator_type = getattr(root_op, 'operator_type', None)
+        op_type = operator_type.value if operator_type is not None else None
+        
+        if 'CreateTrigger' in class_name or op_type == 'CreateTrigger':
+            return self._adapt_create_trigger_plan
         elif 'DropTrigger' in class_name or op_type == 'DropTrigger':
-            return self._adapt_drop_trigger_plan(root_op)
+            return self._adapt_drop_trigger_plan
         elif 'ShowTriggers' in class_name or op_type == 'ShowTriggers':
-            return self._adapt_show_triggers_plan(root_op)
+            return self._adapt_show_triggers_plan
         else:
             raise ValueError(f"Unsupported logical operator: {type(root_op)}")
     
@@ -52,13 +126,11 @@ class ExecutionPlanAdapter:
         table_name = getattr(insert_op, 'table_name', 'unknown')
         values = getattr(insert_op, 'values', [])
         
-        # 转换值为简单格式
-        simple_values = []
-        for value in values:
-            if hasattr(value, 'value'):
-                simple_values.append(value.value)
-            else:
-                simple_values.append(str(value))
+        # 转换值为简单格式：通常都是字面量，整体映射；混有其他对象时逐个回退为字符串
+        try:
+            simple_values = list(map(_VALUE, values))
+        except AttributeError:
+            simple_values = [_value_or_str(value) for value in values]
         
         return {
             "type": "INSERT_PLAN",
@@ -69,37 +141,33 @@ class ExecutionPlanAdapter:
     def _adapt_select_plan(self, project_op) -> Dict[str, Any]:
         """适配SELECT计划"""
         # 从Project操作符中提取信息
-        select_list = []
         table_name = None
         where_clause = None
         
-        # 安全地获取列信息
+        # 安全地获取列信息：通常都是列引用，整体映射；混有其他对象时逐个回退为字符串
         columns = getattr(project_op, 'columns', [])
-        for col_ref in columns:
-            if hasattr(col_ref, 'column_name'):
-                select_list.append(col_ref.column_name)
-            else:
-                select_list.append(str(col_ref))
-        
-        # 遍历子操作符找到表名和WHERE条件
-        current_op = project_op
-        children = getattr(current_op, 'children', [])
+        try:
+            select_list = list(map(_COLUMN_NAME, columns))
+        except AttributeError:
+            select_list = [_column_name_or_str(col_ref) for col_ref in columns]
         
+        # 沿第一个子操作符向下遍历，找到表名和WHERE条件（每层只读一次操作符类型）
+        children = getattr(project_op, 'children', None)
         while children:
             child = children[0]
+            operator_type = getattr(child, 'operator_type', None)
+            op_type = operator_type.value if operator_type is not None else None
             
-            # 安全地检查操作符类型
-            if hasattr(child, 'operator_type') and child.operator_type.value == 'Scan':
+            if op_type == 'Scan':
+                table_name = getattr(child, 'table_name', 'unknown')
+                break
+            if op_type == 'IndexScan':
+                # 数据源是索引扫描：取其表名，WHERE条件仍由 where_clause 交给执行器
                 table_name = getattr(child, 'table_name', 'unknown')
                 break
-            elif hasattr(child, 'operator_type') and child.operator_type.value == 'Filter':
-                condition = getattr(child, 'condition', None)
-                where_clause = self._convert_filter_to_executor_format(condition)
-                current_op = child
-                children = getattr(current_op, 'children', [])
-            else:
-                current_op = child
-                children = getattr(current_op, 'children', [])
+            if op_type == 'Filter':
+                where_clause = self._convert_filter_to_executor_format(getattr(child, 'condition', None))
+            children = getattr(child, 'children', None)
         
         return {
             "type": "SELECT_PLAN",
@@ -116,7 +184,7 @@ class ExecutionPlanAdapter:
         # 简化版：返回字符串表示，执行器可以解析
         return {
             "condition": str(condition),
-            "type": "binary_expression"
+            "type": _BINARY_EXPRESSION
         }
 
     def _adapt_index_scan_plan(self, idx_op) -> Dict[str, Any]:
@@ -133,26 +201,38 @@ class ExecutionPlanAdapter:
         }
 
     def _adapt_create_index_plan(self, create_idx_op) -> Dict[str, Any]:
-        # 确保正确获取CreateIndexOperator的属性
-        index_name = getattr(create_idx_op, 'index_name', 'unknown')
-        table_name = getattr(create_idx_op, 'table_name', 'unknown')
-        column_name = getattr(create_idx_op, 'column_name', 'unknown')
-        
-        # 如果属性值为'unknown'，尝试从其他可能的属性名获取
-        if index_name == 'unknown' and hasattr(create_idx_op, 'index'):
-            index_name = getattr(create_idx_op.index, 'name', 'unknown') if hasattr(create_idx_op.index, 'name') else 'unknown'
-        
-        if table_name == 'unknown' and hasattr(create_idx_op, 'table'):
-            table_name = getattr(create_idx_op.table, 'name', 'unknown') if hasattr(create_idx_op.table, 'name') else 'unknown'
-        
-        if column_name == 'unknown' and hasattr(create_idx_op, 'column'):
-            column_name = getattr(create_idx_op.column, 'name', 'unknown') if hasattr(create_idx_op.column, 'name') else 'unknown'
-        
+        # 确保正确获取CreateIndexOperator的属性；缺失时再尝试 index/table/column 对象的 name
         return {
             "type": "CREATE_INDEX_PLAN",
-            "index_name": index_name,
-            "table_name": table_name,
-            "column_name": column_name
+            "index_name": _name_attr(create_idx_op, 'index_name', 'index'),
+            "table_name": _name_attr(create_idx_op, 'table_name', 'table'),
+            "column_name": _name_attr(create_idx_op, 'column_name', 'column')
+        }
+
+    def _adapt_create_trigger_plan(self, create_trigger_op) -> Dict[str, Any]:
+        """适配CREATE TRIGGER计划"""
+        return {
+            "type": "CREATE_TRIGGER",
+            "trigger_name": getattr(create_trigger_op, 'trigger_name', 'unknown'),
+            "table_name": getattr(create_trigger_op, 'table_name', 'unknown'),
+            "timing": getattr(create_trigger_op, 'timing', 'unknown'),
+            "events": getattr(create_trigger_op, 'events', []),
+            "is_row_level": getattr(create_trigger_op, 'is_row_level', False),
+            "when_condition": getattr(create_trigger_op, 'when_condition', None),
+            "trigger_body": getattr(create_trigger_op, 'trigger_body', [])
+        }
+    
+    def _adapt_drop_trigger_plan(self, drop_trigger_op) -> Dict[str, Any]:
+        """适配DROP TRIGGER计划"""
+        return {
+            "type": "DROP_TRIGGER",
+            "trigger_name": getattr(drop_trigger_op, 'trigger_name', 'unknown')
+        }
+    
+    def _adapt_show_triggers_plan(self, show_triggers_op) -> Dict[str, Any]:
+        """适配SHOW TRIGGERS计划"""
+        return {
+            "type": "SHOW_TRIGGERS"
         }
 
 
@@ -162,88 +242,102 @@ class SQLCompiler:
     def __init__(self, symbol_table: SymbolTable):
         self.symbol_table = symbol_table
         self.adapter = ExecutionPlanAdapter(symbol_table)
+        
+        # 各阶段组件按编译器复用：语法分析器每次解析都会重置内部状态，
+        # 语义分析器每次 analyze() 都会清空错误和警告
+        self._syntax_analyzer = SyntaxAdapter(use_new_analyzer=True)
+        self._semantic_analyzer = SemanticAnalyzer(symbol_table)
+        self._plan_generator = ExecutionPlanGenerator(symbol_table)
+        
+        # 编译结果缓存：(符号表版本, SQL文本) -> 执行器计划；表结构变化后旧版本的条目不再命中
+        self._plan_cache: 'OrderedDict[Tuple[int, str], Dict[str, Any]]' = OrderedDict()
+    
+    def _parse_and_analyze(self, sql_text: str) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        词法、语法、语义分析（compile 与 compile_with_plan_info 共用）
+        
+        Args:
+            sql_text: SQL语句
+            
+        Returns:
+            Tuple[Any, Optional[Dict[str, Any]]]: (AST, 语义分析失败时的错误结果，成功时为None)
+        """
+        # 1. 词法分析
+        tokens = tokenize(sql_text)
+        
+        # 2. 语法分析
+        ast = self._syntax_analyzer.build_ast_from_tokens(tokens)
+        
+        # 3. 语义分析
+        semantic_analyzer = self._semantic_analyzer
+        if not semantic_analyzer.analyze(ast):
+            # 语义分析失败，返回错误信息
+            errors = semantic_analyzer.get_errors()
+            return ast, {
+                "type": "ERROR",
+                "message": f"语义分析失败: {errors[0]}" if errors else "未知语义错误"
+            }
+        return ast, None
     
     def compile(self, sql_text: str) -> Dict[str, Any]:
         """
         编译SQL语句，返回执行器可用的执行计划
+        
+        同一符号表版本下重复编译相同的SQL文本直接返回缓存计划的副本
         """
+        key = (self.symbol_table.version, sql_text)
+        cached = self._plan_cache.get(key)
+        if cached is not None:
+            self._plan_cache.move_to_end(key)
+            return deepcopy(cached)
+        
         try:
-            # 1. 词法分析
-            from .lexicalAnalysis import tokenize
-            tokens = tokenize(sql_text)
-            
-            # 2. 语法分析
-            from .syntax_adapter import SyntaxAdapter
-            syntax_analyzer = SyntaxAdapter(use_new_analyzer=True)
-            ast = syntax_analyzer.build_ast_from_tokens(tokens)
-            
-            # 3. 语义分析
-            from .enhanced_semantic_analyzer import EnhancedSemanticAnalyzer as SemanticAnalyzer
-            semantic_analyzer = SemanticAnalyzer(self.symbol_table)
-            
-            if not semantic_analyzer.analyze(ast):
-                # 语义分析失败，返回错误信息
-                errors = semantic_analyzer.get_errors()
-                return {
-                    "type": "ERROR",
-                    "message": f"语义分析失败: {errors[0].message}" if errors else "未知语义错误"
-                }
+            ast, error = self._parse_and_analyze(sql_text)
+            if error is not None:
+                return error
             
             # 4. 生成逻辑执行计划
-            from .enhanced_query_planner import EnhancedQueryPlanner as ExecutionPlanGenerator
-            plan_generator = ExecutionPlanGenerator(self.symbol_table)
-            logical_plan = plan_generator.planner.create_plan(ast)
+            logical_plan = self._plan_generator.planner.create_plan(ast)
             
             # 5. 转换为执行器格式
             executor_plan = self.adapter.adapt_logical_plan_to_executor_format(logical_plan)
             
-            return executor_plan
-            
         except Exception as e:
             return {
                 "type": "ERROR",
                 "message": f"编译失败: {str(e)}"
             }
+        
+        # 只缓存成功的计划；调用方可能修改返回的计划，缓存保存独立副本
+        self._plan_cache[key] = deepcopy(executor_plan)
+        if len(self._plan_cache) > _PLAN_CACHE_SIZE:
+            self._plan_cache.popitem(last=False)
+        return executor_plan
     
     def compile_with_plan_info(self, sql_text: str) -> Dict[str, Any]:
         """
         编译SQL语句，返回包含详细计划信息的字典
         """
         try:
-            # 1-3. 词法、语法、语义分析（同上）
-            from .lexicalAnalysis import tokenize
-            from .syntax_adapter import SyntaxAdapter
-            from .enhanced_semantic_analyzer import EnhancedSemanticAnalyzer as SemanticAnalyzer
-            
-            tokens = tokenize(sql_text)
-            syntax_analyzer = SyntaxAdapter(use_new_analyzer=True)
-            ast = syntax_analyzer.build_ast_from_tokens(tokens)
-            
-            semantic_analyzer = SemanticAnalyzer(self.symbol_table)
-            if not semantic_analyzer.analyze(ast):
-                errors = semantic_analyzer.get_errors()
-                return {
-                    "type": "ERROR",
-                    "message": f"语义分析失败: {errors[0].message}" if errors else "未知语义错误"
-                }
+            ast, error = self._parse_and_analyze(sql_text)
+            if error is not None:
+                return error
             
-            # 4. 生成详细执行计划
-            from .enhanced_query_planner import EnhancedQueryPlanner as ExecutionPlanGenerator
-            plan_generator = ExecutionPlanGenerator(self.symbol_table)
-            detailed_plan = plan_generator.generate_plan(ast)
+            # 4. 生成逻辑执行计划（只规划一次，详细计划信息与执行器格式共用同一计划）
+            logical_plan = self._plan_generator.planner.create_plan(ast)
             
             # 5. 转换为执行器格式
-            logical_plan = plan_generator.planner.create_plan(ast)
             executor_plan = self.adapter.adapt_logical_plan_to_executor_format(logical_plan)
             
             return {
                 "executor_plan": executor_plan,
-                "logical_plan": detailed_plan,
+                "logical_plan": logical_plan,
                 "ast": str(ast),
                 "semantic_analysis": {
                     "success": True,
                     "errors": [],
-                    "warnings": semantic_analyzer.get_warnings()
+                    # 分析器复用，返回警告列表的副本
+                    "warnings": list(self._semantic_analyzer.get_warnings())
                 }
             }
             
@@ -252,29 +346,3 @@ class SQLCompiler:
                 "type": "ERROR",
                 "message": f"编译失败: {str(e)}"
             }
-    
-    def _adapt_create_trigger_plan(self, create_trigger_op) -> Dict[str, Any]:
-        """适配CREATE TRIGGER计划"""
-        return {
-            "type": "CREATE_TRIGGER",
-            "trigger_name": getattr(create_trigger_op, 'trigger_name', 'unknown'),
-            "table_name": getattr(create_trigger_op, 'table_name', 'unknown'),
-            "timing": getattr(create_trigger_op, 'timing', 'unknown'),
-            "events": getattr(create_trigger_op, 'events', []),
-            "is_row_level": getattr(create_trigger_op, 'is_row_level', False),
-            "when_condition": getattr(create_trigger_op, 'when_condition', None),
-            "trigger_body": getattr(create_trigger_op, 'trigger_body', [])
-        }
-    
-    def _adapt_drop_trigger_plan(self, drop_trigger_op) -> Dict[str, Any]:
-        """适配DROP TRIGGER计划"""
-        return {
-            "type": "DROP_TRIGGER",
-            "trigger_name": getattr(drop_trigger_op, 'trigger_name', 'unknown')
-        }
-    
-    def _adapt_show_triggers_plan(self, show_triggers_op) -> Dict[str, Any]:
-        """适配SHOW TRIGGERS计划"""
-        return {
-            "type": "SHOW_TRIGGERS"
-        }
\ No newline at end of file
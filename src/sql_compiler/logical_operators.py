@@ -191,6 +191,9 @@ class AggregateExpression(Expression):
 
 class LogicalOperator(ABC):
     """逻辑操作符基类"""
+    # 规划阶段每条语句会创建大量操作符实例，使用 __slots__ 去掉实例 __dict__；
+    # estimated_cost/estimated_rows 由优化器在计算成本时设置
+    __slots__ = ('operator_type', 'children', 'parent', 'estimated_cost', 'estimated_rows')
     
     def __init__(self, operator_type: OperatorType):
         self.operator_type = operator_type
@@ -217,6 +220,7 @@ class LogicalOperator(ABC):
 
 class ScanOperator(LogicalOperator):
     """表扫描操作符"""
+    __slots__ = ('table_name', 'alias', 'condition')
     
     def __init__(self, table_name: str, alias: Optional[str] = None):
         super().__init__(OperatorType.SCAN)
@@ -239,6 +243,7 @@ class ScanOperator(LogicalOperator):
 
 class IndexScanOperator(LogicalOperator):
     """索引扫描操作符"""
+    __slots__ = ('table_name', 'index_name', 'column_name', 'predicate', 'selectivity', 'order_direction')
     
     def __init__(self, table_name: str, index_name: str, column_name: str, predicate: Optional[str] = None):
         super().__init__(OperatorType.INDEX_SCAN)
@@ -264,6 +269,7 @@ class IndexScanOperator(LogicalOperator):
 
 class CreateIndexOperator(LogicalOperator):
     """创建索引操作符（逻辑DDL）"""
+    __slots__ = ('index_name', 'table_name', 'columns', 'column_name')
     def __init__(self, index_name: str, table_name: str, column_or_columns):
         super().__init__(OperatorType.CREATE_INDEX)
         self.index_name = index_name
@@ -289,6 +295,7 @@ class CreateIndexOperator(LogicalOperator):
 
 class DropIndexOperator(LogicalOperator):
     """删除索引操作符（逻辑DDL）"""
+    __slots__ = ('index_name',)
     def __init__(self, index_name: str):
         super().__init__(OperatorType.DROP_INDEX)
         self.index_name = index_name
@@ -309,6 +316,7 @@ class DropIndexOperator(LogicalOperator):
 
 class FilterOperator(LogicalOperator):
     """过滤操作符"""
+    __slots__ = ('condition',)
     
     def __init__(self, condition: Expression):
         super().__init__(OperatorType.FILTER)
@@ -327,6 +335,7 @@ class FilterOperator(LogicalOperator):
 
 class ProjectOperator(LogicalOperator):
     """投影操作符"""
+    __slots__ = ('columns',)
     
     def __init__(self, columns: List[Union[str, ColumnReference]]):
         super().__init__(OperatorType.PROJECT)
@@ -346,6 +355,7 @@ class ProjectOperator(LogicalOperator):
 
 class JoinOperator(LogicalOperator):
     """连接操作符"""
+    __slots__ = ('join_type', 'condition', 'join_method', 'left_child', 'right_child', '_children_set')
     
     def __init__(self, join_type: JoinType, condition: Expression, join_method: JoinMethod = JoinMethod.NESTED_LOOP):
         super().__init__(OperatorType.JOIN)
@@ -386,6 +396,7 @@ class JoinOperator(LogicalOperator):
 
 class SortOperator(LogicalOperator):
     """排序操作符"""
+    __slots__ = ('order_by', 'ascending')
     
     def __init__(self, order_by: List[ColumnReference], ascending: List[bool]):
         super().__init__(OperatorType.SORT)
@@ -408,6 +419,7 @@ class SortOperator(LogicalOperator):
 
 class OrderByOperator(LogicalOperator):
     """ORDER BY操作符"""
+    __slots__ = ('order_items',)
     
     def __init__(self, order_items: List[Dict[str, Any]]):
         super().__init__(OperatorType.SORT)
@@ -427,6 +439,7 @@ class OrderByOperator(LogicalOperator):
 
 class LimitOperator(LogicalOperator):
     """限制操作符"""
+    __slots__ = ('limit', 'offset')
     
     def __init__(self, limit: int, offset: int = 0):
         super().__init__(OperatorType.LIMIT)
@@ -449,6 +462,7 @@ class LimitOperator(LogicalOperator):
 
 class InsertOperator(LogicalOperator):
     """插入操作符"""
+    __slots__ = ('table_name', 'values')
     
     def __init__(self, table_name: str, values: List[Any]):
         super().__init__(OperatorType.INSERT)
@@ -470,6 +484,7 @@ class InsertOperator(LogicalOperator):
 
 class UpdateOperator(LogicalOperator):
     """更新操作符"""
+    __slots__ = ('table_name', 'set_clause', 'where_clause')
     
     def __init__(self, table_name: str, set_clause: Dict[str, Any], where_clause: Optional[Expression] = None):
         super().__init__(OperatorType.UPDATE)
@@ -494,6 +509,7 @@ class UpdateOperator(LogicalOperator):
 
 class DeleteOperator(LogicalOperator):
     """删除操作符"""
+    __slots__ = ('table_name', 'where_clause')
     
     def __init__(self, table_name: str, where_clause: Optional[Expression] = None):
         super().__init__(OperatorType.DELETE)
@@ -546,6 +562,7 @@ class LogicalPlan:
 
 class CreateViewOperator(LogicalOperator):
     """创建视图操作符"""
+    __slots__ = ('view_name', 'definition', 'schema_name', 'creator', 'is_updatable')
     
     def __init__(self, view_name: str, definition: str, schema_name: str = 'public', 
                  creator: str = 'system', is_updatable: bool = False):
@@ -573,6 +590,7 @@ class CreateViewOperator(LogicalOperator):
 
 class DropViewOperator(LogicalOperator):
     """删除视图操作符"""
+    __slots__ = ('view_name',)
     
     def __init__(self, view_name: str):
         super().__init__(OperatorType.DROP_VIEW)
@@ -591,6 +609,7 @@ class DropViewOperator(LogicalOperator):
 
 class AlterViewOperator(LogicalOperator):
     """修改视图操作符"""
+    __slots__ = ('view_name', 'definition', 'is_updatable')
     
     def __init__(self, view_name: str, definition: str, is_updatable: Optional[bool] = None):
         super().__init__(OperatorType.ALTER_VIEW)
@@ -613,6 +632,7 @@ class AlterViewOperator(LogicalOperator):
 
 class CreateTableOperator(LogicalOperator):
     """创建表操作符"""
+    __slots__ = ('table_name', 'columns')
     def __init__(self, table_name: str, columns: list):
         super().__init__(OperatorType.CREATE_TABLE)
         self.table_name = table_name
@@ -631,6 +651,7 @@ class CreateTableOperator(LogicalOperator):
 
 class DropTableOperator(LogicalOperator):
     """删除表操作符"""
+    __slots__ = ('table_name', 'if_exists')
     def __init__(self, table_name: str, if_exists: bool = False):
         super().__init__(OperatorType.DROP_TABLE)
         self.table_name = table_name
@@ -649,6 +670,7 @@ class DropTableOperator(LogicalOperator):
 
 class CreateTriggerOperator(LogicalOperator):
     """创建触发器操作符"""
+    __slots__ = ('trigger_name', 'table_name', 'timing', 'events', 'is_row_level', 'when_condition', 'trigger_body')
     def __init__(self, trigger_name: str, table_name: str, timing: str, events: list, 
                  is_row_level: bool, when_condition: Any, trigger_body: list):
         super().__init__(OperatorType.CREATE_TRIGGER)
@@ -678,6 +700,7 @@ class CreateTriggerOperator(LogicalOperator):
 
 class DropTriggerOperator(LogicalOperator):
     """删除触发器操作符"""
+    __slots__ = ('trigger_name',)
     def __init__(self, trigger_name: str):
         super().__init__(OperatorType.DROP_TRIGGER)
         self.trigger_name = trigger_name
@@ -694,6 +717,7 @@ class DropTriggerOperator(LogicalOperator):
 
 class ShowTablesOperator(LogicalOperator):
     """显示表操作符"""
+    __slots__ = ()
     def __init__(self):
         super().__init__(OperatorType.SHOW_TABLES)
     
@@ -706,6 +730,7 @@ class ShowTablesOperator(LogicalOperator):
 
 class ShowViewsOperator(LogicalOperator):
     """显示视图操作符"""
+    __slots__ = ()
     def __init__(self):
         super().__init__(OperatorType.SHOW_VIEWS)
     
@@ -718,6 +743,7 @@ class ShowViewsOperator(LogicalOperator):
 
 class ShowColumnsOperator(LogicalOperator):
     """显示列操作符"""
+    __slots__ = ('table_name',)
     def __init__(self, table_name: str):
         super().__init__(OperatorType.SHOW_COLUMNS)
         self.table_name = table_name
@@ -734,6 +760,7 @@ class ShowColumnsOperator(LogicalOperator):
 
 class ShowIndexOperator(LogicalOperator):
     """显示索引操作符"""
+    __slots__ = ('table_name',)
     def __init__(self, table_name: str):
         super().__init__(OperatorType.SHOW_INDEX)
         self.table_name = table_name
@@ -750,6 +777,7 @@ class ShowIndexOperator(LogicalOperator):
 
 class ShowTriggersOperator(LogicalOperator):
     """显示触发器操作符"""
+    __slots__ = ()
     def __init__(self):
         super().__init__(OperatorType.SHOW_TRIGGERS)
     
@@ -762,6 +790,7 @@ class ShowTriggersOperator(LogicalOperator):
 
 class ExplainOperator(LogicalOperator):
     """解释查询操作符"""
+    __slots__ = ('query',)
     def __init__(self, query):
         super().__init__(OperatorType.EXPLAIN)
         self.query = query
@@ -778,6 +807,7 @@ class ExplainOperator(LogicalOperator):
 
 class GroupByOperator(LogicalOperator):
     """分组操作符"""
+    __slots__ = ('group_columns',)
     def __init__(self, group_columns):
         super().__init__(OperatorType.GROUP_BY)
         self.group_columns = group_columns
@@ -794,6 +824,7 @@ class GroupByOperator(LogicalOperator):
 
 class HavingOperator(LogicalOperator):
     """HAVING子句操作符"""
+    __slots__ = ('condition',)
     def __init__(self, condition):
         super().__init__(OperatorType.HAVING)
         self.condition = condition
@@ -811,6 +842,7 @@ class HavingOperator(LogicalOperator):
 # --- 游标相关逻辑操作符 ---
 class DeclareCursorOperator(LogicalOperator):
     """声明游标操作符"""
+    __slots__ = ('cursor_name', 'query_plan')
     def __init__(self, cursor_name: str, query_plan: 'LogicalOperator'):
         super().__init__(OperatorType.DECLARE_CURSOR)
         self.cursor_name = cursor_name
@@ -829,6 +861,7 @@ class DeclareCursorOperator(LogicalOperator):
 
 class OpenCursorOperator(LogicalOperator):
     """打开游标操作符"""
+    __slots__ = ('cursor_name',)
     def __init__(self, cursor_name: str):
         super().__init__(OperatorType.OPEN_CURSOR)
         self.cursor_name = cursor_name
@@ -845,6 +878,7 @@ class OpenCursorOperator(LogicalOperator):
 
 class FetchCursorOperator(LogicalOperator):
     """获取游标操作符"""
+    __slots__ = ('cursor_name',)
     def __init__(self, cursor_name: str):
         super().__init__(OperatorType.FETCH_CURSOR)
         self.cursor_name = cursor_name
@@ -861,6 +895,7 @@ class FetchCursorOperator(LogicalOperator):
 
 class CloseCursorOperator(LogicalOperator):
     """关闭游标操作符"""
+    __slots__ = ('cursor_name',)
     def __init__(self, cursor_name: str):
         super().__init__(OperatorType.CLOSE_CURSOR)
         self.cursor_name = cursor_name
@@ -877,6 +912,7 @@ class CloseCursorOperator(LogicalOperator):
 
 class AggregateOperator(LogicalOperator):
     """聚合操作符"""
+    __slots__ = ('columns', 'table_name', 'child', 'group_by_columns', 'having_clause')
     def __init__(self, columns, table_name, child, group_by_columns=None, having_clause=None):
         super().__init__(OperatorType.AGGREGATE)
         self.columns = columns
@@ -910,6 +946,7 @@ class AggregateOperator(LogicalOperator):
 
 class BeginTransactionOperator(LogicalOperator):
     """开始事务操作符"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__(OperatorType.BEGIN_TRANSACTION)
@@ -928,6 +965,7 @@ class BeginTransactionOperator(LogicalOperator):
 
 class CommitTransactionOperator(LogicalOperator):
     """提交事务操作符"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__(OperatorType.COMMIT_TRANSACTION)
@@ -946,6 +984,7 @@ class CommitTransactionOperator(LogicalOperator):
 
 class RollbackTransactionOperator(LogicalOperator):
     """回滚事务操作符"""
+    __slots__ = ()
     
     def __init__(self):
         super().__init__(OperatorType.ROLLBACK_TRANSACTION)
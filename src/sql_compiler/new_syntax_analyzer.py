@@ -15,7 +15,9 @@ from .ast_nodes import (
     CreateTriggerStatement, DropTriggerStatement, ShowTriggersStatement,
     OldNewReference, WhenCondition, IfStatement, SignalStatement,
     DeclareCursorStatement, OpenCursorStatement, FetchCursorStatement, CloseCursorStatement,
-    SelectStatement, SubqueryExpression
+    SelectStatement, SubqueryExpression, new_identifier, new_literal,
+    CONSTRAINT_PRIMARY_KEY, CONSTRAINT_NOT_NULL, CONSTRAINT_UNIQUE, CONSTRAINT_AUTO_INCREMENT,
+    constraint_names
 )
 
 
@@ -26,12 +28,15 @@ class NewSyntaxAnalyzer:
         self.tokens = []
         self.current = 0
         self.errors = []
+        # 列引用标识符驻留池：列名 -> Identifier，同一次分析中重复出现的列名共享同一节点
+        self._column_pool = {}
     
     def build_ast_from_tokens(self, tokens):
         """从token流构建AST"""
         self.tokens = tokens
         self.current = 0
         self.errors = []
+        self._column_pool = {}
         
         try:
             ast = self.parse_program()
@@ -46,6 +51,7 @@ class NewSyntaxAnalyzer:
         self.tokens = tokens
         self.current = 0
         self.errors = []
+        self._column_pool = {}
         
         try:
             query = self.parse_query()
@@ -167,7 +173,7 @@ class NewSyntaxAnalyzer:
         """解析CREATE TRIGGER语句"""
         self.consume('TRIGGER', '期望 TRIGGER')
         trigger_name_token = self.consume_id('期望触发器名')
-        trigger_name = Identifier(trigger_name_token, self.get_token_value(trigger_name_token))
+        trigger_name = new_identifier(trigger_name_token, self.get_token_value(trigger_name_token))
         
         # 解析触发时机
         timing = self.parse_trigger_timing()
@@ -177,7 +183,7 @@ class NewSyntaxAnalyzer:
         
         self.consume('ON', '期望 ON')
         table_name_token = self.consume_id('期望表名')
-        table_name = Identifier(table_name_token, self.get_token_value(table_name_token))
+        table_name = new_identifier(table_name_token, self.get_token_value(table_name_token))
         
         # 解析FOR EACH ROW
         is_row_level = self.parse_for_each_row()
@@ -393,22 +399,12 @@ class NewSyntaxAnalyzer:
             if self.match('ORDER'):
                 order_by = self.parse_order_by_clause()
             
-            return SelectStatement(
-                select_list=columns,
-                from_table=table_ref,
-                joins=joins,
-                where_clause=where_condition
-            )
+            return SelectStatement._fast_make(columns, table_ref, joins, where_condition)
         else:
             # 没有FROM子句的SELECT语句（如 SELECT 'test'）
             # 创建一个虚拟的表引用
-            dummy_table = Identifier(('ID', 'DUAL', 0, 0), 'DUAL')
-            return SelectStatement(
-                select_list=columns,
-                from_table=dummy_table,
-                joins=[],
-                where_clause=None
-            )
+            dummy_table = new_identifier(('ID', 'DUAL', 0, 0), 'DUAL')
+            return SelectStatement._fast_make(columns, dummy_table, [], None)
     
     def parse_column_or_constraint_definition(self):
         """根据下一个token判断是解析列定义还是表约束"""
@@ -428,15 +424,15 @@ class NewSyntaxAnalyzer:
         self.consume('KEY', '期望 KEY')
         self.consume('(', '期望 (')
         column_name_token = self.consume_id('期望列名')
-        column_name = Identifier(column_name_token, self.get_token_value(column_name_token))
+        column_name = new_identifier(column_name_token, self.get_token_value(column_name_token))
         self.consume(')', '期望 )')
         
         self.consume('REFERENCES', '期望 REFERENCES')
         ref_table_token = self.consume_id('期望引用的表名')
-        ref_table_name = Identifier(ref_table_token, self.get_token_value(ref_table_token))
+        ref_table_name = new_identifier(ref_table_token, self.get_token_value(ref_table_token))
         self.consume('(', '期望 (')
         ref_column_token = self.consume_id('期望引用的列名')
-        ref_column_name = Identifier(ref_column_token, self.get_token_value(ref_column_token))
+        ref_column_name = new_identifier(ref_column_token, self.get_token_value(ref_column_token))
         self.consume(')', '期望 )')
         
         return ForeignKeyConstraint(column_name, ref_table_name, ref_column_name)
@@ -449,12 +445,12 @@ class NewSyntaxAnalyzer:
         
         column_names = []
         column_token = self.consume_id('期望列名')
-        column_names.append(Identifier(column_token, self.get_token_value(column_token)))
+        column_names.append(new_identifier(column_token, self.get_token_value(column_token)))
         
         while self.match(','):
             self.advance()  # 消费逗号
             column_token = self.consume_id('期望列名')
-            column_names.append(Identifier(column_token, self.get_token_value(column_token)))
+            column_names.append(new_identifier(column_token, self.get_token_value(column_token)))
         
         self.consume(')', '期望 )')
         return PrimaryKeyConstraint(column_names)
@@ -466,12 +462,12 @@ class NewSyntaxAnalyzer:
         
         column_names = []
         column_token = self.consume_id('期望列名')
-        column_names.append(Identifier(column_token, self.get_token_value(column_token)))
+        column_names.append(new_identifier(column_token, self.get_token_value(column_token)))
         
         while self.match(','):
             self.advance()  # 消费逗号
             column_token = self.consume_id('期望列名')
-            column_names.append(Identifier(column_token, self.get_token_value(column_token)))
+            column_names.append(new_identifier(column_token, self.get_token_value(column_token)))
         
         self.consume(')', '期望 )')
         return UniqueConstraint(column_names)
@@ -522,38 +518,39 @@ class NewSyntaxAnalyzer:
     def parse_column_definition(self):
         """解析列定义"""
         column_name_token = self.consume_id('期望列名')
-        column_name = Identifier(column_name_token, self.get_token_value(column_name_token))
+        column_name = new_identifier(column_name_token, self.get_token_value(column_name_token))
         data_type = self.parse_data_type()
         
-        # 解析约束
-        constraints = []
+        # 解析约束：常见约束记为位标志，带参数的约束才分配列表
+        constraints = 0
+        extra_constraints = None
         while not self.is_at_end() and not self.match(')') and not self.match(','):
             if self.match('PRIMARY'):
                 self.advance()  # 消费 PRIMARY
                 self.consume('KEY', '期望 KEY')
-                constraints.append('PRIMARY KEY')
+                constraints |= CONSTRAINT_PRIMARY_KEY
             elif self.match('NOT'):
                 self.advance()  # 消费 NOT
                 self.consume('NULL', '期望 NULL')
-                constraints.append('NOT NULL')
+                constraints |= CONSTRAINT_NOT_NULL
             elif self.match('UNIQUE'):
                 self.advance()  # 消费 UNIQUE
-                constraints.append('UNIQUE')
+                constraints |= CONSTRAINT_UNIQUE
             elif self.match('DEFAULT'):
                 self.advance()  # 消费 DEFAULT
                 default_value = self.parse_default_value()
-                constraints.append(f'DEFAULT {default_value}')
+                extra_constraints = (extra_constraints or []) + [f'DEFAULT {default_value}']
             elif self.match('AUTO_INCREMENT'):
                 self.advance()  # 消费 AUTO_INCREMENT
-                constraints.append('AUTO_INCREMENT')
+                constraints |= CONSTRAINT_AUTO_INCREMENT
             elif self.match('CHECK'):
                 self.advance()  # 消费 CHECK
                 check_constraint = self.parse_check_constraint()
-                constraints.append(check_constraint)
+                extra_constraints = (extra_constraints or []) + [check_constraint]
             else:
                 break
         
-        return ColumnDefinition(column_name, data_type, constraints)
+        return ColumnDefinition(column_name, data_type, constraints, extra_constraints)
     
     def parse_default_value(self):
         """解析默认值"""
@@ -1071,7 +1068,7 @@ class NewSyntaxAnalyzer:
         while self.match('+', '-', '*', '/', '%', '||'):
             operator = self.advance()
             right = self.parse_primary()
-            left = BinaryExpr(left, operator, right)
+            left = BinaryExpr._fast_make(left, operator, right)
         
         return left
     
@@ -1085,7 +1082,7 @@ class NewSyntaxAnalyzer:
                 # 解析子查询
                 subquery = self.parse_select()
                 self.consume(')', '期望 )')
-                return SubqueryExpression(subquery)
+                return SubqueryExpression._fast_make(subquery)
             else:
                 # 普通括号表达式
                 expr = self.parse_expression()
@@ -1094,22 +1091,25 @@ class NewSyntaxAnalyzer:
         elif self.match('ID'):
             # 使用 parse_column_reference 来处理表别名列名（如 o.order_id）
             column_ref = self.parse_column_reference()
-            # 创建一个临时的 token 来表示列引用
-            temp_token = ('ID', column_ref, 0, 0)
-            return Identifier(temp_token, column_ref)
+            # 列引用的临时 token 只由列名决定（无位置信息），按列名驻留
+            column = self._column_pool.get(column_ref)
+            if column is None:
+                temp_token = ('ID', column_ref, 0, 0)
+                column = self._column_pool[column_ref] = new_identifier(temp_token, column_ref)
+            return column
         elif self.match('OLD') or self.match('NEW'):
             # 处理 OLD.column 或 NEW.column 引用
             ref_type = self.get_token_value(self.advance())
             self.consume('.', '期望 .')
             column_token = self.consume_id('期望列名')
-            column_name = Identifier(column_token, self.get_token_value(column_token))
-            return OldNewReference(reference_type=ref_type, column_name=column_name)
+            column_name = new_identifier(column_token, self.get_token_value(column_token))
+            return OldNewReference._fast_make(ref_type, column_name)
         elif self.match('NUMBER'):
             token = self.advance()
-            return Literal(token, self.get_token_value(token))
+            return new_literal(token, self.get_token_value(token))
         elif self.match('STRING'):
             token = self.advance()
-            return Literal(token, self.get_token_value(token))
+            return new_literal(token, self.get_token_value(token))
         else:
             self.error(f"期望表达式，但遇到 {self.peek()}")
     
@@ -1130,7 +1130,7 @@ class NewSyntaxAnalyzer:
             self.advance()  # 消费DISTINCT
             distinct = True
             col_token = self.advance()
-            argument = Identifier(col_token, self.get_token_value(col_token))
+            argument = new_identifier(col_token, self.get_token_value(col_token))
         elif self.match('*'):
             self.advance()  # 消费*
             # COUNT(*) 的情况，argument保持None
@@ -1150,7 +1150,7 @@ class NewSyntaxAnalyzer:
             # 没有AS关键字，直接是别名（但要确保不是其他关键字）
             alias = self.get_token_value(self.consume_id('期望别名'))
         
-        return AggregateFunction(function_name, argument, distinct, alias)
+        return AggregateFunction._fast_make(function_name, argument, distinct, alias)
     
     def parse_where_clause(self):
         """解析WHERE子句"""
@@ -1440,7 +1440,7 @@ class NewSyntaxAnalyzer:
         """解析DROP TRIGGER语句"""
         self.consume('TRIGGER', '期望 TRIGGER')
         trigger_name_token = self.consume_id('期望触发器名')
-        trigger_name = Identifier(trigger_name_token, self.get_token_value(trigger_name_token))
+        trigger_name = new_identifier(trigger_name_token, self.get_token_value(trigger_name_token))
         return DropTriggerStatement(trigger_name)
     
     def parse_alter_statement(self):
@@ -1651,7 +1651,7 @@ class NewSyntaxAnalyzer:
         """解析DECLARE CURSOR语句"""
         self.consume('DECLARE', '期望 DECLARE')
         cursor_name_token = self.consume_id('期望游标名')
-        cursor_name = Identifier(cursor_name_token, self.get_token_value(cursor_name_token))
+        cursor_name = new_identifier(cursor_name_token, self.get_token_value(cursor_name_token))
         self.consume('CURSOR', '期望 CURSOR')
         self.consume('FOR', '期望 FOR')
         query = self.parse_select()
@@ -1661,21 +1661,21 @@ class NewSyntaxAnalyzer:
         """解析OPEN CURSOR语句"""
         self.consume('OPEN', '期望 OPEN')
         cursor_name_token = self.consume_id('期望游标名')
-        cursor_name = Identifier(cursor_name_token, self.get_token_value(cursor_name_token))
+        cursor_name = new_identifier(cursor_name_token, self.get_token_value(cursor_name_token))
         return OpenCursorStatement(cursor_name=cursor_name)
 
     def parse_fetch_cursor(self):
         """解析FETCH CURSOR语句"""
         self.consume('FETCH', '期望 FETCH')
         cursor_name_token = self.consume_id('期望游标名')
-        cursor_name = Identifier(cursor_name_token, self.get_token_value(cursor_name_token))
+        cursor_name = new_identifier(cursor_name_token, self.get_token_value(cursor_name_token))
         return FetchCursorStatement(cursor_name=cursor_name)
 
     def parse_close_cursor(self):
         """解析CLOSE CURSOR语句"""
         self.consume('CLOSE', '期望 CLOSE')
         cursor_name_token = self.consume_id('期望游标名')
-        cursor_name = Identifier(cursor_name_token, self.get_token_value(cursor_name_token))
+        cursor_name = new_identifier(cursor_name_token, self.get_token_value(cursor_name_token))
         return CloseCursorStatement(cursor_name=cursor_name)
 
 
@@ -1699,13 +1699,15 @@ class CreateTable:
 
 
 class ColumnDefinition:
-    def __init__(self, name, data_type, constraints=None):
+    def __init__(self, name, data_type, constraints=0, extra_constraints=None):
         self.name = name
         self.data_type = data_type
-        self.constraints = constraints or []
+        self.constraints = constraints  # 约束位标志 (CONSTRAINT_*)
+        self.extra_constraints = extra_constraints  # DEFAULT/CHECK 等其他约束
     
     def __repr__(self):
-        constraints_str = f", constraints={self.constraints}" if self.constraints else ""
+        names = constraint_names(self.constraints, self.extra_constraints)
+        constraints_str = f", constraints={names}" if names else ""
         return f"ColumnDefinition({self.name}, {self.data_type}{constraints_str})"
 
 
@@ -3,8 +3,14 @@
 符号表实现 - 用于存储表结构元数据
 """
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Dict, List, Optional, Set
 from enum import Enum
+import sys
+
+
+# 每张表的每一列都有一个列信息实例，使用 __slots__ 去掉实例 __dict__（Python 3.10+）
+_slots_dataclass = partial(dataclass, slots=True) if sys.version_info >= (3, 10) else dataclass
 
 
 class DataType(Enum):
@@ -30,7 +36,7 @@ class DataType(Enum):
     UNKNOWN = "UNKNOWN"
 
 
-@dataclass
+@_slots_dataclass
 class ColumnInfo:
     """列信息"""
     name: str
@@ -72,6 +78,8 @@ class SymbolTable:
     def __init__(self):
         self.tables: Dict[str, TableInfo] = {}
         self.current_database: Optional[str] = None
+        # 元数据版本号：增删表时递增，依赖表结构的缓存据此判断是否失效
+        self.version = 0
     
     def add_table(self, table_info: TableInfo) -> None:
         """添加表到符号表"""
@@ -79,6 +87,7 @@ class SymbolTable:
         if table_name in self.tables:
             raise ValueError(f"Table '{table_info.name}' already exists")
         self.tables[table_name] = table_info
+        self.version += 1
     
     def get_table(self, table_name: str) -> Optional[TableInfo]:
         """获取表信息"""
@@ -116,12 +125,14 @@ class SymbolTable:
         """移除表"""
         if table_name in self.tables:
             del self.tables[table_name]
+            self.version += 1
             return True
         return False
     
     def clear(self) -> None:
         """清空符号表"""
         self.tables.clear()
+        self.version += 1
     
     def __str__(self):
         if not self.tables:
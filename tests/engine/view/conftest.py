@@ -0,0 +1,7 @@
+import pytest
+from src.engine.catalog_manager import CatalogManager
+
+@pytest.fixture
+def catalog(tmp_path):
+    # 使用临时目录中的目录文件，避免污染
+    return CatalogManager(catalog_path=str(tmp_path / 'catalog.json'))
@@ -56,4 +56,20 @@ def test_create_and_get_trigger():
     assert tinfo.trigger_name == 'trg1'
     ok, msg = catalog.delete_trigger('trg1')
     assert ok
-    os.remove(path) 
\ No newline at end of file
+    os.remove(path) 
+
+def test_known_view_names_cache_invalidation():
+    catalog, path = make_catalog()
+    assert catalog.known_view_names() == frozenset()
+    catalog.create_view('v1', 'SELECT * FROM t1')
+    assert catalog.known_view_names() == frozenset({'v1'})
+    catalog.delete_view('v1')
+    assert 'v1' not in catalog.known_view_names()
+    os.remove(path)
+
+def test_try_get_view():
+    catalog, path = make_catalog()
+    assert catalog.try_get_view('v1') is None
+    catalog.create_view('v1', 'SELECT * FROM t1')
+    assert catalog.try_get_view('v1').view_name == 'v1'
+    os.remove(path)
@@ -0,0 +1,92 @@
+import pytest
+from src.engine.view.updatable_view_manager import UpdatableViewManager
+
+@pytest.fixture
+def manager(catalog):
+    return UpdatableViewManager(catalog)
+
+@pytest.mark.parametrize("definition, reason_keyword", [
+    ("SELECT a FROM t JOIN s ON t.a = s.a", "JOIN"),
+    ("SELECT count(a) FROM t", "COUNT"),
+    ("SELECT a FROM t GROUP BY a", "GROUP BY"),
+    ("SELECT DISTINCT a FROM t", "DISTINCT"),
+    ("SELECT a, (SELECT 1) FROM t", "子查询"),
+    ("SELECT a FROM t WHERE a IN (SELECT b FROM s)", "多个表"),
+])
+def test_check_updatability_conditions_rejects(definition, reason_keyword, manager):
+    ok, reason = manager._check_updatability_conditions(definition)
+    assert not ok
+    assert reason_keyword in reason
+
+@pytest.mark.parametrize("definition, reason", [
+    ("SELECT DISTINCT a FROM t JOIN s ON t.a = s.a", "视图包含JOIN，不可更新"),
+    ("SELECT SUM(a), COUNT(b) FROM t", "视图包含聚合函数 COUNT，不可更新"),
+    ("SELECT DISTINCT a FROM t GROUP BY a", "视图包含GROUP BY，不可更新"),
+    ("SELECT a FROM t, s", "视图满足可更新条件"),
+    ("SELECT a FROM t FROM t", "视图涉及多个表，不可更新"),
+    ("SELECT a FROM t WHERE b = '(x) SELECT (y)'", "视图包含子查询，不可更新"),
+])
+def test_check_updatability_conditions_precedence(definition, reason, manager):
+    assert manager._check_updatability_conditions(definition)[1] == reason
+
+def test_check_updatability_conditions_accepts_simple_view(manager):
+    ok, _ = manager._check_updatability_conditions("SELECT a, b FROM t WHERE a > 1 AND b < 2")
+    assert ok
+
+def test_analyze_view_dependencies(manager, catalog):
+    catalog.create_view('v_sum', 'SELECT a, SUM(b) FROM t GROUP BY a', is_updatable=True)
+    deps = manager.analyze_view_dependencies('v_sum')
+    assert deps['base_tables'] == ['t']
+    assert deps['is_updatable'] is False
+    assert 'SUM' in deps['updatability_reason']
+    assert deps['complexity_score'] == 2
+
+def test_validate_view_updatability_is_cached_and_invalidated(manager, catalog):
+    catalog.create_view('v_t', 'SELECT a FROM t')
+    assert manager.validate_view_updatability('v_t') == (True, "视图满足可更新条件")
+    assert ('v_t', 'SELECT a FROM t') in manager._updatability_cache
+    manager.invalidate('v_t')
+    assert not manager._updatability_cache
+
+def test_get_updatable_views(manager, catalog):
+    catalog.create_view('v_rw', 'SELECT a FROM t', is_updatable=True)
+    catalog.create_view('v_ro', 'SELECT a FROM t')
+    assert manager.get_updatable_views() == ['v_rw']
+
+def test_rewrite_view_dml(manager, catalog):
+    catalog.create_view('v_t', 'SELECT a FROM t', is_updatable=True)
+    catalog.create_view('v_ro', 'SELECT a FROM t')
+    assert manager.rewrite_view_insert('v_t', "INSERT INTO v_t VALUES (1)") == "INSERT INTO t VALUES (1)"
+    assert manager.rewrite_view_update('v_t', "UPDATE v_t SET a = 2") == "UPDATE t SET a = 2"
+    assert manager.rewrite_view_delete('v_t', "DELETE FROM v_t WHERE a = 1") == "DELETE FROM t WHERE a = 1"
+    assert manager.rewrite_view_insert('v_ro', "INSERT INTO v_ro VALUES (1)") is None
+    assert manager.rewrite_view_insert('missing', "INSERT INTO missing VALUES (1)") is None
+
+def test_managers_share_injected_view_manager(catalog):
+    from src.engine.view.view_manager import ViewManager
+    from src.engine.view.view_permission_manager import ViewPermissionManager
+    view_manager = ViewManager(catalog)
+    updatable = UpdatableViewManager(catalog, view_manager)
+    permissions = ViewPermissionManager(catalog, view_manager)
+    assert updatable.view_manager is view_manager
+    assert permissions.view_manager is view_manager
+    assert updatable.query_rewriter.view_manager is view_manager
+
+def test_analyze_view_dependencies_seeds_validation_cache(manager, catalog):
+    catalog.create_view('v_t', 'SELECT a FROM t', is_updatable=True)
+    deps = manager.analyze_view_dependencies('v_t')
+    assert deps['is_updatable'] is True
+    assert manager._updatability_cache[('v_t', 'SELECT a FROM t')] == (True, "视图满足可更新条件")
+
+def test_updatability_cache_follows_catalog_ddl_and_is_bounded(manager, catalog, monkeypatch):
+    import src.engine.view.updatable_view_manager as uvm
+    catalog.create_view('v_t', 'SELECT a FROM t')
+    assert manager.validate_view_updatability('v_t')[0]
+    catalog.delete_view('v_t')
+    assert not manager._updatability_cache
+    catalog.create_view('v_t', 'SELECT DISTINCT a FROM t')
+    assert manager.validate_view_updatability('v_t') == (False, "视图包含DISTINCT，不可更新")
+    monkeypatch.setattr(uvm, '_UPDATABILITY_CACHE_SIZE', 2)
+    for i in range(3):
+        manager._validate_definition('v_t', f'SELECT a{i} FROM t')
+    assert list(manager._updatability_cache) == [('v_t', 'SELECT a1 FROM t'), ('v_t', 'SELECT a2 FROM t')]
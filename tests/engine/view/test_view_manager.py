@@ -0,0 +1,27 @@
+import gc
+from src.engine.view.view_manager import ViewManager
+from src.engine.view.updatable_view_manager import UpdatableViewManager
+
+def test_catalog_view_ddl_notifies_listeners(catalog):
+    view_manager = ViewManager(catalog)
+    changed = []
+    view_manager.add_change_listener(changed.append)
+    catalog.create_view('v1', 'SELECT a FROM t')
+    catalog.update_view('v1', 'SELECT b FROM t')
+    catalog.delete_view('v1')
+    assert changed == ['v1', 'v1', 'v1']
+    assert view_manager.remove_change_listener(changed.append)
+    assert not view_manager.remove_change_listener(changed.append)
+    catalog.create_view('v2', 'SELECT a FROM t')
+    assert changed == ['v1', 'v1', 'v1']
+
+def test_collected_listener_owner_is_dropped(catalog):
+    manager = UpdatableViewManager(catalog)
+    manager._updatability_cache[('v1', 'SELECT a FROM t')] = (True, '')
+    catalog.create_view('v1', 'SELECT a FROM t')
+    assert not manager._updatability_cache
+    assert len(catalog._view_change_listeners) == 2
+    del manager
+    gc.collect()
+    catalog.delete_view('v1')
+    assert catalog._view_change_listeners == []
@@ -0,0 +1,80 @@
+import pytest
+from src.engine.view.view_permission_manager import ViewPermissionManager
+
+@pytest.fixture
+def manager(catalog):
+    return ViewPermissionManager(catalog)
+
+def test_grant_and_revoke_view_permission(manager, catalog):
+    catalog.create_view('v1', 'SELECT a FROM t')
+    assert manager.grant_view_permission('alice', 'v1', 'SELECT')
+    assert manager.grant_view_permission('alice', 'v1', 'UPDATE')
+    assert manager.check_view_permission('alice', 'v1', 'SELECT')
+    assert manager.get_user_permissions('alice') == {'v1': frozenset({'SELECT', 'UPDATE'})}
+    assert manager.revoke_view_permission('alice', 'v1', 'UPDATE')
+    assert manager.get_user_permissions('alice') == {'v1': frozenset({'SELECT'})}
+    assert not manager.revoke_view_permission('alice', 'v1', 'DELETE')
+
+def test_check_view_permission_missing_view(manager):
+    assert not manager.check_view_permission('alice', 'missing', 'SELECT')
+
+def test_check_view_security(manager, catalog):
+    catalog.create_view('v_users', 'SELECT name, password FROM users')
+    result = manager.check_view_security('v_users')
+    assert not result['secure']
+    assert len(result['issues']) == 2
+    catalog.create_view('v_orders', 'SELECT id FROM orders')
+    assert manager.check_view_security('v_orders')['secure']
+
+def test_view_permission_bitmask_views(manager, catalog):
+    catalog.create_view('v1', 'SELECT a FROM t')
+    manager.grant_view_permission('alice', 'v1', 'SELECT')
+    manager.grant_view_permission('alice', 'v1', 'DELETE')
+    assert manager.get_view_permissions('v1') == {'alice': {'SELECT', 'DELETE'}}
+    assert manager.list_view_permissions() == {'v1': {'alice': {'SELECT', 'DELETE'}}}
+    assert not manager.grant_view_permission('alice', 'v1', 'DROP')
+
+def test_check_view_permission_cache_invalidation(manager, catalog):
+    catalog.create_view('v1', 'SELECT a FROM t')
+    assert manager.check_view_permission('alice', 'v1', 'SELECT')
+    assert ('alice', 'v1', 'SELECT') in manager._perm_cache
+    manager.grant_view_permission('alice', 'v1', 'SELECT')
+    assert ('alice', 'v1', 'SELECT') not in manager._perm_cache
+
+def test_list_view_permissions_is_decoded_snapshot(manager, catalog):
+    catalog.create_view('v1', 'SELECT a FROM t')
+    manager.grant_view_permission('alice', 'v1', 'SELECT')
+    listing = manager.list_view_permissions()
+    assert listing == {'v1': {'alice': {'SELECT'}}}
+    listing['v1']['alice'] = {'SELECT', 'DELETE'}
+    manager._check_table_permission = lambda user, table_name, permission: False
+    assert not manager.check_view_permission('alice', 'v1', 'DELETE')
+    manager.revoke_view_permission('alice', 'v1', 'SELECT')
+    assert manager.list_view_permissions() == {'v1': {'alice': set()}}
+
+def test_check_view_permission_rechecks_table_permissions(manager, catalog):
+    catalog.create_view('v1', 'SELECT a FROM t')
+    assert manager.grant_view_permission('bob', 'v1', 'SELECT')
+    assert manager.check_view_permission('alice', 'v1', 'SELECT')
+    manager._check_table_permission = lambda user, table_name, permission: False
+    assert not manager.check_view_permission('alice', 'v1', 'SELECT')
+    assert manager.check_view_permission('bob', 'v1', 'SELECT')
+
+def test_view_permission_names_are_case_insensitive(manager, catalog):
+    catalog.create_view('v1', 'SELECT a FROM t')
+    assert manager.grant_view_permission('alice', 'v1', 'select')
+    assert manager.get_user_permissions('alice') == {'v1': frozenset({'SELECT'})}
+    manager._check_table_permission = lambda user, table_name, permission: False
+    assert manager.check_view_permission('alice', 'v1', 'select')
+    assert manager.revoke_view_permission('alice', 'v1', 'Select')
+    assert manager.get_user_permissions('alice') == {}
+    assert not manager.grant_view_permission('alice', 'v1', 'drop')
+
+def test_check_view_permission_tracks_catalog_view_ddl(manager, catalog):
+    assert not manager.check_view_permission('alice', 'v1', 'SELECT')
+    catalog.create_view('v1', 'SELECT a FROM t')
+    assert manager.check_view_permission('alice', 'v1', 'SELECT')
+    assert manager.grant_view_permission('alice', 'v1', 'SELECT')
+    assert manager.check_view_permission('alice', 'v1', 'SELECT')
+    catalog.delete_view('v1')
+    assert not manager.check_view_permission('alice', 'v1', 'SELECT')
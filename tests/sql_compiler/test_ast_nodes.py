@@ -0,0 +1,38 @@
+import sys
+from dataclasses import MISSING, fields, is_dataclass
+import pytest
+from src.sql_compiler import ast_nodes
+from src.sql_compiler.ast_nodes import ASTNode, Identifier, Literal, new_identifier, new_literal
+
+NODE_CLASSES = [cls for cls in vars(ast_nodes).values()
+                if isinstance(cls, type) and issubclass(cls, ASTNode) and is_dataclass(cls)]
+
+def init_args(cls):
+    return [f"{f.name}_value" for f in fields(cls)
+            if f.init and f.default is MISSING and f.default_factory is MISSING]
+
+@pytest.mark.parametrize("cls", NODE_CLASSES, ids=lambda cls: cls.__name__)
+def test_fast_make_matches_dataclass_init(cls):
+    args = init_args(cls)
+    assert cls._fast_make(*args) == cls(*args)
+    for f in fields(cls):
+        assert getattr(cls._fast_make(*args), f.name) == getattr(cls(*args), f.name)
+
+@pytest.mark.parametrize("cls", NODE_CLASSES, ids=lambda cls: cls.__name__)
+def test_fast_make_default_factories_are_fresh(cls):
+    args = init_args(cls)
+    first, second = cls._fast_make(*args), cls._fast_make(*args)
+    for f in fields(cls):
+        value = getattr(first, f.name)
+        if isinstance(value, (list, dict, set)):
+            assert value is not getattr(second, f.name)
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slots=True requires Python 3.10+")
+def test_ast_nodes_have_no_instance_dict():
+    literal = new_literal(('NUMBER', '1', 1, 1), 1)
+    assert type(literal) is Literal
+    assert not hasattr(literal, '__dict__')
+    identifier = new_identifier(('ID', 'a', 1, 1), 'a')
+    assert identifier == Identifier(('ID', 'a', 1, 1), 'a')
+    with pytest.raises(AttributeError):
+        identifier.extra = 1
@@ -0,0 +1,46 @@
+from src.sql_compiler.enhanced_error_handling import (
+    CompilerError, ErrorCategory, ErrorCollector, ErrorHandler, ErrorLocation, ErrorSeverity
+)
+
+def test_error_handler_keeps_first_errors_and_counts_overflow():
+    handler = ErrorHandler()
+    for i in range(handler.max_errors + 5):
+        handler.handle_semantic_error("SEM001", table=f"t{i}")
+    errors = handler.collector.get_errors()
+    assert len(errors) == handler.max_errors
+    assert errors[0].message == "Table 't0' does not exist"
+    assert errors[-1].message == f"Table 't{handler.max_errors - 1}' does not exist"
+    assert not handler.should_continue()
+    report = handler.get_report()
+    assert report.endswith("... 5 more errors")
+    handler.clear()
+    assert handler.collector.errors.overflow == 0
+    assert handler.should_continue()
+
+def test_unbounded_collector_report():
+    collector = ErrorCollector()
+    collector.add_error("SEM001", table="users")
+    collector.add_warning("SEM003", table="orders")
+    report = collector.format_report()
+    assert report.startswith("Errors:\n  1. ")
+    assert "Table 'users' does not exist" in report
+    assert "\nWarnings:\n  1. " in report
+    assert "more" not in report
+    assert collector.format_report() == report
+
+def test_collector_materializes_column_rows():
+    collector = ErrorCollector()
+    sql = "SELECT * FROM users\nWHERE id = $x;"
+    location = ErrorLocation(2, 12, 2)
+    collector.add_error("LEX001", location=location, sql=sql, token="$x")
+    collector.add_error("SEM002", severity=ErrorSeverity.WARNING, table="users", column="age")
+    collector.add_error("XXX999")
+    assert collector.get_errors() == [
+        CompilerError("Unknown token: '$x'", ErrorCategory.LEXICAL, ErrorSeverity.ERROR, location, sql,
+                      "Check for typos or unsupported characters", "LEX001"),
+        CompilerError("Unknown error: XXX999", ErrorCategory.SYSTEM, ErrorSeverity.FATAL, None, "", "", "XXX999"),
+    ]
+    assert [w.message for w in collector.get_warnings()] == ["Column 'age' does not exist in table 'users'"]
+    assert [issue.error_code for issue in collector.get_all_issues()] == ["LEX001", "XXX999", "SEM002"]
+    assert collector.errors[0] == collector.get_errors()[0]
+    assert str(collector.errors[0]).endswith("WHERE id = $x;\n           ^^")
@@ -0,0 +1,35 @@
+import pytest
+from src.sql_compiler.enhanced_query_planner import EnhancedQueryPlanner
+from src.sql_compiler.lexicalAnalysis import tokenize
+from src.sql_compiler.new_syntax_analyzer import NewSyntaxAnalyzer
+from src.sql_compiler.syntax_adapter import SyntaxAdapter
+from src.sql_compiler.symbol_table import SymbolTable
+
+def parse(sql):
+    return NewSyntaxAnalyzer().build_ast_from_tokens(tokenize(sql))
+
+def operator_chain(plan):
+    names, op = [], plan.root
+    while op is not None:
+        names.append(op.operator_type.value)
+        op = op.children[0] if op.children else None
+    return names
+
+@pytest.mark.parametrize("sql, chain", [
+    ("SELECT id FROM t WHERE id > 1;", ['Project', 'Filter', 'Scan']),
+    ("BEGIN;", ['BeginTransaction']),
+    ("COMMIT;", ['CommitTransaction']),
+])
+def test_create_plan_dispatches_parser_nodes_by_class(sql, chain):
+    planner = EnhancedQueryPlanner(SymbolTable())
+    ast = parse(sql)
+    assert type(ast.query) in planner._dispatch
+    assert operator_chain(planner.create_plan(ast)) == chain
+
+def test_create_plan_falls_back_for_converted_nodes():
+    planner = EnhancedQueryPlanner(SymbolTable())
+    ast = SyntaxAdapter(use_new_analyzer=True).build_ast_from_tokens(tokenize("SELECT id FROM t WHERE id > 1;"))
+    assert type(ast.query) not in planner._dispatch
+    plan = planner.create_plan(ast)
+    assert operator_chain(plan) == ['Project', 'Filter', 'Scan']
+    assert plan.root.children[0].children[0].table_name == 't'
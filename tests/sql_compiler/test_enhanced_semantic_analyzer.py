@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+from src.sql_compiler.enhanced_semantic_analyzer import EnhancedSemanticAnalyzer, MAX_ERRORS
+from src.sql_compiler.symbol_table import SymbolTable
+
+def make_create_table(column_count, data_type):
+    columns = [SimpleNamespace(name=f"c{i}", data_type=data_type) for i in range(column_count)]
+    return SimpleNamespace(type='CreateTableStatement', table=SimpleNamespace(name='t'),
+                           columns=columns, constraints=None)
+
+def test_analysis_stops_at_max_errors():
+    symbol_table = SymbolTable()
+    analyzer = EnhancedSemanticAnalyzer(symbol_table)
+    assert not analyzer.analyze(make_create_table(MAX_ERRORS + 10, 'BLOB'))
+    errors = analyzer.get_errors()
+    assert len(errors) == MAX_ERRORS
+    assert str(errors[0]) == "Unknown data type: BLOB"
+    assert not symbol_table.table_exists('t')
+
+def test_analysis_below_max_errors_reports_all():
+    analyzer = EnhancedSemanticAnalyzer(SymbolTable())
+    assert not analyzer.analyze(make_create_table(3, 'BLOB'))
+    assert [str(error) for error in analyzer.get_errors()] == [
+        "Unknown data type: BLOB", "Unknown data type: BLOB", "Unknown data type: BLOB",
+        "Table must have at least one primary key",
+    ]
+    assert not analyzer.analyze(make_create_table(MAX_ERRORS + 10, 'BLOB'))
+    assert len(analyzer.get_errors()) == MAX_ERRORS
@@ -0,0 +1,114 @@
+import pytest
+from src.sql_compiler.execution_plan_adapter import ExecutionPlanAdapter, SQLCompiler
+from src.sql_compiler.logical_operators import (
+    FilterOperator, IndexScanOperator, LogicalPlan, ProjectOperator, ScanOperator
+)
+from src.sql_compiler.enhanced_semantic_analyzer import EnhancedSemanticAnalyzer
+from src.sql_compiler.symbol_table import SymbolTable, TableInfo
+
+def make_adapter():
+    return ExecutionPlanAdapter(SymbolTable())
+
+def test_select_over_index_scan_keeps_where_clause():
+    project = ProjectOperator(['a'])
+    filter_op = FilterOperator('a > 1')
+    index_scan = IndexScanOperator('t', 'idx_a', 'a', {'key': (1,)})
+    project.add_child(filter_op)
+    filter_op.add_child(index_scan)
+    plan = make_adapter().adapt_logical_plan_to_executor_format(LogicalPlan(project))
+    assert plan['type'] == 'SELECT_PLAN'
+    assert plan['table_name'] == 't'
+    assert plan['where_clause'] == {'condition': 'a > 1', 'type': 'binary_expression'}
+    assert 'scan' not in plan
+
+def test_select_over_table_scan():
+    project = ProjectOperator(['a'])
+    filter_op = FilterOperator('a > 1')
+    project.add_child(filter_op)
+    filter_op.add_child(ScanOperator('t'))
+    plan = make_adapter().adapt_logical_plan_to_executor_format(LogicalPlan(project))
+    assert plan['table_name'] == 't'
+    assert plan['where_clause']['condition'] == 'a > 1'
+    assert 'scan' not in plan
+
+class ProjectLike:
+    def __init__(self):
+        self.columns = ['a']
+        self.children = []
+
+class Unsupported:
+    pass
+
+def test_fallback_dispatch_resolves_and_caches_unknown_operator_classes():
+    adapter = make_adapter()
+    plan = adapter.adapt_logical_plan_to_executor_format(LogicalPlan(ProjectLike()))
+    assert plan['type'] == 'SELECT_PLAN'
+    assert plan['select_list'] == ['a']
+    assert adapter._dispatch[ProjectLike] == adapter._adapt_select_plan
+    with pytest.raises(ValueError):
+        adapter.adapt_logical_plan_to_executor_format(LogicalPlan(Unsupported()))
+    assert Unsupported not in adapter._dispatch
+
+def test_sql_compiler_compile():
+    compiler = SQLCompiler(SymbolTable())
+    plan = compiler.compile("SELECT id FROM t WHERE id > 3;")
+    assert plan['type'] == 'SELECT_PLAN'
+    assert plan['table_name'] == 't'
+    assert plan['where_clause']['type'] == 'binary_expression'
+    plan = compiler.compile("INSERT INTO t VALUES (1, 'a');")
+    assert plan['type'] == 'INSERT_PLAN'
+    assert plan['table_name'] == 't'
+    plan = compiler.compile("SELEC x;")
+    assert plan['type'] == 'ERROR'
+    assert plan['message'].startswith('编译失败')
+
+class RejectingAnalyzer(EnhancedSemanticAnalyzer):
+    def _analyze_node(self, node):
+        self._add_error("Table 't' does not exist")
+
+def test_sql_compiler_reports_semantic_errors():
+    compiler = SQLCompiler(SymbolTable())
+    compiler._semantic_analyzer = RejectingAnalyzer(compiler.symbol_table)
+    expected = {'type': 'ERROR', 'message': "语义分析失败: Table 't' does not exist"}
+    assert compiler.compile("SELECT id FROM t;") == expected
+    assert compiler.compile_with_plan_info("SELECT id FROM t;") == expected
+
+def test_sql_compiler_compile_with_plan_info():
+    info = SQLCompiler(SymbolTable()).compile_with_plan_info("SELECT id FROM t;")
+    assert info['executor_plan']['type'] == 'SELECT_PLAN'
+    assert info['logical_plan'].root is not None
+    assert info['semantic_analysis'] == {'success': True, 'errors': [], 'warnings': []}
+
+def test_sql_compiler_plan_cache_returns_independent_copies():
+    compiler = SQLCompiler(SymbolTable())
+    first = compiler.compile("SELECT id FROM t WHERE id > 3;")
+    expected = {**first, 'select_list': list(first['select_list'])}
+    first['select_list'].append('mutated')
+    second = compiler.compile("SELECT id FROM t WHERE id > 3;")
+    assert len(compiler._plan_cache) == 1
+    assert second == expected
+    assert second is not first
+    second['where_clause']['condition'] = 'mutated'
+    assert compiler.compile("SELECT id FROM t WHERE id > 3;") == expected
+
+def test_sql_compiler_plan_cache_invalidated_by_symbol_table_changes():
+    symbol_table = SymbolTable()
+    compiler = SQLCompiler(symbol_table)
+    sql = "SELECT id FROM t;"
+    compiler.compile(sql)
+    version = symbol_table.version
+    symbol_table.add_table(TableInfo('t', []))
+    assert symbol_table.version == version + 1
+    assert (symbol_table.version, sql) not in compiler._plan_cache
+    compiler.compile(sql)
+    assert (symbol_table.version, sql) in compiler._plan_cache
+    assert symbol_table.remove_table('t')
+    assert symbol_table.version == version + 2
+    assert not symbol_table.remove_table('t')
+    assert symbol_table.version == version + 2
+    assert (symbol_table.version, sql) not in compiler._plan_cache
+
+def test_sql_compiler_does_not_cache_errors():
+    compiler = SQLCompiler(SymbolTable())
+    assert compiler.compile("SELEC x;")['type'] == 'ERROR'
+    assert not compiler._plan_cache